@@ -1,7 +1,16 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
 
+from backend.app.config.config import settings as env
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_hash_pool = None
+
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -9,3 +18,48 @@ def hash_password(password: str):
 
 def verify_password(password: str, hashed: str):
     return pwd_context.verify(password, hashed)
+
+
+def _hash_many(passwords):
+    return [hash_password(p) for p in passwords]
+
+
+def hash_workers():
+    return env.PASSWORD_HASH_WORKERS or os.process_cpu_count() or 1
+
+
+def get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        # Not fork: this process already runs Motor and executor threads, and
+        # forking with threads alive can deadlock the child on a held lock.
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=hash_workers(),
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_passwords(passwords: list[str]):
+    # bcrypt is deliberately slow (~0.2s per hash); bulk imports spread it over a
+    # process pool in a handful of chunks instead of blocking the event loop.
+    if not passwords:
+        return []
+
+    pool = get_hash_pool()
+    size = -(-len(passwords) // hash_workers())
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _hash_many, passwords[i : i + size])
+            for i in range(0, len(passwords), size)
+        )
+    )
+    return [hashed for chunk in results for hashed in chunk]
@@ -1,3 +1,6 @@
+import os
+import tempfile
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +15,74 @@ class Settings(BaseSettings):
     DB_LOGS_COLLECTION: str
     DB_HISTORY_COLLECTION: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    STOCK_DATA_URL: str = "https://api.stockdata.org/v1/data/quote"
+    METRICS_LOOP_SAMPLE_INTERVAL_SECONDS: float = 0.5
+    DB_PROFILES_COLLECTION: str = "profiles"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_CONNECT_TIMEOUT_MS: int = 20000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_LOGS_WRITE_W: int = 1
+    MONGO_ANALYTICS_MAX_STALENESS_SECONDS: int = 90
+    INDEX_BUILD_MODE: str = "background"
+    QUOTE_CACHE_ENABLED: bool = True
+    QUOTE_CACHE_PATH: str = os.path.join(tempfile.gettempdir(), "wsdp-quotes.bin")
+    QUOTE_CACHE_SLOTS: int = 4096
+    QUOTE_CACHE_TTL_SECONDS: float = 60.0
+    QUOTE_CACHE_WAIT_SECONDS: float = 5.0
+    DB_HISTORY_BUCKETS_COLLECTION: str = "history_buckets"
+    HISTORY_STORAGE_MODE: str = "documents"
+    HISTORY_BUCKET_SECONDS: int = 3600
+    HISTORY_BUCKET_MAX_COUNT: int = 1000
+    EXPORT_BATCH_SIZE: int = 5000
+    EXPORT_MAX_BATCH_SIZE: int = 50000
+    DB_BACKFILL_JOBS_COLLECTION: str = "backfill_jobs"
+    DB_ETL_RUNS_COLLECTION: str = "etl_runs"
+    ETL_RUN_RETENTION_DAYS: int = 14
+    DB_ETL_RETRIES_COLLECTION: str = "etl_retries"
+    DB_ETL_DEAD_LETTERS_COLLECTION: str = "etl_dead_letters"
+    ETL_RETRY_WORKER_ENABLED: bool = True
+    ETL_RETRY_POLL_SECONDS: float = 5.0
+    ETL_RETRY_BASE_DELAY_SECONDS: float = 10.0
+    ETL_RETRY_MAX_DELAY_SECONDS: float = 900.0
+    ETL_RETRY_MAX_ATTEMPTS: int = 8
+    ETL_RETRY_LEASE_SECONDS: float = 120.0
+    ETL_RETRY_CLAIM_LIMIT: int = 200
+    ETL_RETRY_BATCH_SIZE: int = 20
+    BACKFILL_CHUNK_SIZE: int = 5000
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    USER_IMPORT_MAX_ROWS: int = 10000
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, Optional[str]] = {}
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = []
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    WATCHLIST_MAX_TICKERS: int = 50
+    DASHBOARD_MAX_AGE_SECONDS: float = 300.0
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CLASSES: dict[str, Optional[dict[str, float]]] = {}
+    UPSTREAM_TIMEOUT_SECONDS: float = 5.0
+    STOCK_DATA_SECONDARY_URL: Optional[str] = None
+    GEMINI_MODEL: str = "gemini-2.0-flash"
+    GEMINI_SECONDARY_MODEL: Optional[str] = None
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+    HEDGE_PROVIDERS: list[str] = []
+    HEDGE_QUANTILE: float = 0.95
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_WINDOW: int = 200
+    DB_ANOMALY_STATE_COLLECTION: str = "anomaly_state"
+    DB_ANOMALY_FLAGS_COLLECTION: str = "anomaly_flags"
+    ANOMALY_Z_THRESHOLD: float = 3.0
+    ANOMALY_EWMA_ALPHA: float = 0.1
+    ANOMALY_MIN_SAMPLES: int = 20
+    ANOMALY_CHECKPOINT_SECONDS: float = 30.0
+    ANOMALY_FLAG_RETENTION_DAYS: int = 30
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_RETENTION: int = 50
     
     
     class Config:
@@ -1,11 +1,63 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.write_concern import WriteConcern
 from backend.app.config.config import settings as env
 
 
+def client_options():
+    return {
+        "maxPoolSize": env.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": env.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": env.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": env.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": env.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": env.MONGO_SOCKET_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": env.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+
+
+# How each kind of traffic talks to the replica set.
+#   users     - account data, must survive a failover: majority writes, primary reads
+#   logs      - append-only and disposable: don't wait for journal or replication
+#   analytics - history/summary scans, tolerate bounded staleness on a secondary
+def workload_options(workload):
+    if workload == "users":
+        return {
+            "read_preference": ReadPreference.PRIMARY,
+            "write_concern": WriteConcern(w="majority"),
+        }
+    if workload == "logs":
+        return {"write_concern": WriteConcern(w=env.MONGO_LOGS_WRITE_W, j=False)}
+    if workload == "analytics":
+        return {
+            "read_preference": SecondaryPreferred(
+                max_staleness=env.MONGO_ANALYTICS_MAX_STALENESS_SECONDS
+            )
+        }
+    return {}
+
+
 class Database:
     client: AsyncIOMotorClient = None
     db = None
 
+    def __init__(self):
+        self.handles = {}
+
+    def connect(self, client, db_name):
+        self.client = client
+        self.db = client[db_name]
+        self.handles = {}
+
+    def collection(self, name, workload="default"):
+        key = (name, workload)
+        handle = self.handles.get(key)
+        if handle is None:
+            handle = self.db.get_collection(name, **workload_options(workload))
+            self.handles[key] = handle
+        return handle
+
 
 db_manager = Database()
 
@@ -15,16 +67,62 @@ async def get_db():
 
 
 async def get_users_collection():
-    return db_manager.db[env.DB_USER_COLLECTION]
+    return db_manager.collection(env.DB_USER_COLLECTION, "users")
 
 
 async def get_stocks_collection():
-    return db_manager.db[env.DB_STOCKS_COLLECTION]
+    return db_manager.collection(env.DB_STOCKS_COLLECTION)
+
+
+async def get_stocks_analytics_collection():
+    return db_manager.collection(env.DB_STOCKS_COLLECTION, "analytics")
 
 
 async def get_logs_collection():
-    return db_manager.db[env.DB_LOGS_COLLECTION]
+    return db_manager.collection(env.DB_LOGS_COLLECTION, "logs")
 
 
+# History writes and the reads they depend on (backfill dedupe, bucket fill)
+# use the default handles; only the analytics read endpoints may lag.
 async def get_history_collection():
-    return db_manager.db[env.DB_HISTORY_COLLECTION]
+    return db_manager.collection(env.DB_HISTORY_COLLECTION)
+
+
+async def get_history_buckets_collection():
+    return db_manager.collection(env.DB_HISTORY_BUCKETS_COLLECTION)
+
+
+async def get_history_analytics_collection():
+    return db_manager.collection(env.DB_HISTORY_COLLECTION, "analytics")
+
+
+async def get_history_buckets_analytics_collection():
+    return db_manager.collection(env.DB_HISTORY_BUCKETS_COLLECTION, "analytics")
+
+
+async def get_profiles_collection():
+    return db_manager.collection(env.DB_PROFILES_COLLECTION, "logs")
+
+
+async def get_backfill_jobs_collection():
+    return db_manager.collection(env.DB_BACKFILL_JOBS_COLLECTION)
+
+
+async def get_etl_runs_collection():
+    return db_manager.collection(env.DB_ETL_RUNS_COLLECTION, "logs")
+
+
+async def get_etl_retries_collection():
+    return db_manager.collection(env.DB_ETL_RETRIES_COLLECTION)
+
+
+async def get_etl_dead_letters_collection():
+    return db_manager.collection(env.DB_ETL_DEAD_LETTERS_COLLECTION)
+
+
+async def get_anomaly_state_collection():
+    return db_manager.collection(env.DB_ANOMALY_STATE_COLLECTION)
+
+
+async def get_anomaly_flags_collection():
+    return db_manager.collection(env.DB_ANOMALY_FLAGS_COLLECTION, "analytics")
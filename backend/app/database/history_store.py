@@ -0,0 +1,332 @@
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.app.config.config import settings as env
+
+# Bucket documents pack up to HISTORY_BUCKET_MAX_COUNT observations of one ticker
+# that fall in the same HISTORY_BUCKET_SECONDS window:
+#   {ticker, bucket_start, count, first, last, timestamps: [], prices: [], day_changes: []}
+# A full bucket is never split; the next observation upserts a sibling document
+# with the same (ticker, bucket_start).
+
+
+def _utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def bucket_start(timestamp, bucket_seconds=None):
+    bucket_seconds = bucket_seconds or env.HISTORY_BUCKET_SECONDS
+    epoch = int(_utc(timestamp).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % bucket_seconds, timezone.utc)
+
+
+def unpack_bucket(bucket):
+    return [
+        {
+            "_id": f"{bucket['_id']}:{i}",
+            "ticker": bucket["ticker"],
+            "price": price,
+            "day_change": day_change,
+            "timestamp": timestamp,
+        }
+        for i, (timestamp, price, day_change) in enumerate(
+            zip(bucket["timestamps"], bucket["prices"], bucket["day_changes"])
+        )
+    ]
+
+
+class HistoryStore:
+    # Writes go through rows/buckets; read() and iter_batches() use the read
+    # handles when given, which may point at (possibly stale) secondaries.
+    def __init__(
+        self,
+        rows_collection,
+        buckets_collection=None,
+        mode=None,
+        rows_reads=None,
+        buckets_reads=None,
+    ):
+        self._rows = rows_collection
+        self._buckets = buckets_collection
+        self._mode = mode or env.HISTORY_STORAGE_MODE
+        self._rows_reads = rows_collection if rows_reads is None else rows_reads
+        self._buckets_reads = (
+            buckets_collection if buckets_reads is None else buckets_reads
+        )
+
+    @property
+    def bucketed(self):
+        return self._mode == "buckets" and self._buckets is not None
+
+    async def append(self, ticker, price, day_change, timestamp):
+        if not self.bucketed:
+            return await self._rows.insert_one(
+                {
+                    "ticker": ticker,
+                    "price": price,
+                    "day_change": day_change,
+                    "timestamp": timestamp,
+                }
+            )
+
+        return await self._buckets.update_one(
+            {
+                "ticker": ticker,
+                "bucket_start": bucket_start(timestamp),
+                "count": {"$lt": env.HISTORY_BUCKET_MAX_COUNT},
+            },
+            {
+                "$push": {
+                    "timestamps": timestamp,
+                    "prices": price,
+                    "day_changes": day_change,
+                },
+                "$inc": {"count": 1},
+                "$min": {"first": timestamp},
+                "$max": {"last": timestamp},
+            },
+            upsert=True,
+        )
+
+    async def append_many(self, docs):
+        # Bulk appends keyed by _id (see backfill_service.history_id); rows that
+        # are already stored are skipped. Returns (inserted, duplicates).
+        if not docs:
+            return 0, 0
+        if not self.bucketed:
+            try:
+                result = await self._rows.insert_many(docs, ordered=False)
+                return len(result.inserted_ids), 0
+            except BulkWriteError as e:
+                errors = e.details["writeErrors"]
+                if any(err.get("code") != 11000 for err in errors):
+                    raise
+                return e.details["nInserted"], len(errors)
+
+        # Buckets have no per-observation key, so duplicates are found by
+        # (ticker, timestamp) in the buckets and among rows not yet migrated.
+        tickers = list({doc["ticker"] for doc in docs})
+        starts = list({bucket_start(doc["timestamp"]) for doc in docs})
+        unmigrated = {
+            row["_id"]
+            async for row in self._rows.find(
+                {"_id": {"$in": [doc["_id"] for doc in docs]}}, {"_id": 1}
+            )
+        }
+        stored = set()
+        async for bucket in self._buckets.find(
+            {"ticker": {"$in": tickers}, "bucket_start": {"$in": starts}},
+            {"ticker": 1, "timestamps": 1},
+        ):
+            stored.update(
+                (bucket["ticker"], _utc(t).timestamp()) for t in bucket["timestamps"]
+            )
+
+        groups = {}
+        for doc in docs:
+            key = (doc["ticker"], _utc(doc["timestamp"]).timestamp())
+            if doc["_id"] in unmigrated or key in stored:
+                continue
+            stored.add(key)
+            groups.setdefault(
+                (doc["ticker"], bucket_start(doc["timestamp"])), []
+            ).append(doc)
+
+        requests = []
+        size = env.HISTORY_BUCKET_MAX_COUNT
+        for (ticker, start), group in groups.items():
+            for i in range(0, len(group), size):
+                part = group[i : i + size]
+                timestamps = [doc["timestamp"] for doc in part]
+                requests.append(
+                    UpdateOne(
+                        {
+                            "ticker": ticker,
+                            "bucket_start": start,
+                            "count": {"$lte": size - len(part)},
+                        },
+                        {
+                            "$push": {
+                                "timestamps": {"$each": timestamps},
+                                "prices": {"$each": [doc["price"] for doc in part]},
+                                "day_changes": {
+                                    "$each": [doc["day_change"] for doc in part]
+                                },
+                            },
+                            "$inc": {"count": len(part)},
+                            "$min": {"first": min(timestamps)},
+                            "$max": {"last": max(timestamps)},
+                        },
+                        upsert=True,
+                    )
+                )
+        if requests:
+            await self._buckets.bulk_write(requests, ordered=False)
+        inserted = sum(len(group) for group in groups.values())
+        return inserted, len(docs) - inserted
+
+    async def read(self, ticker, since=None, until=None):
+        entries = []
+
+        row_filter = {"ticker": ticker}
+        if since or until:
+            row_filter["timestamp"] = {}
+            if since:
+                row_filter["timestamp"]["$gte"] = since
+            if until:
+                row_filter["timestamp"]["$lt"] = until
+        async for row in self._rows_reads.find(row_filter):
+            entries.append(row)
+
+        # Rows not yet migrated are still read, so switching modes needs no downtime.
+        if self.bucketed:
+            bucket_filter = {"ticker": ticker}
+            if since:
+                bucket_filter["last"] = {"$gte": since}
+            if until:
+                bucket_filter["first"] = {"$lt": until}
+            async for bucket in self._buckets_reads.find(bucket_filter):
+                entries.extend(
+                    e
+                    for e in unpack_bucket(bucket)
+                    if (not since or _utc(e["timestamp"]) >= _utc(since))
+                    and (not until or _utc(e["timestamp"]) < _utc(until))
+                )
+
+        entries.sort(key=lambda e: _utc(e["timestamp"]), reverse=True)
+        return entries
+
+    async def iter_batches(self, tickers, since=None, until=None, batch_size=5000):
+        # Streams (ticker, timestamp, price, day_change) records in lists of at most
+        # batch_size, so an export never holds more than one batch in memory.
+        # Loose rows come first, then bucketed ones; each part is ordered by
+        # (ticker, timestamp).
+        projection = {"_id": 0, "ticker": 1, "timestamp": 1, "price": 1, "day_change": 1}
+        row_filter = {"ticker": {"$in": tickers}}
+        if since or until:
+            row_filter["timestamp"] = {}
+            if since:
+                row_filter["timestamp"]["$gte"] = since
+            if until:
+                row_filter["timestamp"]["$lt"] = until
+
+        batch = []
+        cursor = (
+            self._rows_reads.find(row_filter, projection)
+            .sort([("ticker", 1), ("timestamp", 1)])
+            .batch_size(batch_size)
+        )
+        async for row in cursor:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if self.bucketed:
+            bucket_filter = {"ticker": {"$in": tickers}}
+            if since:
+                bucket_filter["last"] = {"$gte": since}
+            if until:
+                bucket_filter["first"] = {"$lt": until}
+            cursor = (
+                self._buckets_reads.find(bucket_filter)
+                .sort([("ticker", 1), ("bucket_start", 1)])
+                .batch_size(max(1, batch_size // env.HISTORY_BUCKET_MAX_COUNT))
+            )
+            async for bucket in cursor:
+                for timestamp, price, day_change in sorted(
+                    zip(bucket["timestamps"], bucket["prices"], bucket["day_changes"]),
+                    key=lambda e: _utc(e[0]),
+                ):
+                    if since and _utc(timestamp) < _utc(since):
+                        continue
+                    if until and _utc(timestamp) >= _utc(until):
+                        continue
+                    batch.append(
+                        {
+                            "ticker": bucket["ticker"],
+                            "timestamp": timestamp,
+                            "price": price,
+                            "day_change": day_change,
+                        }
+                    )
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+        if batch:
+            yield batch
+
+
+def _bucket_doc(rows):
+    return {
+        "_id": f"migrated:{rows[0]['_id']}",
+        "ticker": rows[0]["ticker"],
+        "bucket_start": bucket_start(rows[0]["timestamp"]),
+        "count": len(rows),
+        "first": rows[0]["timestamp"],
+        "last": rows[-1]["timestamp"],
+        "timestamps": [row["timestamp"] for row in rows],
+        "prices": [row["price"] for row in rows],
+        "day_changes": [row["day_change"] for row in rows],
+    }
+
+
+async def migrate_rows_to_buckets(rows, buckets, batch_size=5000, until=None):
+    # Converts rows older than `until` (by default, when the migration starts) so
+    # rows written meanwhile can't keep it running. Rows are read in batches of
+    # whole (ticker, bucket_start) windows: a window cut off by the batch limit is
+    # left for the next batch, so a window only becomes several buckets when it
+    # holds more than HISTORY_BUCKET_MAX_COUNT rows.
+    #
+    # Bucket _ids are derived from the first row they hold, so re-running after an
+    # interruption re-inserts nothing twice: already-written buckets are skipped as
+    # duplicates and their rows deleted.
+    until = until or datetime.now(timezone.utc)
+    size = env.HISTORY_BUCKET_MAX_COUNT
+    batch_size = max(batch_size, size)
+    converted = 0
+
+    while True:
+        batch = [
+            row
+            async for row in rows.find({"timestamp": {"$lt": until}})
+            .sort([("ticker", 1), ("timestamp", 1)])
+            .limit(batch_size)
+        ]
+        if not batch:
+            return converted
+
+        windows = []
+        for row in batch:
+            key = (row["ticker"], bucket_start(row["timestamp"]))
+            if not windows or windows[-1][0] != key:
+                windows.append((key, []))
+            windows[-1][1].append(row)
+
+        if len(batch) == batch_size:
+            if len(windows) > 1:
+                windows.pop()
+            else:
+                key, window = windows[0]
+                windows = [(key, window[: len(window) - len(window) % size])]
+
+        docs = []
+        done = []
+        for _, window in windows:
+            for i in range(0, len(window), size):
+                docs.append(_bucket_doc(window[i : i + size]))
+            done.extend(row["_id"] for row in window)
+
+        try:
+            await buckets.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            if any(err.get("code") != 11000 for err in e.details["writeErrors"]):
+                raise
+
+        await rows.delete_many({"_id": {"$in": done}})
+        converted += len(done)
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import time
+
+import certifi
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.app.config.config import settings as env
+from backend.app.database.database import client_options
+from backend.app.database.history_store import migrate_rows_to_buckets
+from backend.app.models.mongo_logger import MongoLogger
+
+# (collection, keys, options). create_index is a no-op when the index already
+# exists, so running this on every deploy or every worker start is safe.
+INDEXES = [
+    (env.DB_USER_COLLECTION, "username", {"unique": True}),
+    (env.DB_USER_COLLECTION, "email", {}),
+    (env.DB_USER_COLLECTION, "full_name", {}),
+    (env.DB_USER_COLLECTION, "role", {}),
+    (env.DB_STOCKS_COLLECTION, "ticker", {"unique": True}),
+    (env.DB_LOGS_COLLECTION, "ticker", {}),
+    (env.DB_HISTORY_COLLECTION, "ticker", {}),
+    (env.DB_HISTORY_COLLECTION, [("ticker", 1), ("timestamp", 1)], {}),
+    (env.DB_HISTORY_BUCKETS_COLLECTION, [("ticker", 1), ("bucket_start", -1)], {}),
+    (env.DB_PROFILES_COLLECTION, "created_at", {}),
+    (
+        env.DB_ETL_RUNS_COLLECTION,
+        [("started_at", -1)],
+        {"expireAfterSeconds": env.ETL_RUN_RETENTION_DAYS * 86400},
+    ),
+    (env.DB_ETL_RUNS_COLLECTION, [("status", 1), ("started_at", -1)], {}),
+    # /etl/runs?order=slowest, with and without a status filter.
+    (env.DB_ETL_RUNS_COLLECTION, [("duration_ms", -1)], {}),
+    (env.DB_ETL_RUNS_COLLECTION, [("status", 1), ("duration_ms", -1)], {}),
+    (env.DB_ETL_RETRIES_COLLECTION, "next_attempt_at", {}),
+    (env.DB_ETL_RETRIES_COLLECTION, "lease", {"sparse": True}),
+    (env.DB_ETL_DEAD_LETTERS_COLLECTION, [("dead_at", -1)], {}),
+    (env.DB_ETL_DEAD_LETTERS_COLLECTION, "ticker", {}),
+    (
+        env.DB_ANOMALY_FLAGS_COLLECTION,
+        [("flagged_at", -1)],
+        {"expireAfterSeconds": env.ANOMALY_FLAG_RETENTION_DAYS * 86400},
+    ),
+    (env.DB_ANOMALY_FLAGS_COLLECTION, [("ticker", 1), ("flagged_at", -1)], {}),
+]
+
+
+class MigrationState:
+    ready: bool = False
+    error: str = None
+    task: asyncio.Task = None
+    log_task: asyncio.Task = None
+
+
+migration_state = MigrationState()
+
+
+async def ensure_indexes(db):
+    return await asyncio.gather(
+        *(
+            db[collection].create_index(keys, **options)
+            for collection, keys, options in INDEXES
+        )
+    )
+
+
+async def run_migrations(db):
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        migration_state.error = str(e)
+        raise
+
+    migration_state.error = None
+    migration_state.ready = True
+
+
+async def _log_failure(logger, error):
+    try:
+        await logger.log(
+            service="Migrations",
+            status="error",
+            message="Background index migrations failed",
+            metadata={"exception": repr(error)},
+        )
+    except Exception:
+        pass
+
+
+def _on_migrations_done(task, logger):
+    # Nothing awaits the background task, so its failure is retrieved, kept for
+    # /health/ready and logged here.
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is None:
+        return
+    migration_state.error = f"Index migrations failed: {error!r}"
+    migration_state.log_task = asyncio.ensure_future(_log_failure(logger, error))
+
+
+async def start_migrations(db, mode):
+    if mode == "blocking":
+        await run_migrations(db)
+    elif mode == "background":
+        logger = MongoLogger(db[env.DB_LOGS_COLLECTION])
+        migration_state.task = asyncio.create_task(run_migrations(db))
+        migration_state.task.add_done_callback(
+            lambda task: _on_migrations_done(task, logger)
+        )
+    elif mode == "skip":
+        # Indexes are managed out of band with `python -m backend.app.database.migrations`.
+        migration_state.ready = True
+    else:
+        raise ValueError(f"Unknown INDEX_BUILD_MODE {mode!r}")
+
+
+async def stop_migrations():
+    if migration_state.task and not migration_state.task.done():
+        migration_state.task.cancel()
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run database migrations.")
+    parser.add_argument(
+        "--history-to-buckets",
+        action="store_true",
+        help="Pack existing history rows into bucket documents",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    client = AsyncIOMotorClient(
+        env.MONGO_URI, tlsCAFile=certifi.where(), **client_options()
+    )
+    db = client[env.DB_NAME]
+    started = time.perf_counter()
+    try:
+        names = await ensure_indexes(db)
+        for (collection, _, _), name in zip(INDEXES, names):
+            print(f"{collection}: {name}")
+
+        if args.history_to_buckets:
+            converted = await migrate_rows_to_buckets(
+                db[env.DB_HISTORY_COLLECTION],
+                db[env.DB_HISTORY_BUCKETS_COLLECTION],
+                args.batch_size,
+            )
+            print(f"Converted {converted} history rows into buckets")
+    finally:
+        client.close()
+
+    print(f"Migrations finished in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
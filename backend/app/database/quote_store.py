@@ -0,0 +1,253 @@
+import asyncio
+import mmap
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store stays disabled and callers fall back to Mongo
+    fcntl = None
+
+# File layout: a 64 byte header followed by fixed 128 byte slots, one per ticker.
+# Slots are found by crc32(ticker) with linear probing and never move once assigned.
+#
+# Each slot is guarded by a sequence counter (a seqlock): the writer bumps it to an
+# odd value, writes the fields and bumps it back to even. Readers retry when they see
+# an odd or changed counter, so reads never block. A slot has a single writer at a
+# time, the process holding the POSIX record lock on that slot's byte range.
+MAGIC = b"WSDPQUOT"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+FIELDS = struct.Struct("<16s64s8sddd")
+RECORD_SIZE = 128
+TICKER_SIZE = 16
+EMPTY_TICKER = bytes(TICKER_SIZE)
+READ_RETRIES = 100
+
+
+def _encode(value, size):
+    return str(value).encode()[:size]
+
+
+def _decode(raw):
+    return raw.rstrip(b"\0").decode(errors="replace")
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return time.time()
+
+
+class QuoteStore:
+    def __init__(self):
+        self._fd = None
+        self._mm = None
+        self._slots = 0
+        self._index = {}
+        self._claimed = set()
+
+    @property
+    def enabled(self):
+        return self._mm is not None
+
+    def open(self, path, slots):
+        if fcntl is None:
+            return
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = HEADER_SIZE + slots * RECORD_SIZE
+        expected = (MAGIC, VERSION, slots, RECORD_SIZE)
+
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, HEADER.size, 0)
+            if len(header) < HEADER.size or HEADER.unpack(header) != expected:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, HEADER.pack(*expected), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self._fd = fd
+        self._mm = mmap.mmap(fd, size)
+        self._slots = slots
+        self._index = {}
+        self._claimed = set()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+        self._fd = None
+        self._mm = None
+
+    def _offset(self, slot):
+        return HEADER_SIZE + slot * RECORD_SIZE
+
+    def _slot(self, ticker, allocate=False):
+        slot = self._index.get(ticker)
+        if slot is not None or not self.enabled:
+            return slot
+
+        key = ticker.encode()
+        if len(key) > TICKER_SIZE:
+            return None
+        key = key.ljust(TICKER_SIZE, b"\0")
+
+        start = zlib.crc32(key) % self._slots
+        for probe in range(self._slots):
+            slot = (start + probe) % self._slots
+            at = self._offset(slot) + SEQ.size
+            stored = self._mm[at : at + TICKER_SIZE]
+
+            if stored == EMPTY_TICKER:
+                if not allocate:
+                    return None
+                # Allocation is rare (once per ticker, ever), so a whole-file lock is fine.
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                try:
+                    stored = self._mm[at : at + TICKER_SIZE]
+                    if stored == EMPTY_TICKER:
+                        self._mm[at : at + TICKER_SIZE] = key
+                        stored = key
+                finally:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            if stored == key:
+                self._index[ticker] = slot
+                return slot
+        return None
+
+    def _try_lock(self, slot):
+        try:
+            fcntl.lockf(
+                self._fd,
+                fcntl.LOCK_EX | fcntl.LOCK_NB,
+                RECORD_SIZE,
+                self._offset(slot),
+                os.SEEK_SET,
+            )
+            return True
+        except OSError:
+            return False
+
+    def _unlock(self, slot):
+        fcntl.lockf(
+            self._fd, fcntl.LOCK_UN, RECORD_SIZE, self._offset(slot), os.SEEK_SET
+        )
+
+    def _write(self, slot, stock):
+        offset = self._offset(slot)
+        # A writer that died mid-write leaves the counter odd; forcing it odd
+        # here (rather than adding one) lets the next write even it out again.
+        (seq,) = SEQ.unpack_from(self._mm, offset)
+        seq |= 1
+        SEQ.pack_into(self._mm, offset, seq)
+        FIELDS.pack_into(
+            self._mm,
+            offset + SEQ.size,
+            _encode(stock["ticker"].upper(), TICKER_SIZE).ljust(TICKER_SIZE, b"\0"),
+            _encode(stock.get("name", ""), 64),
+            _encode(stock.get("currency", ""), 8),
+            float(stock["price"]),
+            float(stock["day_change"]),
+            _timestamp(stock.get("last_updated")),
+        )
+        SEQ.pack_into(self._mm, offset, seq + 1)
+
+    def read(self, ticker):
+        ticker = ticker.upper()
+        slot = self._slot(ticker)
+        if slot is None:
+            return None
+
+        offset = self._offset(slot)
+        for _ in range(READ_RETRIES):
+            (before,) = SEQ.unpack_from(self._mm, offset)
+            if before & 1:
+                continue
+            fields = FIELDS.unpack_from(self._mm, offset + SEQ.size)
+            (after,) = SEQ.unpack_from(self._mm, offset)
+            if before == after:
+                break
+        else:
+            return None
+
+        _, name, currency, price, day_change, updated_at = fields
+        if not updated_at:
+            return None
+
+        return {
+            "ticker": ticker,
+            "name": _decode(name),
+            "currency": _decode(currency),
+            "price": price,
+            "day_change": day_change,
+            "last_updated": datetime.fromtimestamp(updated_at, timezone.utc),
+        }
+
+    def put(self, stock):
+        ticker = stock["ticker"].upper()
+        slot = self._slot(ticker, allocate=True)
+        if slot is None:
+            return False
+
+        if ticker in self._claimed:
+            self._write(slot, stock)
+            return True
+
+        # Someone else is refreshing this ticker and will publish a newer quote.
+        if not self._try_lock(slot):
+            return False
+        try:
+            self._write(slot, stock)
+        finally:
+            self._unlock(slot)
+        return True
+
+    def claim(self, ticker):
+        # True when this process should fetch the ticker. Tickers the store can't
+        # hold (store disabled, table full) are always ours to fetch.
+        ticker = ticker.upper()
+        if ticker in self._claimed:
+            return False
+
+        slot = self._slot(ticker, allocate=True)
+        if slot is None:
+            return True
+        if not self._try_lock(slot):
+            return False
+
+        self._claimed.add(ticker)
+        return True
+
+    def release(self, ticker):
+        ticker = ticker.upper()
+        if ticker in self._claimed:
+            self._claimed.discard(ticker)
+            self._unlock(self._slot(ticker))
+
+    def is_fresh(self, quote, ttl):
+        age = time.time() - quote["last_updated"].timestamp()
+        return age < ttl
+
+    async def wait_for_update(self, ticker, since, timeout, interval=0.02):
+        deadline = time.monotonic() + timeout
+        while True:
+            quote = self.read(ticker)
+            if quote and quote["last_updated"].timestamp() > since:
+                return quote
+            if time.monotonic() >= deadline:
+                return quote
+            await asyncio.sleep(interval)
+
+
+quote_store = QuoteStore()
@@ -1,7 +1,14 @@
 from fastapi import Depends
 from backend.app.database.database import *
+from backend.app.database.quote_store import quote_store
+from backend.app.services.anomaly_detection import anomaly_detector
+from backend.app.services.change_detection import change_detector
 from backend.app.services.user_service import *
 from backend.app.services.data_service import *
+from backend.app.services.profile_service import *
+from backend.app.services.backfill_service import *
+from backend.app.services.etl_ledger import EtlLedger
+from backend.app.services.retry_queue import RetryQueue
 
 
 async def get_logger(log_collection=Depends(get_logs_collection)):
@@ -15,9 +22,82 @@ def get_user_service(
     return UserService(users_collection, log_collection)
 
 
+async def get_retry_queue(
+    retries_collection=Depends(get_etl_retries_collection),
+    dead_letters_collection=Depends(get_etl_dead_letters_collection),
+):
+    return RetryQueue(retries_collection, dead_letters_collection)
+
+
 def get_data_service(
     stock_collection=Depends(get_stocks_collection),
     log_collection=Depends(get_logger),
     history_collection=Depends(get_history_collection),
+    history_buckets_collection=Depends(get_history_buckets_collection),
+    stock_analytics_collection=Depends(get_stocks_analytics_collection),
+    etl_runs_collection=Depends(get_etl_runs_collection),
+    retry_queue=Depends(get_retry_queue),
+    anomaly_flags_collection=Depends(get_anomaly_flags_collection),
+    history_analytics_collection=Depends(get_history_analytics_collection),
+    history_buckets_analytics_collection=Depends(
+        get_history_buckets_analytics_collection
+    ),
+):
+    return DataService(
+        stock_collection,
+        log_collection,
+        history_collection,
+        quote_store,
+        change_detector,
+        history_buckets_collection,
+        stock_analytics_collection,
+        etl_runs_collection,
+        retry_queue,
+        anomaly_detector=anomaly_detector,
+        anomaly_flags_collection=anomaly_flags_collection,
+        history_analytics_collection=history_analytics_collection,
+        history_buckets_analytics_collection=history_buckets_analytics_collection,
+    )
+
+
+async def build_data_service():
+    # Same wiring as the request dependency, for background tasks.
+    return get_data_service(
+        await get_stocks_collection(),
+        await get_logger(await get_logs_collection()),
+        await get_history_collection(),
+        await get_history_buckets_collection(),
+        await get_stocks_analytics_collection(),
+        await get_etl_runs_collection(),
+        await get_retry_queue(
+            await get_etl_retries_collection(),
+            await get_etl_dead_letters_collection(),
+        ),
+        await get_anomaly_flags_collection(),
+        await get_history_analytics_collection(),
+        await get_history_buckets_analytics_collection(),
+    )
+
+
+def get_profile_service(
+    profiles_collection=Depends(get_profiles_collection),
+    log_collection=Depends(get_logger),
+):
+    return ProfileService(profiles_collection, log_collection)
+
+
+def get_backfill_service(
+    history_collection=Depends(get_history_collection),
+    history_buckets_collection=Depends(get_history_buckets_collection),
+    jobs_collection=Depends(get_backfill_jobs_collection),
+    log_collection=Depends(get_logger),
 ):
-    return DataService(stock_collection, log_collection, history_collection)
+    return BackfillService(
+        HistoryStore(history_collection, history_buckets_collection),
+        jobs_collection,
+        log_collection,
+    )
+
+
+def get_etl_ledger(etl_runs_collection=Depends(get_etl_runs_collection)):
+    return EtlLedger(etl_runs_collection)
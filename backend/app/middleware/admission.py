@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+from backend.app.config.config import settings as env
+from backend.app.monitoring.instrumentation import route_template
+from backend.app.monitoring.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_SHED,
+)
+
+# Route templates per endpoint class. Routes not listed (health, metrics, admin
+# pages) bypass admission control entirely.
+ROUTE_CLASSES = {
+    "cheap_read": (
+        "/etl/{ticker}/results",
+        "/etl/{ticker}/history",
+        "/etl/analytics/history/{ticker}",
+        "/users/{user_id}",
+        "/etl/anomalies",
+    ),
+    "auth": ("/auth/login", "/auth/register"),
+    "etl": (
+        "/etl/{ticker}/run",
+        "/etl/analytics/summary/",
+        "/etl/analytics/trends",
+        "/etl/analytics/export",
+        "/etl/backfill",
+        "/users/{user_id}/dashboard",
+    ),
+    "ai": (
+        "/etl/analytics/correlation/{ticker}",
+        "/etl/analytics/prediction/{ticker}",
+    ),
+    "video": ("/etl/video-generation/{ticker}/run",),
+}
+
+# ADMISSION_CLASSES overrides these per class and per option; null turns a class
+# off so its routes bypass admission control.
+DEFAULT_CLASSES = {
+    "cheap_read": {"concurrency": 256, "queue": 1024, "timeout": 2.0},
+    "auth": {"concurrency": 16, "queue": 64, "timeout": 5.0},
+    "etl": {"concurrency": 32, "queue": 128, "timeout": 5.0},
+    "ai": {"concurrency": 8, "queue": 32, "timeout": 10.0},
+    "video": {"concurrency": 2, "queue": 4, "timeout": 5.0},
+}
+
+
+def admission_classes(overrides):
+    classes = {}
+    for name, options in {**DEFAULT_CLASSES, **overrides}.items():
+        if options is None:
+            continue
+        classes[name] = {**DEFAULT_CLASSES.get(name, {}), **options}
+    return classes
+
+
+class Shed(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionClass:
+    # At most `concurrency` requests run at once; up to `queue` more wait for a
+    # slot, each for at most `timeout` seconds. Anything beyond that is shed.
+
+    def __init__(self, name, concurrency, queue, timeout):
+        self.name = name
+        self.queue = int(queue)
+        self.timeout = float(timeout)
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(int(concurrency))
+
+    async def acquire(self):
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        if self.waiting >= self.queue:
+            raise Shed("queue_full")
+
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.inc(endpoint_class=self.name)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except TimeoutError:
+            raise Shed("timeout") from None
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.dec(endpoint_class=self.name)
+
+    def release(self):
+        self._slots.release()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.classes = {
+            name: AdmissionClass(name, **options)
+            for name, options in admission_classes(env.ADMISSION_CLASSES).items()
+        }
+        self.routes = {
+            path: name
+            for name, paths in ROUTE_CLASSES.items()
+            if name in self.classes
+            for path in paths
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not env.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        name = self.routes.get(route_template(scope["app"], scope))
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        admission = self.classes[name]
+        try:
+            await admission.acquire()
+        except Shed as e:
+            ADMISSION_SHED.inc(reason=e.reason, endpoint_class=name)
+            await self._reject(send)
+            return
+
+        ADMISSION_IN_FLIGHT.inc(endpoint_class=name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_FLIGHT.dec(endpoint_class=name)
+            admission.release()
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "Server busy, try again later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
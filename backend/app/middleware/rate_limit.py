@@ -0,0 +1,158 @@
+import ipaddress
+import json
+import math
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+
+from backend.app.config.config import settings as env
+from backend.app.monitoring.instrumentation import route_template
+from backend.app.monitoring.metrics import RATE_LIMITED
+
+# Route templates that share a limit. Anything not listed is never limited.
+ROUTE_GROUPS = {
+    "auth": ("/auth/login", "/auth/register"),
+    "ai": (
+        "/etl/analytics/correlation/{ticker}",
+        "/etl/analytics/prediction/{ticker}",
+    ),
+    "video": ("/etl/video-generation/{ticker}/run",),
+}
+
+# RATE_LIMITS overrides these per group; null removes a group's limit.
+DEFAULT_LIMITS = {"auth": "10/60", "ai": "20/60", "video": "2/300"}
+
+
+def parse_limit(value):
+    # "<requests>/<seconds>", e.g. "10/60" is ten requests a minute.
+    count, _, period = str(value).partition("/")
+    return int(count), float(period or 1)
+
+
+def rate_limits(overrides):
+    return {
+        group: parse_limit(value)
+        for group, value in {**DEFAULT_LIMITS, **overrides}.items()
+        if value is not None
+    }
+
+
+class TokenBuckets:
+    # One token bucket per (group, client). Buckets live in an LRU capped at
+    # max_keys; an evicted bucket is recreated full, which is what an idle client's
+    # bucket would have refilled to anyway.
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, capacity, period, now=None):
+        # Returns 0 when the request may proceed, otherwise the seconds until a
+        # token is available.
+        now = time.monotonic() if now is None else now
+        rate = capacity / period
+
+        state = self._buckets.get(key)
+        if state is None:
+            tokens = float(capacity)
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            tokens, last = state
+            tokens = min(float(capacity), tokens + (now - last) * rate)
+            self._buckets.move_to_end(key)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.limits = rate_limits(env.RATE_LIMITS)
+        self.proxies = [
+            ipaddress.ip_network(proxy) for proxy in env.RATE_LIMIT_TRUSTED_PROXIES
+        ]
+        self.groups = {
+            path: group
+            for group, paths in ROUTE_GROUPS.items()
+            if group in self.limits
+            for path in paths
+        }
+        self.buckets = TokenBuckets(env.RATE_LIMIT_MAX_KEYS)
+
+    def _client(self, scope):
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode()
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = jwt.decode(
+                    token, env.JWT_SECRET, algorithms=[env.JWT_ALGORITHM]
+                )
+                if payload.get("user_id"):
+                    return f"user:{payload['user_id']}"
+            except JWTError:
+                pass
+        return f"ip:{self._client_ip(scope)}"
+
+    def _trusted(self, address):
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in proxy for proxy in self.proxies)
+
+    def _client_ip(self, scope):
+        # Behind a load balancer every request comes from the proxy's address.
+        # X-Forwarded-For is only believed when the peer is a trusted proxy, and
+        # is read right to left: the first hop not added by one of our proxies is
+        # the client, whatever the client itself put in front of it.
+        client = scope.get("client")
+        address = client[0] if client else "unknown"
+        if not self._trusted(address):
+            return address
+        forwarded = dict(scope["headers"]).get(b"x-forwarded-for", b"").decode()
+        for hop in reversed([h.strip() for h in forwarded.split(",") if h.strip()]):
+            address = hop
+            if not self._trusted(hop):
+                break
+        return address
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not env.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        group = self.groups.get(route_template(scope["app"], scope))
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        capacity, period = self.limits[group]
+        retry_after = self.buckets.take((group, self._client(scope)), capacity, period)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc(group=group)
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_after)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -25,6 +25,10 @@ class UserUpdate(BaseModel):
     email: EmailStr
 
 
+class WatchlistUpdate(BaseModel):
+    tickers: list[str]
+
+
 class UserResponse(UserBase):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
     role: str
@@ -3,7 +3,15 @@ from datetime import datetime, timezone
 
 class MongoLogger:
 
-    SERVICES = {"UserService", "DataService"}
+    SERVICES = {
+        "UserService",
+        "DataService",
+        "ProfileService",
+        "BackfillService",
+        "RetryQueue",
+        "AnomalyDetector",
+        "Migrations",
+    }
     STATUS = {"error", "success", "warning"}
 
     def __init__(self, collection):
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+from backend.app.monitoring.metrics import (
+    ETL_ITEMS,
+    ETL_ITEMS_RATE,
+    EVENT_LOOP_LAG,
+    EVENT_LOOP_LAG_HISTOGRAM,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    MONGO_COMMAND_DURATION,
+    MONGO_COMMAND_FAILURES,
+    MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_CHECKOUT_DURATION,
+    MONGO_POOL_CHECKOUT_FAILURES,
+    MONGO_POOL_CONNECTIONS,
+    UPSTREAM_DURATION,
+    UPSTREAM_REQUESTS,
+)
+
+
+def route_template(app, scope):
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope["app"], scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=method, route=route
+            )
+            HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    # Succeeded/failed events don't carry the collection, so remember it from the
+    # started event. dict set/pop are atomic, which keeps this lock-free.
+
+    def __init__(self):
+        self._collections = {}
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        self._collections[self._key(event)] = collection
+
+    def succeeded(self, event):
+        collection = self._collections.pop(self._key(event), "-")
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000,
+            collection=collection,
+            command=event.command_name,
+        )
+
+    def failed(self, event):
+        collection = self._collections.pop(self._key(event), "-")
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000,
+            collection=collection,
+            command=event.command_name,
+        )
+        MONGO_COMMAND_FAILURES.inc(collection=collection, command=event.command_name)
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    def _address(self, event):
+        return "%s:%s" % event.address
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=self._address(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        MONGO_POOL_CHECKOUT_DURATION.observe(event.duration, address=address)
+        MONGO_POOL_CHECKOUT_FAILURES.inc(address=address, reason=event.reason)
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        MONGO_POOL_CHECKOUT_DURATION.observe(event.duration, address=address)
+        MONGO_POOL_CHECKED_OUT.inc(address=address)
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec(address=self._address(event))
+
+
+@contextmanager
+def track_upstream(provider, operation):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        UPSTREAM_DURATION.observe(
+            time.perf_counter() - started, provider=provider, operation=operation
+        )
+        UPSTREAM_REQUESTS.inc(provider=provider, operation=operation, outcome=outcome)
+
+
+async def sample_event_loop(interval):
+    loop = asyncio.get_running_loop()
+    last_items = 0.0
+    last_sample = loop.time()
+
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        now = loop.time()
+
+        lag = max(0.0, now - expected)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
+
+        items = sum(ETL_ITEMS.collect().values())
+        ETL_ITEMS_RATE.set((items - last_items) / (now - last_sample))
+        last_items, last_sample = items, now
@@ -0,0 +1,325 @@
+import threading
+from bisect import bisect_left
+
+# Every metric keeps one shard per writing thread. A shard is only ever mutated by
+# the thread that owns it (the event loop, or one of Motor's executor threads for
+# command monitoring), so writes need no lock; a scrape sums the shards.
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    TYPE = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._shards.append(shard)
+        return shard
+
+    def _labels(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def collect(self):
+        merged = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                merged[key] = merged.get(key, 0.0) + value
+        return merged
+
+    def value(self, **labels):
+        return self.collect().get(self._labels(labels), 0.0)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for key, value in sorted(self.collect().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        shard = self._shard()
+        key = self._labels(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def inc(self, amount=1.0, **labels):
+        shard = self._shard()
+        key = self._labels(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        # Only meaningful when a single thread writes the gauge, e.g. the loop sampler.
+        self._shard()[self._labels(labels)] = value
+
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._labels(labels)
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def collect(self):
+        merged = {}
+        for shard in list(self._shards):
+            for key, (counts, total, count) in list(shard.items()):
+                current = merged.get(key)
+                if current is None:
+                    current = merged[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                for i, n in enumerate(list(counts)):
+                    current[0][i] += n
+                current[1] += total
+                current[2] += count
+        return merged
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for key, (counts, total, count) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served, by route template.",
+    ("method", "route"),
+)
+MONGO_COMMAND_DURATION = registry.histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency reported by pymongo command monitoring.",
+    ("collection", "command"),
+)
+MONGO_COMMAND_FAILURES = registry.counter(
+    "mongo_command_failures_total",
+    "MongoDB commands that failed.",
+    ("collection", "command"),
+)
+MONGO_POOL_CONNECTIONS = registry.gauge(
+    "mongo_pool_connections",
+    "Open connections in the pymongo pool, per server.",
+    ("address",),
+)
+MONGO_POOL_CHECKED_OUT = registry.gauge(
+    "mongo_pool_checked_out_connections",
+    "Connections currently checked out of the pool, per server.",
+    ("address",),
+)
+MONGO_POOL_CHECKOUT_DURATION = registry.histogram(
+    "mongo_pool_checkout_duration_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    ("address",),
+)
+MONGO_POOL_CHECKOUT_FAILURES = registry.counter(
+    "mongo_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason (e.g. timeout).",
+    ("address", "reason"),
+)
+MONGO_POOL_MAX_SIZE = registry.gauge(
+    "mongo_pool_max_size",
+    "Configured maxPoolSize of the Mongo client.",
+)
+UPSTREAM_DURATION = registry.histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to external providers (stockdata, gemini).",
+    ("provider", "operation"),
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "upstream_requests_total",
+    "Calls to external providers, by outcome.",
+    ("provider", "operation", "outcome"),
+)
+ETL_ITEMS = registry.counter(
+    "etl_items_total",
+    "Quotes processed by the ETL, by outcome.",
+    ("outcome",),
+)
+ETL_QUOTE_WRITES = registry.counter(
+    "etl_quote_writes_total",
+    "Quotes persisted (written) or skipped because they matched the last stored one.",
+    ("result",),
+)
+ETL_RETRIES = registry.counter(
+    "etl_retries_total",
+    "Retry queue outcomes: succeeded, rescheduled or dead_lettered.",
+    ("outcome",),
+)
+ETL_RETRY_WORKER_ERRORS = registry.counter(
+    "etl_retry_worker_errors_total",
+    "Retry worker iterations that failed (the worker keeps running).",
+)
+ETL_STAGE_DURATION = registry.histogram(
+    "etl_stage_duration_seconds",
+    "Time spent in each ETL stage (fetch, validate, history, upsert, ...).",
+    ("stage",),
+)
+ETL_ITEMS_RATE = registry.gauge(
+    "etl_items_per_second",
+    "Quotes processed by the ETL per second over the last sampling interval.",
+)
+CIRCUIT_STATE = registry.gauge(
+    "circuit_breaker_state",
+    "Provider circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    ("provider", "operation"),
+)
+CIRCUIT_REJECTED = registry.counter(
+    "circuit_breaker_rejected_total",
+    "Provider calls failed fast because the circuit was open.",
+    ("provider", "operation"),
+)
+UPSTREAM_HEDGES = registry.counter(
+    "upstream_hedged_requests_total",
+    "Hedged provider calls, by which attempt answered first (primary, hedge, none).",
+    ("provider", "operation", "winner"),
+)
+ANOMALY_FLAGS = registry.counter(
+    "anomaly_flags_total",
+    "Ingested quotes flagged as unusual moves by the streaming z-score detector.",
+)
+ANOMALY_CHECKPOINT_ERRORS = registry.counter(
+    "anomaly_checkpoint_errors_total",
+    "Anomaly state restores or checkpoints that failed (retried next interval).",
+)
+RATE_LIMITED = registry.counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by the per-client rate limiter, by route group.",
+    ("group",),
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight_requests",
+    "Admitted requests currently running, by endpoint class.",
+    ("endpoint_class",),
+)
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot, by endpoint class.",
+    ("endpoint_class",),
+)
+ADMISSION_SHED = registry.counter(
+    "admission_shed_requests_total",
+    "Requests rejected with 503 by admission control, by class and reason.",
+    ("endpoint_class", "reason"),
+)
+EVENT_LOOP_LAG = registry.gauge(
+    "event_loop_lag_seconds",
+    "Delay between when the loop sampler was due to wake up and when it ran.",
+)
+EVENT_LOOP_LAG_HISTOGRAM = registry.histogram(
+    "event_loop_lag_distribution_seconds",
+    "Distribution of event loop lag samples.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
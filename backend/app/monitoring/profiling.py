@@ -0,0 +1,221 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from backend.app.config.config import settings as env
+from backend.app.database.database import (
+    get_logs_collection,
+    get_profiles_collection,
+    get_users_collection,
+)
+from backend.app.dependencies.auth import (
+    admin_required,
+    get_current_jwt_payload,
+    get_current_user,
+)
+from backend.app.dependencies.services import (
+    get_logger,
+    get_profile_service,
+    get_user_service,
+)
+from backend.app.monitoring.instrumentation import route_template
+
+MAX_STACK_DEPTH = 200
+
+
+def _frame_label(code):
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _awaited(obj):
+    for frame_attr, await_attr in (
+        ("cr_frame", "cr_await"),
+        ("ag_frame", "ag_await"),
+        ("gi_frame", "gi_yieldfrom"),
+    ):
+        if hasattr(obj, frame_attr):
+            return getattr(obj, frame_attr), getattr(obj, await_attr)
+    return None, None
+
+
+def _await_stack(coro):
+    # Walk the chain of awaits of a suspended task down to the object it is
+    # actually blocked on (a Future, a sleep, a socket read...).
+    stack = []
+    obj = coro
+    while obj is not None and len(stack) < MAX_STACK_DEPTH:
+        frame, awaiting = _awaited(obj)
+        if frame is None:
+            stack.append(f"[await {type(obj).__name__}]")
+            break
+        stack.append(_frame_label(frame.f_code))
+        obj = awaiting
+    return stack
+
+
+def _thread_stack(frame, root_code):
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(frame.f_code)
+        frame = frame.f_back
+    stack.reverse()
+
+    # Root the running stack at the task's coroutine so it lines up with the
+    # stacks sampled while the task was suspended.
+    for i, code in enumerate(stack):
+        if code is root_code:
+            stack = stack[i:]
+            break
+    return [_frame_label(code) for code in stack]
+
+
+class TaskProfiler:
+    def __init__(self, task, interval):
+        self._task = task
+        self._loop = task.get_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._interval = interval
+        self._stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.samples = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self):
+        coro = self._task.get_coro()
+        root_frame, _ = _awaited(coro)
+        if root_frame is None:
+            return
+
+        if asyncio.current_task(self._loop) is self._task:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = _thread_stack(frame, root_frame.f_code)
+        else:
+            stack = _await_stack(coro)
+            stack.append("[awaiting]")
+
+        if stack:
+            self._stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            try:
+                self._sample()
+            except Exception:
+                # The task can finish or switch between reads; drop the sample.
+                pass
+
+    def folded(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self._stacks.most_common()
+        )
+
+
+class ProfilingMiddleware:
+    HEADER = b"x-profile"
+    QUERY_FLAG = "profile"
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested(self, scope):
+        headers = dict(scope["headers"])
+        if headers.get(self.HEADER, b"").lower() in (b"1", b"true", b"yes"):
+            return True
+        query = scope.get("query_string", b"").decode()
+        return any(
+            part in (self.QUERY_FLAG, f"{self.QUERY_FLAG}=1", f"{self.QUERY_FLAG}=true")
+            for part in query.split("&")
+        )
+
+    async def _is_admin(self, scope):
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode()
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+
+        try:
+            payload = await get_current_jwt_payload(token)
+            service = get_user_service(
+                await get_users_collection(),
+                await get_logger(await get_logs_collection()),
+            )
+            admin_required(await get_current_user(payload, service))
+        except Exception:
+            # Bad tokens and unknown users simply don't get a profile.
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        if self._requested(scope) and await self._is_admin(scope):
+            trigger = "admin"
+        elif env.PROFILING_SAMPLE_RATE and random.random() < env.PROFILING_SAMPLE_RATE:
+            trigger = "sampled"
+
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = ObjectId()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode())
+                ]
+            await send(message)
+
+        profiler = TaskProfiler(
+            asyncio.current_task(), env.PROFILING_INTERVAL_MS / 1000
+        ).start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            profiler.stop()
+            await self._store(scope, trigger, profile_id, status, duration, profiler)
+
+    async def _store(self, scope, trigger, profile_id, status, duration, profiler):
+        service = get_profile_service(
+            await get_profiles_collection(),
+            await get_logger(await get_logs_collection()),
+        )
+        await service.save_profile(
+            {
+                "_id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope["app"], scope),
+                "status": status["code"],
+                "trigger": trigger,
+                "duration_ms": round(duration * 1000, 3),
+                "interval_ms": env.PROFILING_INTERVAL_MS,
+                "samples": profiler.samples,
+                "folded": profiler.folded(),
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
@@ -1,16 +1,44 @@
+import io
+import math
 import os
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
 
+from backend.app.config.config import settings as env
 from backend.app.database.database import get_db
-from backend.app.dependencies.services import get_data_service
+from backend.app.dependencies.auth import admin_required
+from backend.app.dependencies.services import (
+    get_backfill_service,
+    get_data_service,
+    get_etl_ledger,
+    get_retry_queue,
+)
+from backend.app.models.models_user import UserBase
+from backend.app.services.backfill_service import (
+    FORMATS as BACKFILL_FORMATS,
+    BackfillService,
+    detect_format,
+)
 from backend.app.services.data_service import DataService
+from backend.app.services.etl_ledger import EtlLedger
+from backend.app.services.export_service import FORMATS, format_available
+from backend.app.services.providers import CircuitOpen
+from backend.app.services.retry_queue import RetryQueue
 from mongomock import Collection
 
 router = APIRouter(prefix="/etl")
 
 
+def provider_unavailable(e: CircuitOpen):
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+
 @router.post("/{ticker}/run")
 async def run_etl_data_show(
     ticker: str, service: DataService = Depends(get_data_service)
@@ -40,7 +68,10 @@ async def run_etl_video_generation(
 @router.get("/{ticker}/results")
 async def stock_results(ticker: str, service: DataService = Depends(get_data_service)):
     stock = await service.stock_results(ticker)
-    stock["_id"] = str(stock["_id"])
+    if not stock:
+        raise HTTPException(status_code=404, detail=f"No data found for {ticker}")
+    if "_id" in stock:
+        stock["_id"] = str(stock["_id"])
     return stock
 
 
@@ -59,6 +90,9 @@ async def market_summary(
     tickers: List[str] = Query(
         default=None, description="""Ej: ?tickers=AAPL,TSLA,NVDA"""
     ),
+    source: str = Query(default="live", pattern="^(live|stored)$"),
+    group_by: str = Query(default=None, pattern="^currency$"),
+    max_age_seconds: float = Query(default=None, gt=0),
     service: DataService = Depends(get_data_service),
 ):
 
@@ -70,12 +104,20 @@ async def market_summary(
 
     tickers = [t.upper().strip() for t in tickers]
 
+    if source == "stored":
+        return await service.stored_market_summary(
+            tickers, group_by == "currency", max_age_seconds
+        )
+
     return await service.market_summary(tickers)
 
 
 @router.get("/analytics/correlation/{ticker}")
 async def ai_correlation(ticker: str, service: DataService = Depends(get_data_service)):
-    result = await service.ai_correlation(ticker)
+    try:
+        result = await service.ai_correlation(ticker)
+    except CircuitOpen as e:
+        raise provider_unavailable(e)
     if not result:
         raise HTTPException(status_code=404, detail="Ticker not found")
     return result
@@ -110,11 +152,132 @@ async def analytics_history(
     return stock
 
 
+@router.get("/anomalies")
+async def anomaly_flags(
+    tickers: List[str] = Query(
+        default=None, description="""Ej: ?tickers=AAPL,TSLA (all when omitted)"""
+    ),
+    since: datetime = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    service: DataService = Depends(get_data_service),
+):
+    if tickers and len(tickers) == 1 and "," in tickers[0]:
+        tickers = [t.strip() for t in tickers[0].split(",")]
+
+    return await service.anomaly_flags(tickers, since, limit)
+
+
+@router.get("/analytics/export")
+async def analytics_export(
+    tickers: List[str] = Query(description="""Ej: ?tickers=AAPL,TSLA,NVDA"""),
+    start: datetime = None,
+    end: datetime = None,
+    format: str = "csv",
+    batch_size: int = Query(default=None, ge=1, le=env.EXPORT_MAX_BATCH_SIZE),
+    service: DataService = Depends(get_data_service),
+):
+    if len(tickers) == 1 and "," in tickers[0]:
+        tickers = [t.strip().upper() for t in tickers[0].split(",")]
+
+    tickers = [t.upper().strip() for t in tickers if t.strip()]
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=400, detail=f"format must be one of {', '.join(FORMATS)}"
+        )
+    if not format_available(format):
+        raise HTTPException(
+            status_code=501, detail=f"{format} export requires the 'export' extra"
+        )
+
+    media_type, extension = FORMATS[format]
+    return StreamingResponse(
+        service.export_history(tickers, format, start, end, batch_size),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="history.{extension}"'
+        },
+    )
+
+
 @router.get("/analytics/prediction/{ticker}")
 async def analytics_prediction(
     ticker: str, service: DataService = Depends(get_data_service)
 ):
-    return await service.ai_prediction(ticker)
+    try:
+        return await service.ai_prediction(ticker)
+    except CircuitOpen as e:
+        raise provider_unavailable(e)
+
+
+@router.post("/backfill")
+async def backfill_history(
+    file: UploadFile,
+    format: str = None,
+    job_id: str = None,
+    current_user: UserBase = Depends(admin_required),
+    service: BackfillService = Depends(get_backfill_service),
+):
+    format = format or detect_format(file.filename)
+    if format not in BACKFILL_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(BACKFILL_FORMATS)}",
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    report = await service.import_stream(
+        stream, format, job_id or f"{file.filename}:{file.size}"
+    )
+    stream.detach()
+    return report
+
+
+@router.get("/runs")
+async def etl_runs(
+    start: datetime = None,
+    end: datetime = None,
+    status: str = Query(default=None, pattern="^(success|partial|failed)$"),
+    order: str = Query(default="slowest", pattern="^(slowest|recent)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+    current_user: UserBase = Depends(admin_required),
+    ledger: EtlLedger = Depends(get_etl_ledger),
+):
+    return await ledger.list_runs(start, end, status, order, limit)
+
+
+@router.get("/retries")
+async def pending_retries(
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: UserBase = Depends(admin_required),
+    queue: RetryQueue = Depends(get_retry_queue),
+):
+    return await queue.list_pending(limit)
+
+
+@router.get("/dead-letters")
+async def dead_letters(
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: UserBase = Depends(admin_required),
+    queue: RetryQueue = Depends(get_retry_queue),
+):
+    return await queue.list_dead_letters(limit)
+
+
+@router.post("/dead-letters/replay")
+async def replay_dead_letters(
+    tickers: List[str] = Query(
+        default=None, description="""Ej: ?tickers=AAPL,TSLA (all when omitted)"""
+    ),
+    current_user: UserBase = Depends(admin_required),
+    queue: RetryQueue = Depends(get_retry_queue),
+):
+    if tickers and len(tickers) == 1 and "," in tickers[0]:
+        tickers = [t.strip() for t in tickers[0].split(",")]
+
+    replayed = await queue.replay(tickers)
+    return {"replayed": replayed}
 
 
 @router.get("/history/logs")
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+
+from backend.app.database.migrations import migration_state
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    if not migration_state.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=migration_state.error or "Index migrations still running",
+        )
+    return {"status": "ready"}
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.app.dependencies.auth import admin_required
+from backend.app.dependencies.services import get_profile_service
+from backend.app.models.models_user import UserBase
+from backend.app.services.profile_service import ProfileService
+
+router = APIRouter(prefix="/profiles")
+
+
+@router.get("")
+async def list_profiles(
+    limit: int = Query(default=50, ge=1, le=500),
+    current_user: UserBase = Depends(admin_required),
+    service: ProfileService = Depends(get_profile_service),
+):
+    return await service.list_profiles(limit)
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    current_user: UserBase = Depends(admin_required),
+    service: ProfileService = Depends(get_profile_service),
+):
+    profile = await service.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    # Collapsed-stack format, readable by flamegraph.pl, inferno and speedscope.
+    return PlainTextResponse(
+        profile["folded"],
+        headers={
+            "Content-Disposition": f'attachment; filename="profile_{profile_id}.folded"'
+        },
+    )
@@ -1,12 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
-from backend.app.models.models_user import UserUpdate, UserBase
-from backend.app.services.user_service import UserService
+import csv
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from backend.app.config.config import settings as env
+from backend.app.models.models_user import UserUpdate, UserBase, WatchlistUpdate
+from backend.app.services.user_service import UserService, parse_user_rows
 from backend.app.dependencies.services import *
 from backend.app.dependencies.auth import *
 
 router = APIRouter(prefix="/users")
 
 
+@router.get("/count")
+async def count_users(
+    search: str = None,
+    current_user: UserBase = Depends(admin_required),
+    service: UserService = Depends(get_user_service),
+):
+    return {"count": await service.count_users(search)}
+
+
+@router.post("/import")
+async def import_users(
+    file: UploadFile,
+    current_user: UserBase = Depends(admin_required),
+    service: UserService = Depends(get_user_service),
+):
+    filename = (file.filename or "").lower()
+    fmt = "json"
+    if filename.endswith(".csv") or file.content_type == "text/csv":
+        fmt = "csv"
+
+    try:
+        rows = parse_user_rows(await file.read(), fmt)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Unreadable {fmt} file: {e}")
+
+    if len(rows) > env.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {env.USER_IMPORT_MAX_ROWS} users per import",
+        )
+
+    return await service.import_users(rows)
+
+
 @router.get("/{user_id}")
 async def get_user(
     user_id: str,
@@ -84,15 +121,124 @@ async def delete_user(
 
 @router.get("")
 async def get_all_users(
+    limit: int = Query(default=100, ge=1, le=500),
+    after: str = None,
+    search: str = None,
     current_user: UserBase = Depends(get_current_user),
     service: UserService = Depends(get_user_service),
 ):
 
     admin_required(current_user)
 
-    list_of_users = await service.get_all_users()
+    if after and not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    list_of_users, next_cursor = await service.get_all_users(limit, after, search)
+
+    return {"users": list_of_users, "next_cursor": next_cursor}
+
+
+def check_user_id(user_id: str):
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(status_code=400, detail="Invalid user id")
 
-    return list_of_users
+
+@router.get("/{user_id}/watchlist")
+async def get_watchlist(
+    user_id: str,
+    current_user: UserBase = Depends(get_current_user),
+    service: UserService = Depends(get_user_service),
+):
+    check_user_id(user_id)
+    owner_or_admin(user_id, current_user)
+
+    watchlist = await service.get_watchlist(user_id)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "watchlist": watchlist}
+
+
+@router.put("/{user_id}/watchlist")
+async def set_watchlist(
+    user_id: str,
+    data: WatchlistUpdate,
+    current_user: UserBase = Depends(get_current_user),
+    service: UserService = Depends(get_user_service),
+):
+    check_user_id(user_id)
+    owner_or_admin(user_id, current_user)
+
+    if len(data.tickers) > env.WATCHLIST_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A watchlist holds at most {env.WATCHLIST_MAX_TICKERS} tickers",
+        )
+
+    watchlist = await service.set_watchlist(user_id, data.tickers)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "watchlist": watchlist}
+
+
+@router.post("/{user_id}/watchlist/{ticker}")
+async def add_to_watchlist(
+    user_id: str,
+    ticker: str,
+    current_user: UserBase = Depends(get_current_user),
+    service: UserService = Depends(get_user_service),
+):
+    check_user_id(user_id)
+    owner_or_admin(user_id, current_user)
+
+    watchlist = await service.add_to_watchlist(user_id, ticker)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if ticker.strip().upper() not in watchlist:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A watchlist holds at most {env.WATCHLIST_MAX_TICKERS} tickers",
+        )
+    return {"user_id": user_id, "watchlist": watchlist}
+
+
+@router.delete("/{user_id}/watchlist/{ticker}")
+async def remove_from_watchlist(
+    user_id: str,
+    ticker: str,
+    current_user: UserBase = Depends(get_current_user),
+    service: UserService = Depends(get_user_service),
+):
+    check_user_id(user_id)
+    owner_or_admin(user_id, current_user)
+
+    watchlist = await service.remove_from_watchlist(user_id, ticker)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "watchlist": watchlist}
+
+
+@router.get("/{user_id}/dashboard")
+async def dashboard(
+    user_id: str,
+    current_user: UserBase = Depends(get_current_user),
+    service: UserService = Depends(get_user_service),
+    data_service: DataService = Depends(get_data_service),
+):
+    check_user_id(user_id)
+    owner_or_admin(user_id, current_user)
+
+    watchlist = await service.get_watchlist(user_id)
+    if watchlist is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    stocks = await data_service.watchlist_quotes(watchlist) if watchlist else []
+    found = {s["ticker"].upper() for s in stocks}
+    return {
+        "user_id": user_id,
+        "watchlist": watchlist,
+        "stocks": stocks,
+        "missing": [t for t in watchlist if t not in found],
+    }
 
 
 @router.put("/{user_id}/role")
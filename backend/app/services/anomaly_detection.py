@@ -0,0 +1,187 @@
+import asyncio
+import math
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from backend.app.config.config import settings as env
+from backend.app.monitoring.metrics import ANOMALY_CHECKPOINT_ERRORS
+
+# Statistics are kept over per-quote price returns (the move since the previously
+# ingested price), never over raw prices, so a trending stock doesn't drift into
+# permanent anomaly. Only quotes that are actually written count: re-polling an
+# unchanged quote is not a new observation.
+
+STATE_FIELDS = ("count", "mean", "m2", "ewma", "ewvar", "last_price")
+
+
+class TickerStats:
+    __slots__ = STATE_FIELDS
+
+    def __init__(
+        self, count=0, mean=0.0, m2=0.0, ewma=0.0, ewvar=0.0, last_price=None
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewvar = ewvar
+        self.last_price = last_price
+
+    def copy(self):
+        return TickerStats(**{field: getattr(self, field) for field in STATE_FIELDS})
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def update(self, value, alpha):
+        # Welford for the all-time mean/variance, West's incremental form for the
+        # exponentially weighted ones.
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if self.count == 1:
+            self.ewma, self.ewvar = value, 0.0
+            return
+        diff = value - self.ewma
+        increment = alpha * diff
+        self.ewma += increment
+        self.ewvar = (1 - alpha) * (self.ewvar + diff * increment)
+
+
+def _z(value, center, spread):
+    return (value - center) / spread if spread > 0 else 0.0
+
+
+class AnomalyDetector:
+    def __init__(self):
+        self._stats = {}
+        self._dirty = set()
+        self.restored = False
+
+    async def restore(self, state_collection):
+        # Tickers already observed since startup keep their live state.
+        restored = 0
+        async for doc in state_collection.find({}):
+            if doc["_id"] in self._stats:
+                continue
+            self._stats[doc["_id"]] = TickerStats(
+                **{field: doc[field] for field in STATE_FIELDS if field in doc}
+            )
+            restored += 1
+        self.restored = True
+        return restored
+
+    def score(self, stock):
+        # Scores a quote without touching the detector. Returns the anomaly summary
+        # published on the stock document and the updated statistics, which the
+        # caller hands to commit() once the quote is actually stored: a quote whose
+        # write fails must not count as an observation. Scores are taken against
+        # the statistics *before* this quote, so an outlier can't dampen its own
+        # score.
+        ticker = stock["ticker"].upper()
+        price = float(stock["price"])
+        current = self._stats.get(ticker)
+        stats = current.copy() if current else TickerStats()
+
+        previous = stats.last_price
+        stats.last_price = price
+        if not previous:
+            return None, (ticker, stats)
+
+        move = (price - previous) / previous
+        z_score = _z(move, stats.ewma, math.sqrt(stats.ewvar))
+        welford_z = _z(move, stats.mean, stats.std)
+        flagged = (
+            stats.count >= env.ANOMALY_MIN_SAMPLES
+            and abs(z_score) >= env.ANOMALY_Z_THRESHOLD
+        )
+        stats.update(move, env.ANOMALY_EWMA_ALPHA)
+
+        return {
+            "move": move,
+            "previous_price": previous,
+            "z_score": round(z_score, 4),
+            "welford_z_score": round(welford_z, 4),
+            "ewma": stats.ewma,
+            "mean": stats.mean,
+            "std": stats.std,
+            "samples": stats.count,
+            "threshold": env.ANOMALY_Z_THRESHOLD,
+            "flagged": flagged,
+        }, (ticker, stats)
+
+    def commit(self, update):
+        ticker, stats = update
+        self._stats[ticker] = stats
+        self._dirty.add(ticker)
+
+    def observe(self, stock):
+        anomaly, update = self.score(stock)
+        self.commit(update)
+        return anomaly
+
+    async def checkpoint(self, state_collection):
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        now = datetime.now(timezone.utc)
+        try:
+            await state_collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": ticker},
+                        {
+                            "$set": {
+                                **{
+                                    field: getattr(self._stats[ticker], field)
+                                    for field in STATE_FIELDS
+                                },
+                                "updated_at": now,
+                            }
+                        },
+                        upsert=True,
+                    )
+                    for ticker in dirty
+                ],
+                ordered=False,
+            )
+        except Exception:
+            self._dirty |= dirty
+            raise
+        return len(dirty)
+
+
+async def log_checkpoint_error(logger, message, error):
+    ANOMALY_CHECKPOINT_ERRORS.inc()
+    try:
+        await logger.log(
+            service="AnomalyDetector",
+            status="error",
+            message=message,
+            metadata={"exception": repr(error)},
+        )
+    except Exception:
+        pass
+
+
+async def run_checkpoints(detector, state_collection, interval, logger):
+    # Restores the last checkpoint in the background so startup never waits on
+    # Mongo, and only starts writing checkpoints once that has succeeded.
+    while True:
+        try:
+            if not detector.restored:
+                await detector.restore(state_collection)
+            await detector.checkpoint(state_collection)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Dirty tickers stay dirty and go out with the next checkpoint.
+            await log_checkpoint_error(logger, "Anomaly checkpoint failed", e)
+        await asyncio.sleep(interval)
+
+
+anomaly_detector = AnomalyDetector()
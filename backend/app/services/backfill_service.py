@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import certifi
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
+
+from backend.app.config.config import settings as env
+from backend.app.database.database import client_options
+from backend.app.database.history_store import HistoryStore
+from backend.app.models.models_data import Stock
+from backend.app.models.mongo_logger import MongoLogger
+
+FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 20
+
+
+def detect_format(filename):
+    if filename and filename.lower().endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return "csv"
+
+
+def _records(stream, fmt):
+    # Yields (line number, record). NDJSON lines are yielded unparsed so that a
+    # bad line is reported as an invalid row instead of ending the import.
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def _parse(record):
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+    return record
+
+
+def _skip(records, count):
+    next(itertools.islice(records, count, count), None)
+
+
+def history_id(ticker, timestamp):
+    # Backfilled rows are keyed by (ticker, timestamp in ms): the _id index does the
+    # deduplication, so re-importing a file or resuming a job inserts nothing twice.
+    return f"{ticker}:{int(timestamp.timestamp() * 1000)}"
+
+
+class BackfillService:
+    def __init__(
+        self, history: HistoryStore, jobs_collection, log_collection: MongoLogger
+    ):
+        self._history = history
+        self._jobs_collection = jobs_collection
+        self._log_collection = log_collection
+
+    def _validate(self, record):
+        if "last_updated" not in record and "timestamp" in record:
+            record["last_updated"] = record.pop("timestamp")
+        if not record.get("last_updated"):
+            raise ValueError("missing timestamp")
+
+        stock = Stock.model_validate(record)
+        timestamp = stock.last_updated
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        ticker = stock.ticker.strip().upper()
+        return {
+            "_id": history_id(ticker, timestamp),
+            "ticker": ticker,
+            "price": stock.price,
+            "day_change": stock.day_change,
+            "timestamp": timestamp,
+        }
+
+    def _read_chunk(self, records, position, chunk_size):
+        # Runs in a worker thread: reading the upload and validating rows is CPU
+        # and disk work that would otherwise stall the event loop for a whole chunk.
+        docs, invalid = [], []
+        rows = 0
+        for line, record in itertools.islice(records, chunk_size):
+            rows += 1
+            try:
+                docs.append(self._validate(_parse(record)))
+            except (ValidationError, ValueError, TypeError) as e:
+                invalid.append({"row": position + rows, "line": line, "error": str(e)})
+        return docs, invalid, rows
+
+    async def import_stream(self, stream, fmt, job_id, chunk_size=None):
+        chunk_size = chunk_size or env.BACKFILL_CHUNK_SIZE
+        job = await self._jobs_collection.find_one({"_id": job_id}) or {}
+        if job.get("status") == "completed":
+            return job
+
+        report = {
+            "_id": job_id,
+            "format": fmt,
+            "status": "running",
+            "rows": job.get("rows", 0),
+            "inserted": job.get("inserted", 0),
+            "duplicates": job.get("duplicates", 0),
+            "invalid": job.get("invalid", 0),
+            "errors": job.get("errors", []),
+            "started_at": job.get("started_at", datetime.now(timezone.utc)),
+        }
+        resume_from = report["rows"]
+        started = time.perf_counter()
+
+        # The next chunk is parsed and validated while the previous one is being
+        # written; the checkpoint only advances once a chunk is written.
+        async def flush(task, rows, invalid):
+            inserted, duplicates = await task
+            report["rows"] += rows
+            report["inserted"] += inserted
+            report["duplicates"] += duplicates
+            report["invalid"] += len(invalid)
+            report["errors"].extend(
+                invalid[: MAX_REPORTED_ERRORS - len(report["errors"])]
+            )
+            report["updated_at"] = datetime.now(timezone.utc)
+            await self._jobs_collection.replace_one({"_id": job_id}, report, upsert=True)
+
+        records = _records(stream, fmt)
+        pending = None
+        try:
+            await asyncio.to_thread(_skip, records, resume_from)
+            position = resume_from
+            while True:
+                docs, invalid, rows = await asyncio.to_thread(
+                    self._read_chunk, records, position, chunk_size
+                )
+                position += rows
+                if pending:
+                    await flush(*pending)
+                    pending = None
+                if not rows:
+                    break
+                pending = (
+                    asyncio.ensure_future(self._history.append_many(docs)),
+                    rows,
+                    invalid,
+                )
+        except Exception as e:
+            await self._log_collection.log(
+                service="BackfillService",
+                status="error",
+                message="Backfill interrupted",
+                metadata={"job_id": job_id, "rows": report["rows"], "error": str(e)},
+            )
+            raise
+        finally:
+            # Also on cancellation (client gone, shutdown): no write may outlive
+            # the job and race a resumed run.
+            if pending:
+                pending[0].cancel()
+                await asyncio.gather(pending[0], return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        report["status"] = "completed"
+        report["seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round((position - resume_from) / elapsed, 1)
+        await self._jobs_collection.replace_one({"_id": job_id}, report, upsert=True)
+
+        await self._log_collection.log(
+            service="BackfillService",
+            status="success",
+            message="Backfill completed",
+            metadata={
+                "job_id": job_id,
+                "inserted": report["inserted"],
+                "duplicates": report["duplicates"],
+                "invalid": report["invalid"],
+            },
+        )
+        return report
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill history from a file.")
+    parser.add_argument("path", help="CSV or NDJSON file of historical quotes")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument(
+        "--job-id", help="Checkpoint key; defaults to the file name and size"
+    )
+    parser.add_argument("--chunk-size", type=int, default=env.BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.path)
+    job_id = args.job_id or (
+        f"{os.path.basename(args.path)}:{os.path.getsize(args.path)}"
+    )
+
+    client = AsyncIOMotorClient(
+        env.MONGO_URI, tlsCAFile=certifi.where(), **client_options()
+    )
+    db = client[env.DB_NAME]
+    service = BackfillService(
+        HistoryStore(
+            db[env.DB_HISTORY_COLLECTION], db[env.DB_HISTORY_BUCKETS_COLLECTION]
+        ),
+        db[env.DB_BACKFILL_JOBS_COLLECTION],
+        MongoLogger(db[env.DB_LOGS_COLLECTION]),
+    )
+    try:
+        with open(args.path, newline="", encoding="utf-8") as stream:
+            report = await service.import_stream(stream, fmt, job_id, args.chunk_size)
+    finally:
+        client.close()
+
+    print(
+        f"{job_id}: {report['inserted']} inserted, {report['duplicates']} duplicates, "
+        f"{report['invalid']} invalid ({report.get('rows_per_second')} rows/s)"
+    )
+    for error in report["errors"]:
+        print(f"  line {error.get('line', '?')}: {error['error']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
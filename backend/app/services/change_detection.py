@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+
+class QuoteChangeDetector:
+    def __init__(self):
+        self._last = {}
+        self._seeded = set()
+
+    async def seed(self, stock_collection, tickers):
+        missing = [t for t in tickers if t and t not in self._seeded]
+        if not missing:
+            return
+
+        cursor = stock_collection.find(
+            {"ticker": {"$in": missing}}, {"ticker": 1, "price": 1, "day_change": 1}
+        )
+        async for doc in cursor:
+            self._last.setdefault(doc["ticker"], (doc["price"], doc["day_change"]))
+        self._seeded.update(missing)
+
+    def has_changed(self, stock):
+        return self._last.get(stock["ticker"]) != (stock["price"], stock["day_change"])
+
+    def record(self, stock):
+        self._last[stock["ticker"]] = (stock["price"], stock["day_change"])
+        self._seeded.add(stock["ticker"])
+
+    async def mark_checked(self, stock_collection, stocks):
+        # Only touch last_checked when the stored quote still matches what we
+        # remember; another worker may have written a newer one since. Returns
+        # the stocks whose stored quote diverged and therefore need a full write.
+        if not stocks:
+            return []
+
+        now = datetime.now(timezone.utc)
+        result = await stock_collection.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "ticker": s["ticker"],
+                        "price": s["price"],
+                        "day_change": s["day_change"],
+                    },
+                    {"$set": {"last_checked": now}},
+                )
+                for s in stocks
+            ],
+            ordered=False,
+        )
+        if result.matched_count == len(stocks):
+            return []
+
+        current = {}
+        cursor = stock_collection.find(
+            {"ticker": {"$in": [s["ticker"] for s in stocks]}},
+            {"ticker": 1, "price": 1, "day_change": 1},
+        )
+        async for doc in cursor:
+            current[doc["ticker"]] = (doc["price"], doc["day_change"])
+
+        diverged = []
+        for stock in stocks:
+            if current.get(stock["ticker"]) != (stock["price"], stock["day_change"]):
+                self._last.pop(stock["ticker"], None)
+                diverged.append(stock)
+        return diverged
+
+
+change_detector = QuoteChangeDetector()
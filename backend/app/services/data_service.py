@@ -1,35 +1,99 @@
-from datetime import datetime, timezone
-import time
+from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 from fastapi.encoders import jsonable_encoder
-import httpx
 from backend.app.config.config import settings as env
-import time
-from google import genai
-from google.genai import types
 
+from backend.app.database.history_store import HistoryStore
+from backend.app.database.quote_store import QuoteStore
 from backend.app.models.models_data import Stock
 from backend.app.models.mongo_logger import MongoLogger
+from backend.app.monitoring.metrics import ANOMALY_FLAGS, ETL_ITEMS, ETL_QUOTE_WRITES
+from backend.app.services import export_service
+from backend.app.services.anomaly_detection import AnomalyDetector
+from backend.app.services.change_detection import QuoteChangeDetector
+from backend.app.services.etl_ledger import EtlLedger, EtlRun
+from backend.app.services.providers import (
+    CircuitOpen,
+    GeminiProvider,
+    StockDataProvider,
+    gemini_provider,
+    stockdata_provider,
+)
+from backend.app.services.retry_queue import RetryQueue, is_transient
+
+
+def _epoch(value):
+    if not isinstance(value, datetime):
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
 
 
 class DataService:
     def __init__(
-        self, stock_collection, log_collection: MongoLogger, history_collection
+        self,
+        stock_collection,
+        log_collection: MongoLogger,
+        history_collection,
+        quote_store: QuoteStore = None,
+        change_detector: QuoteChangeDetector = None,
+        history_buckets_collection=None,
+        stock_analytics_collection=None,
+        etl_runs_collection=None,
+        retry_queue: RetryQueue = None,
+        quote_provider: StockDataProvider = None,
+        ai_provider: GeminiProvider = None,
+        anomaly_detector: AnomalyDetector = None,
+        anomaly_flags_collection=None,
+        history_analytics_collection=None,
+        history_buckets_analytics_collection=None,
     ):
         self._stock_collection = stock_collection
+        self._stock_analytics_collection = (
+            stock_collection
+            if stock_analytics_collection is None
+            else stock_analytics_collection
+        )
         self._log_collection = log_collection
         self._history_collection = history_collection
-        self.BASE_URL = "https://api.stockdata.org/v1/data/quote"
+        self._history = HistoryStore(
+            history_collection,
+            history_buckets_collection,
+            rows_reads=history_analytics_collection,
+            buckets_reads=history_buckets_analytics_collection,
+        )
+        self._quotes = quote_store or QuoteStore()
+        self._changes = change_detector or QuoteChangeDetector()
+        self._ledger = EtlLedger(etl_runs_collection)
+        self._retry_queue = retry_queue
+        self._quote_provider = quote_provider or stockdata_provider
+        self._ai_provider = ai_provider or gemini_provider
+        self._anomalies = anomaly_detector or AnomalyDetector()
+        self._anomaly_flags_collection = anomaly_flags_collection
 
     async def run_etl_ticker(self, ticker: str):
+        run = self._ledger.start("ticker", [ticker])
         try:
-            response = httpx.get(
-                self.BASE_URL, params={"symbols": ticker, "api_token": env.STOCK_DATA}
-            )
-            response.raise_for_status()
-            data = response.json()
+            return await self._run_etl_ticker(ticker, run)
         except Exception as e:
-            await self._log_collection.log(
+            run.error = str(e)
+            raise
+        finally:
+            await self._ledger.finish(run)
+
+    async def _run_etl_ticker(self, ticker: str, run: EtlRun):
+        try:
+            with run.stage("fetch"):
+                data = await self._quote_provider.fetch_quotes([ticker])
+        except CircuitOpen as e:
+            stored = await self._stored_fallback([ticker], run, e)
+            return stored[0] if stored else None
+        except Exception as e:
+            run.error = "HTTP request failed"
+            await self._enqueue_retry([ticker], e)
+            await self._log(
+                run,
                 service="DataService",
                 status="error",
                 message="HTTP request failed",
@@ -38,7 +102,9 @@ class DataService:
             return None
 
         if not data.get("data"):
-            await self._log_collection.log(
+            run.error = "No data returned from API"
+            await self._log(
+                run,
                 service="DataService",
                 status="error",
                 message="No data returned from API",
@@ -49,32 +115,48 @@ class DataService:
         item = data["data"][0]
 
         try:
-            stock_obj = Stock(
-                ticker=item["ticker"],
-                name=item["name"],
-                currency=item["currency"],
-                price=float(item["price"]),
-                day_change=float(item["day_change"]),
-                last_updated=datetime.now(timezone.utc),
-            )
-            stock_dict = stock_obj.model_dump()
+            with run.stage("validate"):
+                stock_obj = Stock(
+                    ticker=item["ticker"],
+                    name=item["name"],
+                    currency=item["currency"],
+                    price=float(item["price"]),
+                    day_change=float(item["day_change"]),
+                    last_updated=datetime.now(timezone.utc),
+                )
+                stock_dict = stock_obj.model_dump()
 
-            await self._history_collection.insert_one(
-                {
-                    "ticker": stock_dict["ticker"],
-                    "price": stock_dict["price"],
-                    "day_change": stock_dict["day_change"],
-                    "timestamp": datetime.now(timezone.utc),
-                }
-            )
+            with run.stage("compare"):
+                await self._changes.seed(
+                    self._stock_collection, [stock_dict["ticker"]]
+                )
+                changed = self._changes.has_changed(stock_dict)
+            if not changed:
+                if not await self._skip_unchanged([stock_dict], run):
+                    return stock_dict
+
+            anomaly = self._score_anomaly(stock_dict, run)
+
+            with run.stage("history"):
+                await self._history.append(
+                    stock_dict["ticker"],
+                    stock_dict["price"],
+                    stock_dict["day_change"],
+                    datetime.now(timezone.utc),
+                )
 
-            await self._stock_collection.update_one(
-                {"ticker": stock_dict["ticker"]},
-                {"$set": stock_dict},
-                upsert=True,
-            )
+            with run.stage("upsert"):
+                await self._stock_collection.update_one(
+                    {"ticker": stock_dict["ticker"]},
+                    {"$set": stock_dict},
+                    upsert=True,
+                )
+            self._changes.record(stock_dict)
+            await self._commit_anomaly(stock_dict, anomaly, run)
+            ETL_QUOTE_WRITES.inc(result="written")
 
-            await self._log_collection.log(
+            await self._log(
+                run,
                 service="DataService",
                 status="success",
                 message="Stock ETL completed",
@@ -85,10 +167,17 @@ class DataService:
                 },
             )
 
+            self._quotes.put(stock_dict)
+            ETL_ITEMS.inc(outcome="success")
+            run.succeeded += 1
             return stock_dict
 
         except Exception as e:
-            await self._log_collection.log(
+            ETL_ITEMS.inc(outcome="failed")
+            run.failed += 1
+            await self._enqueue_retry([ticker], e)
+            await self._log(
+                run,
                 service="DataService",
                 status="error",
                 message="ETL failed while processing ticker",
@@ -97,17 +186,26 @@ class DataService:
             return None
 
     async def run_etl_tickers(self, tickers: list[str]):
-        tickers_str = ",".join(tickers)
+        run = self._ledger.start("bulk", tickers)
+        try:
+            return await self._run_etl_tickers(tickers, run)
+        except Exception as e:
+            run.error = str(e)
+            raise
+        finally:
+            await self._ledger.finish(run)
 
+    async def _run_etl_tickers(self, tickers: list[str], run: EtlRun):
         try:
-            response = httpx.get(
-                self.BASE_URL,
-                params={"symbols": tickers_str, "api_token": env.STOCK_DATA},
-            )
-            response.raise_for_status()
-            data = response.json()
+            with run.stage("fetch"):
+                data = await self._quote_provider.fetch_quotes(tickers, "quote_bulk")
+        except CircuitOpen as e:
+            return await self._stored_fallback(tickers, run, e)
         except Exception as e:
-            await self._log_collection.log(
+            run.error = "Bulk ETL HTTP request failed"
+            await self._enqueue_retry(tickers, e)
+            await self._log(
+                run,
                 service="DataService",
                 status="error",
                 message="Bulk ETL HTTP request failed",
@@ -116,7 +214,9 @@ class DataService:
             return []
 
         if not data.get("data"):
-            await self._log_collection.log(
+            run.error = "No data returned for bulk ETL"
+            await self._log(
+                run,
                 service="DataService",
                 status="error",
                 message="No data returned for bulk ETL",
@@ -125,56 +225,220 @@ class DataService:
             return []
 
         stocks_list = []
+        unchanged = []
+
+        with run.stage("compare"):
+            await self._changes.seed(
+                self._stock_collection, [item.get("ticker") for item in data["data"]]
+            )
 
         for item in data["data"]:
             try:
-                stock_obj = Stock(
-                    ticker=item["ticker"],
-                    name=item["name"],
-                    currency=item["currency"],
-                    price=float(item["price"]),
-                    day_change=float(item["day_change"]),
-                    last_updated=datetime.now(timezone.utc),
-                )
-                stock_dict = stock_obj.model_dump()
-
-                await self._history_collection.insert_one(
-                    {
-                        "ticker": stock_dict["ticker"],
-                        "price": stock_dict["price"],
-                        "day_change": stock_dict["day_change"],
-                        "timestamp": datetime.now(timezone.utc),
-                    }
-                )
-
-                result = await self._stock_collection.update_one(
-                    {"ticker": stock_dict["ticker"]}, {"$set": stock_dict}, upsert=True
-                )
+                with run.stage("validate"):
+                    stock_obj = Stock(
+                        ticker=item["ticker"],
+                        name=item["name"],
+                        currency=item["currency"],
+                        price=float(item["price"]),
+                        day_change=float(item["day_change"]),
+                        last_updated=datetime.now(timezone.utc),
+                    )
+                    stock_dict = stock_obj.model_dump()
+
+                if not self._changes.has_changed(stock_dict):
+                    unchanged.append(stock_dict)
+                    continue
+
+                await self._save_bulk_stock(stock_dict, run)
+                stocks_list.append(stock_dict)
 
-                await self._log_collection.log(
+            except Exception as e:
+                ETL_ITEMS.inc(outcome="failed")
+                run.failed += 1
+                await self._enqueue_retry([item.get("ticker")], e)
+                await self._log(
+                    run,
                     service="DataService",
-                    status="success",
-                    message="Processed tickers",
-                    metadata={
-                        "ticker": stock_dict["ticker"],
-                        "saved_id": (
-                            str(result.upserted_id) if result.upserted_id else "updated"
-                        ),
-                    },
+                    status="error",
+                    message="Bulk ETL failed for ticker",
+                    metadata={"ticker": item.get("ticker"), "exception": str(e)},
                 )
 
-                stocks_list.append(stock_dict)
+        diverged = await self._skip_unchanged(unchanged, run)
+        stocks_list.extend(s for s in unchanged if s not in diverged)
 
+        for stock_dict in diverged:
+            try:
+                await self._save_bulk_stock(stock_dict, run)
+                stocks_list.append(stock_dict)
             except Exception as e:
-                await self._log_collection.log(
+                ETL_ITEMS.inc(outcome="failed")
+                run.failed += 1
+                await self._enqueue_retry([stock_dict["ticker"]], e)
+                await self._log(
+                    run,
                     service="DataService",
                     status="error",
                     message="Bulk ETL failed for ticker",
-                    metadata={"ticker": item.get("ticker"), "exception": str(e)},
+                    metadata={"ticker": stock_dict["ticker"], "exception": str(e)},
                 )
 
         return stocks_list
 
+    async def _save_bulk_stock(self, stock_dict, run: EtlRun):
+        anomaly = self._score_anomaly(stock_dict, run)
+
+        with run.stage("history"):
+            await self._history.append(
+                stock_dict["ticker"],
+                stock_dict["price"],
+                stock_dict["day_change"],
+                datetime.now(timezone.utc),
+            )
+
+        with run.stage("upsert"):
+            result = await self._stock_collection.update_one(
+                {"ticker": stock_dict["ticker"]}, {"$set": stock_dict}, upsert=True
+            )
+        self._changes.record(stock_dict)
+        await self._commit_anomaly(stock_dict, anomaly, run)
+        ETL_QUOTE_WRITES.inc(result="written")
+
+        await self._log(
+            run,
+            service="DataService",
+            status="success",
+            message="Processed tickers",
+            metadata={
+                "ticker": stock_dict["ticker"],
+                "saved_id": (
+                    str(result.upserted_id) if result.upserted_id else "updated"
+                ),
+            },
+        )
+
+        self._quotes.put(stock_dict)
+        ETL_ITEMS.inc(outcome="success")
+        run.succeeded += 1
+
+    async def _skip_unchanged(self, stocks, run: EtlRun):
+        # Quotes identical to the last persisted ones only bump last_checked:
+        # no history row, no full upsert, no success log. Returns the ones that
+        # turned out to need a real write after all.
+        try:
+            with run.stage("compare"):
+                diverged = await self._changes.mark_checked(
+                    self._stock_collection, stocks
+                )
+        except Exception:
+            return list(stocks)
+
+        for stock in stocks:
+            if stock in diverged:
+                continue
+            ETL_QUOTE_WRITES.inc(result="skipped")
+            self._quotes.put(stock)
+            ETL_ITEMS.inc(outcome="success")
+            run.succeeded += 1
+            run.skipped += 1
+        return diverged
+
+    async def _enqueue_retry(self, tickers, error):
+        # Only failures that may go away on their own are retried. Permanent ones
+        # (unknown symbol, invalid quote) are just logged, so arbitrary tickers
+        # posted to the public ETL endpoints can't grow the queue.
+        if self._retry_queue is None or not is_transient(error):
+            return
+        try:
+            await self._retry_queue.enqueue(tickers, str(error))
+        except Exception as e:
+            await self._log_collection.log(
+                service="DataService",
+                status="error",
+                message="Could not enqueue tickers for retry",
+                metadata={"tickers": tickers, "exception": str(e)},
+            )
+
+    def _score_anomaly(self, stock_dict, run: EtlRun):
+        # Published on the stock document by the upsert that follows; the
+        # statistics only take the quote in once that upsert has succeeded.
+        with run.stage("anomaly"):
+            anomaly, update = self._anomalies.score(stock_dict)
+        if anomaly is not None:
+            stock_dict["anomaly"] = anomaly
+        return update
+
+    async def _commit_anomaly(self, stock_dict, update, run: EtlRun):
+        self._anomalies.commit(update)
+        anomaly = stock_dict.get("anomaly")
+        if anomaly is None or not anomaly["flagged"]:
+            return
+
+        ANOMALY_FLAGS.inc()
+        if self._anomaly_flags_collection is None:
+            return
+        try:
+            with run.stage("anomaly"):
+                await self._anomaly_flags_collection.insert_one(
+                    {
+                        "ticker": stock_dict["ticker"].upper(),
+                        "price": stock_dict["price"],
+                        "day_change": stock_dict["day_change"],
+                        **{k: v for k, v in anomaly.items() if k != "flagged"},
+                        "flagged_at": datetime.now(timezone.utc),
+                    }
+                )
+        except Exception as e:
+            await self._log(
+                run,
+                service="DataService",
+                status="error",
+                message="Could not record anomaly flag",
+                metadata={"ticker": stock_dict["ticker"], "exception": str(e)},
+            )
+
+    async def anomaly_flags(self, tickers=None, since=None, limit=100):
+        query = {}
+        if tickers:
+            query["ticker"] = {"$in": [t.upper() for t in tickers]}
+        if since:
+            query["flagged_at"] = {"$gte": since}
+
+        cursor = (
+            self._anomaly_flags_collection.find(query)
+            .sort("flagged_at", -1)
+            .limit(limit)
+        )
+        flags = []
+        async for flag in cursor:
+            flag["_id"] = str(flag["_id"])
+            flags.append(flag)
+        return flags
+
+    async def _stored_fallback(self, tickers, run: EtlRun, error: CircuitOpen):
+        # The provider is known to be down: serve the last stored quotes, marked
+        # stale, instead of waiting on it. The tickers still go to the retry queue.
+        run.error = str(error)
+        await self._enqueue_retry(tickers, error)
+
+        cursor = self._stock_collection.find(
+            {"ticker": {"$in": [t.upper() for t in tickers]}}, {"_id": 0}
+        )
+        stocks = [{**doc, "stale": True} async for doc in cursor]
+        ETL_ITEMS.inc(len(stocks), outcome="fallback")
+        await self._log(
+            run,
+            service="DataService",
+            status="warning",
+            message="Quote provider unavailable, served stored quotes",
+            metadata={"tickers": tickers, "exception": str(error)},
+        )
+        return stocks
+
+    async def _log(self, run: EtlRun, **kwargs):
+        with run.stage("logging"):
+            await self._log_collection.log(**kwargs)
+
     async def run_etl_video_generation(self, ticker):
 
         processed = await self.run_etl_ticker(ticker)
@@ -191,8 +455,6 @@ class DataService:
         day_change = processed["day_change"]
         name = processed["name"]
 
-        client = genai.Client(api_key=env.GOOGLE_API_KEY)
-
         if day_change < 0:
             prompt = f"""Crash day. The Wall Street trading floor is in utter panic. People are seen on the floor with faces of terror and desperation, yelling and holding their heads. Monitors show a {day_change} drop in {name} stock value, bright red and blinking. The atmosphere is chaotic and frenetic. The camera zooms in on the face of a young, sweaty trader who looks like he has lost everything. Documentary film style, with grain and high energy."""
 
@@ -201,20 +463,7 @@ class DataService:
             Boom day. The Wall Street trading floor is in absolute euphoria. Traders are shouting for joy, hugging each other, throwing papers into the air, and pumping their fists triumphantly. Large monitors everywhere are flashing green, showing '{name} + {day_change}'. The atmosphere is loud, celebratory, and triumphant. The camera zooms in on the face of a successful young trader smiling and cheering, celebrating a massive, unexpected win. Cinematic documentary film style, high contrast, vibrant green glow reflecting on faces, high energy.
             """
         try:
-            operation = client.models.generate_videos(
-                model="veo-3.1-generate-preview",
-                prompt=prompt,
-                config=types.GenerateVideosConfig(
-                    number_of_videos=1, resolution="720p", aspect_ratio="16:9"
-                ),
-            )
-
-            while not operation.done:
-                time.sleep(10)
-                operation = client.operations.get(operation)
-
-            generated_video = operation.response.generated_videos[0]
-            client.files.download(file=generated_video.video)
+            generated_video = await self._ai_provider.generate_video(prompt)
             video_path = (
                 f"backend/app/videos/video_{ticker}_{datetime.now().date()}.mp4"
             )
@@ -238,8 +487,88 @@ class DataService:
             )
             return None
 
+    async def get_quotes(self, tickers: list[str]):
+        tickers = [t.upper() for t in tickers]
+        if not self._quotes.enabled:
+            return await self.run_etl_tickers(tickers)
+
+        quotes = {}
+        stale = {}
+        for ticker in tickers:
+            quote = self._quotes.read(ticker)
+            if quote and self._quotes.is_fresh(quote, env.QUOTE_CACHE_TTL_SECONDS):
+                quotes[ticker] = quote
+            else:
+                stale[ticker] = quote["last_updated"].timestamp() if quote else 0
+
+        # Only the worker holding a ticker's lock goes upstream for it; everyone
+        # else waits for that worker to publish the refreshed quote.
+        claimed = [t for t in stale if self._quotes.claim(t)]
+        try:
+            if claimed:
+                for stock in await self.run_etl_tickers(claimed):
+                    quotes[stock["ticker"].upper()] = stock
+        finally:
+            for ticker in claimed:
+                self._quotes.release(ticker)
+
+        for ticker, since in stale.items():
+            if ticker in claimed:
+                continue
+            quote = await self._quotes.wait_for_update(
+                ticker, since, env.QUOTE_CACHE_WAIT_SECONDS
+            )
+            if quote:
+                quotes[ticker] = quote
+
+        return [quotes[t] for t in tickers if t in quotes]
+
+    async def get_quote(self, ticker: str):
+        if not self._quotes.enabled:
+            return await self.run_etl_ticker(ticker)
+
+        quotes = await self.get_quotes([ticker])
+        return quotes[0] if quotes else None
+
+    async def watchlist_quotes(self, tickers: list[str]):
+        # One $in query on the ticker index; only missing or stale tickers go
+        # through a single batched refresh.
+        tickers = [t.upper() for t in tickers]
+        found = {}
+        cursor = self._stock_collection.find({"ticker": {"$in": tickers}}, {"_id": 0})
+        async for stock in cursor:
+            found[stock["ticker"].upper()] = stock
+
+        now = datetime.now(timezone.utc).timestamp()
+        stale = []
+        for ticker in tickers:
+            stock = found.get(ticker)
+            checked = stock and max(
+                _epoch(stock.get("last_updated")), _epoch(stock.get("last_checked"))
+            )
+            if not checked or now - checked > env.DASHBOARD_MAX_AGE_SECONDS:
+                stale.append(ticker)
+
+        if stale:
+            for stock in await self.get_quotes(stale):
+                stock = dict(stock)
+                stock.pop("_id", None)
+                found[stock["ticker"].upper()] = stock
+
+        return [found[t] for t in tickers if t in found]
+
     async def stock_results(self, ticker: str):
-        return await self._stock_collection.find_one({"ticker": ticker})
+        # Served from the shared quote table while the quote is within
+        # QUOTE_CACHE_TTL_SECONDS. A table hit carries the quote fields only; the
+        # stored document (_id, last_checked, anomaly) is read on a miss.
+        cached = self._quotes.read(ticker)
+        if cached and self._quotes.is_fresh(cached, env.QUOTE_CACHE_TTL_SECONDS):
+            return cached
+
+        stock = await self._stock_collection.find_one({"ticker": ticker})
+        if stock:
+            self._quotes.put(stock)
+        return stock
 
     async def stock_history(self, ticker: str):
 
@@ -251,7 +580,7 @@ class DataService:
         return resultados
 
     async def market_summary(self, tickers):
-        stocks = await self.run_etl_tickers(tickers)
+        stocks = await self.get_quotes(tickers)
 
         if not stocks:
             await self._log_collection.log(
@@ -276,8 +605,76 @@ class DataService:
             "top_loser": min(stocks, key=lambda x: x["day_change"]),
         }
 
+    async def stored_market_summary(
+        self, tickers=None, by_currency=False, max_age_seconds=None
+    ):
+        # Reads what the ETL already stored: one $match/$sort/$group pass on the
+        # server, no upstream call and no writes.
+        match = {}
+        if tickers:
+            match["ticker"] = {"$in": tickers}
+        if max_age_seconds:
+            # Unchanged quotes only bump last_checked, so either field proves the
+            # stored price is recent.
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+            match["$or"] = [
+                {"last_updated": {"$gte": cutoff}},
+                {"last_checked": {"$gte": cutoff}},
+            ]
+
+        quote = {
+            "ticker": "$ticker",
+            "name": "$name",
+            "currency": "$currency",
+            "price": "$price",
+            "day_change": "$day_change",
+            "last_updated": "$last_updated",
+        }
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"day_change": -1}},
+            {
+                "$group": {
+                    "_id": "$currency" if by_currency else None,
+                    "count": {"$sum": 1},
+                    "average_price": {"$avg": "$price"},
+                    "average_day_change": {"$avg": "$day_change"},
+                    "top_gainer": {"$first": quote},
+                    "top_loser": {"$last": quote},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+        groups = [
+            group
+            async for group in self._stock_analytics_collection.aggregate(pipeline)
+            if group["count"]
+        ]
+
+        if by_currency:
+            return {
+                "tickers": tickers or [],
+                "groups": [
+                    {"currency": group.pop("_id"), **group} for group in groups
+                ],
+            }
+
+        if not groups:
+            return {
+                "tickers": tickers or [],
+                "count": 0,
+                "average_price": 0,
+                "average_day_change": 0,
+                "top_gainer": None,
+                "top_loser": None,
+            }
+
+        group = groups[0]
+        group.pop("_id")
+        return {"tickers": tickers or [], **group}
+
     async def ai_correlation(self, ticker):
-        stock = await self.run_etl_ticker(ticker)
+        stock = await self.get_quote(ticker)
         if not stock:
             return None
 
@@ -288,24 +685,16 @@ class DataService:
         Generate a SHORT insight: trend, sentiment and possible causes.
         """
 
-        client = genai.Client(api_key=env.GOOGLE_API_KEY)
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-        )
+        analysis = await self._ai_provider.generate_content(prompt)
 
         return {
             "ticker": ticker,
             "stock_data": stock,
-            "ai_analysis": response.text,
+            "ai_analysis": analysis,
         }
 
     async def trend_analysis(self, tickers):
-        stocks = []
-        for ticker in tickers:
-            s = await self.run_etl_ticker(ticker)
-            if s:
-                stocks.append(s)
+        stocks = await self.get_quotes(tickers)
 
         if not stocks:
             await self._log_collection.log(
@@ -323,16 +712,16 @@ class DataService:
         }
 
     async def analytics_history(self, ticker: str):
+        return await self._history.read(ticker)
 
-        cursor = self._history_collection.find({"ticker": ticker}).sort("timestamp", -1)
-
-        resultados = []
-        async for entry in cursor:
-            resultados.append(entry)
-        return resultados
+    def export_history(self, tickers, fmt, since=None, until=None, batch_size=None):
+        batches = self._history.iter_batches(
+            tickers, since, until, batch_size or env.EXPORT_BATCH_SIZE
+        )
+        return export_service.encode(batches, fmt)
 
     async def ai_prediction(self, ticker):
-        stock = await self.run_etl_ticker(ticker)
+        stock = await self.get_quote(ticker)
         if not stock:
             return None
 
@@ -344,16 +733,12 @@ class DataService:
         Predict if tomorrow the stock is likely to go UP or DOWN and explain why.
         """
 
-        client = genai.Client(api_key=env.GOOGLE_API_KEY)
-        result = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-        )
+        prediction = await self._ai_provider.generate_content(prompt)
 
         return {
             "ticker": ticker,
             "price": stock["price"],
-            "prediction": result.text,
+            "prediction": prediction,
         }
 
     async def log_history(self, db):
@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from backend.app.monitoring.metrics import ETL_STAGE_DURATION
+
+STAGES = ("fetch", "validate", "compare", "anomaly", "history", "upsert", "logging")
+MAX_RECORDED_TICKERS = 50
+
+
+class EtlRun:
+    def __init__(self, kind, tickers):
+        self.id = ObjectId()
+        self.kind = kind
+        self.tickers = list(tickers)
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.error = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages[name] += elapsed
+            ETL_STAGE_DURATION.observe(elapsed, stage=name)
+
+    @property
+    def status(self):
+        if self.error or (self.failed and not self.succeeded):
+            return "failed"
+        if self.failed:
+            return "partial"
+        return "success"
+
+    def record(self):
+        duration = time.perf_counter() - self._started
+        return {
+            "_id": self.id,
+            "kind": self.kind,
+            "tickers": self.tickers[:MAX_RECORDED_TICKERS],
+            "ticker_count": len(self.tickers),
+            "status": self.status,
+            "error": self.error,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "started_at": self.started_at,
+            "finished_at": self.started_at + timedelta(seconds=duration),
+            "duration_ms": round(duration * 1000, 3),
+            "stages_ms": {k: round(v * 1000, 3) for k, v in self.stages.items()},
+        }
+
+
+class EtlLedger:
+    def __init__(self, collection=None):
+        self.collection = collection
+
+    def start(self, kind, tickers):
+        return EtlRun(kind, tickers)
+
+    async def finish(self, run):
+        if self.collection is None:
+            return None
+        record = run.record()
+        try:
+            await self.collection.insert_one(record)
+        except Exception:
+            # The ledger is diagnostics; never fail an ETL run because of it.
+            return None
+        return record
+
+    async def list_runs(
+        self, since=None, until=None, status=None, order="slowest", limit=50
+    ):
+        query = {}
+        if since or until:
+            query["started_at"] = {}
+            if since:
+                query["started_at"]["$gte"] = since
+            if until:
+                query["started_at"]["$lt"] = until
+        if status:
+            query["status"] = status
+
+        sort = [("duration_ms", -1)] if order == "slowest" else [("started_at", -1)]
+        cursor = self.collection.find(query).sort(sort).limit(limit)
+
+        runs = []
+        async for run in cursor:
+            run["_id"] = str(run["_id"])
+            runs.append(run)
+        return runs
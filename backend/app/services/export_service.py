@@ -0,0 +1,130 @@
+import csv
+import io
+from datetime import timezone
+from functools import cache
+
+# format -> (media type, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+COLUMNS = ("ticker", "timestamp", "price", "day_change")
+
+
+@cache
+def load_pyarrow():
+    # pyarrow is an optional extra (`uv sync --extra export`); CSV works without it.
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    return pyarrow
+
+
+def format_available(fmt):
+    if fmt not in FORMATS:
+        return False
+    if fmt == "csv":
+        return True
+    try:
+        load_pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def _utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    # File-like target for pyarrow writers; whatever they write between two
+    # drain() calls is handed to the response and then forgotten.
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _encode_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow(
+                (
+                    row["ticker"],
+                    _utc(row["timestamp"]).isoformat(),
+                    row["price"],
+                    row["day_change"],
+                )
+            )
+        yield buffer.getvalue().encode()
+
+
+def _record_batch(pa, schema, batch):
+    return pa.record_batch(
+        [
+            pa.array([r["ticker"] for r in batch], pa.string()),
+            pa.array([_utc(r["timestamp"]) for r in batch], schema.field("timestamp").type),
+            pa.array([r["price"] for r in batch], pa.float64()),
+            pa.array([r["day_change"] for r in batch], pa.float64()),
+        ],
+        schema=schema,
+    )
+
+
+async def _encode_arrow(batches, fmt):
+    pa = load_pyarrow()
+    schema = pa.schema(
+        [
+            ("ticker", pa.string()),
+            ("timestamp", pa.timestamp("ms", tz="UTC")),
+            ("price", pa.float64()),
+            ("day_change", pa.float64()),
+        ]
+    )
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        # One row group per batch; the footer is written on close.
+        writer = pa.parquet.ParquetWriter(sink, schema)
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+
+    try:
+        async for batch in batches:
+            write(_record_batch(pa, schema, batch))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def encode(batches, fmt):
+    if fmt == "csv":
+        return _encode_csv(batches)
+    return _encode_arrow(batches, fmt)
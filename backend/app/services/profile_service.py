@@ -0,0 +1,50 @@
+from bson import ObjectId
+from backend.app.config.config import settings as env
+from backend.app.models.mongo_logger import MongoLogger
+
+
+class ProfileService:
+    def __init__(self, collection, log_collection: MongoLogger):
+        self.collection = collection
+        self._log_collection = log_collection
+
+    async def save_profile(self, profile: dict):
+        try:
+            await self.collection.insert_one(profile)
+
+            cursor = (
+                self.collection.find({}, {"_id": 1})
+                .sort("created_at", -1)
+                .skip(env.PROFILING_RETENTION)
+            )
+            expired = [doc["_id"] async for doc in cursor]
+            if expired:
+                await self.collection.delete_many({"_id": {"$in": expired}})
+
+            return profile
+        except Exception as e:
+            await self._log_collection.log(
+                service="ProfileService",
+                status="error",
+                message="Profile could not be stored",
+                metadata={"path": profile.get("path"), "error": str(e)},
+            )
+            return None
+
+    async def list_profiles(self, limit: int = 50):
+        cursor = (
+            self.collection.find({}, {"folded": 0})
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+
+        profiles = []
+        async for profile in cursor:
+            profile["_id"] = str(profile["_id"])
+            profiles.append(profile)
+        return profiles
+
+    async def get_profile(self, profile_id: str):
+        if not ObjectId.is_valid(profile_id):
+            return None
+        return await self.collection.find_one({"_id": ObjectId(profile_id)})
@@ -0,0 +1,343 @@
+import asyncio
+import time
+from collections import deque
+from functools import cache
+
+import httpx
+
+from backend.app.config.config import settings as env
+from backend.app.monitoring.instrumentation import track_upstream
+from backend.app.monitoring.metrics import (
+    CIRCUIT_REJECTED,
+    CIRCUIT_STATE,
+    UPSTREAM_HEDGES,
+)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+@cache
+def load_genai():
+    # google.genai pulls in a large dependency tree; only pay for it on the first
+    # AI or video request instead of on every worker start.
+    from google import genai
+    from google.genai import types
+
+    return genai, types
+
+
+class CircuitOpen(Exception):
+    def __init__(self, provider, retry_after, operation=None):
+        super().__init__(f"{provider} is unavailable (circuit open)")
+        self.provider = provider
+        self.operation = operation
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    # closed: calls go through, and `failure_threshold` consecutive failures open
+    # the circuit. open: calls fail fast with CircuitOpen for `reset_timeout`
+    # seconds. half_open: a single probe call goes through; its success closes the
+    # circuit and its failure opens it again.
+
+    def __init__(
+        self,
+        name,
+        failure_threshold,
+        reset_timeout,
+        clock=time.monotonic,
+        operation="",
+    ):
+        self.name = name
+        self.operation = operation
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._set(CLOSED)
+
+    def _set(self, state):
+        self.state = state
+        CIRCUIT_STATE.set(
+            STATE_VALUES[state], provider=self.name, operation=self.operation
+        )
+
+    def before_call(self):
+        if self.state == OPEN:
+            remaining = self.opened_at + self.reset_timeout - self.clock()
+            if remaining > 0:
+                self._reject(remaining)
+            self._set(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject(self.reset_timeout)
+            self._probing = True
+
+    def _reject(self, retry_after):
+        CIRCUIT_REJECTED.inc(provider=self.name, operation=self.operation)
+        raise CircuitOpen(self.name, retry_after, self.operation)
+
+    def record_success(self):
+        self.failures = 0
+        self._probing = False
+        if self.state != CLOSED:
+            self._set(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+            self._set(OPEN)
+
+    def release(self):
+        # The call was abandoned (cancelled), which says nothing about the provider.
+        self._probing = False
+
+
+class LatencyWindow:
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def observe(self, seconds):
+        self._samples.append(seconds)
+
+    def quantile(self, q):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class GuardedProvider:
+    # Runs provider calls behind a circuit breaker. With hedging on, a call that
+    # has not answered after the recent p95 latency gets a second attempt (against
+    # the secondary when there is one) and whichever succeeds first wins.
+    # Breakers and latency windows are kept per operation: a slow bulk quote must
+    # not raise the hedge delay of single quotes, nor trip their breaker.
+
+    def __init__(
+        self,
+        name,
+        failure_threshold,
+        reset_timeout,
+        hedge=False,
+        window=None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge = hedge
+        self.window = window or env.HEDGE_WINDOW
+        self.clock = clock
+        self._breakers = {}
+        self._latencies = {}
+
+    def breaker(self, operation):
+        breaker = self._breakers.get(operation)
+        if breaker is None:
+            breaker = self._breakers[operation] = CircuitBreaker(
+                self.name,
+                self.failure_threshold,
+                self.reset_timeout,
+                self.clock,
+                operation,
+            )
+        return breaker
+
+    def latencies(self, operation):
+        window = self._latencies.get(operation)
+        if window is None:
+            window = self._latencies[operation] = LatencyWindow(self.window)
+        return window
+
+    def hedge_delay(self, operation):
+        latencies = self.latencies(operation)
+        if not self.hedge or len(latencies) < env.HEDGE_MIN_SAMPLES:
+            return None
+        return latencies.quantile(env.HEDGE_QUANTILE)
+
+    async def call(self, operation, attempt, secondary=None, hedge=True):
+        breaker = self.breaker(operation)
+        breaker.before_call()
+        delay = self.hedge_delay(operation) if hedge else None
+        try:
+            if delay is None:
+                result = await self._attempt(operation, attempt)
+            else:
+                result = await self._hedged(operation, attempt, secondary, delay)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _attempt(self, operation, attempt, provider=None):
+        started = time.perf_counter()
+        with track_upstream(provider or self.name, operation):
+            result = await attempt()
+        self.latencies(operation).observe(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, operation, attempt, secondary, delay):
+        tasks = [asyncio.ensure_future(self._attempt(operation, attempt))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                provider = f"{self.name}_secondary" if secondary else None
+                tasks.append(
+                    asyncio.ensure_future(
+                        self._attempt(operation, secondary or attempt, provider)
+                    )
+                )
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if len(tasks) > 1:
+                            winner = "primary" if task is tasks[0] else "hedge"
+                            UPSTREAM_HEDGES.inc(
+                                provider=self.name, operation=operation, winner=winner
+                            )
+                        return task.result()
+
+            if len(tasks) > 1:
+                UPSTREAM_HEDGES.inc(
+                    provider=self.name, operation=operation, winner="none"
+                )
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def guarded(name):
+    return GuardedProvider(
+        name,
+        env.CIRCUIT_FAILURE_THRESHOLD,
+        env.CIRCUIT_RESET_SECONDS,
+        hedge=name in env.HEDGE_PROVIDERS,
+    )
+
+
+class StockDataProvider:
+    def __init__(self, guard, url, api_token, secondary_url=None):
+        self.guard = guard
+        self.url = url
+        self.api_token = api_token
+        self.secondary_url = secondary_url
+        self._client = None
+        self._client_loop = None
+
+    def client(self):
+        # One pooled client, so primary and hedged calls reuse connections. A
+        # client is bound to the loop it was created on; tools that run each
+        # call on a fresh loop get a fresh client.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=env.UPSTREAM_TIMEOUT_SECONDS)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, url, symbols):
+        response = await self.client().get(
+            url, params={"symbols": ",".join(symbols), "api_token": self.api_token}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_quotes(self, symbols, operation="quote"):
+        secondary = None
+        if self.secondary_url:
+            secondary = lambda: self._get(self.secondary_url, symbols)
+        return await self.guard.call(
+            operation, lambda: self._get(self.url, symbols), secondary
+        )
+
+
+class GeminiProvider:
+    def __init__(self, guard, model, secondary_model=None, video_guard=None):
+        self.guard = guard
+        self.model = model
+        self.secondary_model = secondary_model
+        # Video generation takes minutes; its failures and latencies are kept
+        # away from the content calls.
+        self.video_guard = video_guard or guard
+
+    async def generate_content(self, prompt):
+        genai, _ = load_genai()
+        client = genai.Client(api_key=env.GOOGLE_API_KEY)
+
+        async def generate(model):
+            response = await client.aio.models.generate_content(
+                model=model, contents=prompt
+            )
+            return response.text
+
+        secondary = None
+        if self.secondary_model:
+            secondary = lambda: generate(self.secondary_model)
+        return await self.guard.call(
+            "generate_content", lambda: generate(self.model), secondary
+        )
+
+    async def generate_video(self, prompt):
+        # Video generation is slow and billed per attempt, so it is never hedged.
+        return await self.video_guard.call(
+            "generate_videos",
+            lambda: asyncio.to_thread(self._generate_video, prompt),
+            hedge=False,
+        )
+
+    def _generate_video(self, prompt):
+        genai, types = load_genai()
+        client = genai.Client(api_key=env.GOOGLE_API_KEY)
+        operation = client.models.generate_videos(
+            model="veo-3.1-generate-preview",
+            prompt=prompt,
+            config=types.GenerateVideosConfig(
+                number_of_videos=1, resolution="720p", aspect_ratio="16:9"
+            ),
+        )
+
+        while not operation.done:
+            time.sleep(10)
+            operation = client.operations.get(operation)
+
+        generated_video = operation.response.generated_videos[0]
+        client.files.download(file=generated_video.video)
+        return generated_video
+
+
+stockdata_provider = StockDataProvider(
+    guarded("stockdata"),
+    env.STOCK_DATA_URL,
+    env.STOCK_DATA,
+    env.STOCK_DATA_SECONDARY_URL,
+)
+gemini_provider = GeminiProvider(
+    guarded("gemini"),
+    env.GEMINI_MODEL,
+    env.GEMINI_SECONDARY_MODEL,
+    video_guard=guarded("gemini_video"),
+)
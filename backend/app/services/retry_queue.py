@@ -0,0 +1,226 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import ConnectionFailure
+
+from backend.app.config.config import settings as env
+from backend.app.monitoring.metrics import ETL_RETRIES, ETL_RETRY_WORKER_ERRORS
+from backend.app.services.providers import CircuitOpen
+
+# One queue document per ticker ({_id: ticker, attempts, next_attempt_at, ...}), so
+# repeated failures of the same ticker coalesce instead of piling up. Workers claim
+# due documents by pushing next_attempt_at forward with a lease token; the filter on
+# next_attempt_at makes each claim exclusive across workers and processes.
+
+
+def is_transient(error):
+    # Network errors, timeouts, upstream 5xx/429, an open circuit or a lost
+    # database connection. Anything else would fail the same way on every retry.
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (httpx.TransportError, CircuitOpen, ConnectionFailure))
+
+
+def backoff(attempts):
+    delay = min(
+        env.ETL_RETRY_MAX_DELAY_SECONDS, env.ETL_RETRY_BASE_DELAY_SECONDS * 2**attempts
+    )
+    # "Equal jitter": at least half the delay, so retries never collapse to zero.
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryQueue:
+    def __init__(self, collection, dead_letter_collection):
+        self.collection = collection
+        self.dead_letters = dead_letter_collection
+
+    async def enqueue(self, tickers, error):
+        tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+        if not tickers:
+            return
+        now = datetime.now(timezone.utc)
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": ticker},
+                    {
+                        "$setOnInsert": {
+                            "attempts": 0,
+                            "first_failed_at": now,
+                            "next_attempt_at": now + timedelta(seconds=backoff(0)),
+                        },
+                        "$set": {"last_error": error, "updated_at": now},
+                    },
+                    upsert=True,
+                )
+                for ticker in tickers
+            ],
+            ordered=False,
+        )
+
+    async def claim(self, limit):
+        now = datetime.now(timezone.utc)
+        due = [
+            doc["_id"]
+            async for doc in self.collection.find(
+                {"next_attempt_at": {"$lte": now}}, {"_id": 1}
+            )
+            .sort("next_attempt_at", 1)
+            .limit(limit)
+        ]
+        if not due:
+            return []
+
+        lease = str(ObjectId())
+        await self.collection.update_many(
+            {"_id": {"$in": due}, "next_attempt_at": {"$lte": now}},
+            {
+                "$set": {
+                    "lease": lease,
+                    "next_attempt_at": now
+                    + timedelta(seconds=env.ETL_RETRY_LEASE_SECONDS),
+                }
+            },
+        )
+        return [doc async for doc in self.collection.find({"lease": lease})]
+
+    async def complete(self, docs):
+        # Filtered on the lease: if ours expired and another worker reclaimed the
+        # entry, that worker owns it now.
+        completed = 0
+        for doc in docs:
+            result = await self.collection.delete_one(
+                {"_id": doc["_id"], "lease": doc.get("lease")}
+            )
+            completed += result.deleted_count
+        if completed:
+            ETL_RETRIES.inc(completed, outcome="succeeded")
+        return completed
+
+    async def reschedule(self, docs):
+        now = datetime.now(timezone.utc)
+        dead = []
+        for doc in docs:
+            attempts = doc["attempts"] + 1
+            if attempts >= env.ETL_RETRY_MAX_ATTEMPTS:
+                dead.append({**doc, "attempts": attempts})
+                continue
+            result = await self.collection.update_one(
+                {"_id": doc["_id"], "lease": doc.get("lease")},
+                {
+                    "$set": {
+                        "attempts": attempts,
+                        "next_attempt_at": now
+                        + timedelta(seconds=backoff(attempts)),
+                    },
+                    "$unset": {"lease": ""},
+                },
+            )
+            if result.matched_count:
+                ETL_RETRIES.inc(outcome="rescheduled")
+
+        # Only entries we still hold the lease on are dead-lettered.
+        owned = []
+        for doc in dead:
+            result = await self.collection.delete_one(
+                {"_id": doc["_id"], "lease": doc.get("lease")}
+            )
+            if result.deleted_count:
+                owned.append(doc)
+        dead = owned
+
+        if dead:
+            await self.dead_letters.insert_many(
+                [
+                    {
+                        "ticker": doc["_id"],
+                        "attempts": doc["attempts"],
+                        "last_error": doc.get("last_error"),
+                        "first_failed_at": doc.get("first_failed_at"),
+                        "dead_at": now,
+                    }
+                    for doc in dead
+                ]
+            )
+            ETL_RETRIES.inc(len(dead), outcome="dead_lettered")
+        return dead
+
+    async def list_pending(self, limit=100):
+        cursor = self.collection.find({}).sort("next_attempt_at", 1).limit(limit)
+        return [doc async for doc in cursor]
+
+    async def list_dead_letters(self, limit=100):
+        cursor = self.dead_letters.find({}).sort("dead_at", -1).limit(limit)
+        docs = []
+        async for doc in cursor:
+            doc["_id"] = str(doc["_id"])
+            docs.append(doc)
+        return docs
+
+    async def replay(self, tickers=None):
+        # Dead letters go back to the queue as fresh, immediately due items.
+        query = {"ticker": {"$in": [t.upper() for t in tickers]}} if tickers else {}
+        docs = [doc async for doc in self.dead_letters.find(query)]
+        if not docs:
+            return []
+
+        now = datetime.now(timezone.utc)
+        replayed = list(dict.fromkeys(doc["ticker"] for doc in docs))
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": ticker},
+                    {
+                        "$set": {
+                            "attempts": 0,
+                            "next_attempt_at": now,
+                            "updated_at": now,
+                        },
+                        "$setOnInsert": {"first_failed_at": now},
+                        "$unset": {"lease": ""},
+                    },
+                    upsert=True,
+                )
+                for ticker in replayed
+            ],
+            ordered=False,
+        )
+        await self.dead_letters.delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+        return replayed
+
+
+async def run_retry_worker(queue, data_service_factory, logger, interval):
+    # Retries due tickers in multi-symbol batches. data_service_factory builds a
+    # DataService bound to the same queue, so a failing retry re-enqueues itself.
+    while True:
+        try:
+            docs = await queue.claim(env.ETL_RETRY_CLAIM_LIMIT)
+            for i in range(0, len(docs), env.ETL_RETRY_BATCH_SIZE):
+                batch = docs[i : i + env.ETL_RETRY_BATCH_SIZE]
+                service = await data_service_factory()
+                stocks = await service.run_etl_tickers([doc["_id"] for doc in batch])
+
+                done = {s["ticker"].upper() for s in stocks if not s.get("stale")}
+                await queue.complete([d for d in batch if d["_id"] in done])
+                await queue.reschedule([d for d in batch if d["_id"] not in done])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A Mongo blip must not kill the worker; leased items become due
+            # again once their lease expires.
+            ETL_RETRY_WORKER_ERRORS.inc()
+            try:
+                await logger.log(
+                    service="RetryQueue",
+                    status="error",
+                    message="Retry worker iteration failed",
+                    metadata={"exception": repr(e)},
+                )
+            except Exception:
+                pass
+        await asyncio.sleep(interval)
@@ -1,12 +1,28 @@
+import csv
+import io
+import json
+import re
 from datetime import datetime, timezone
 from bson import ObjectId
 from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 from backend.app.auth.jwt_utils import *
 from backend.app.models.models_user import *
-from backend.app.auth.hashing import hash_password, verify_password
+from backend.app.auth.hashing import hash_password, hash_passwords, verify_password
 from backend.app.models.mongo_logger import MongoLogger
 
 
+def parse_user_rows(data: bytes, fmt: str):
+    text = data.decode("utf-8-sig")
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    rows = json.loads(text)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of users")
+    return rows
+
+
 class UserService:
     def __init__(self, collection, log_collection: MongoLogger):
         self.collection = collection
@@ -46,6 +62,109 @@ class UserService:
             )
             raise e
 
+    async def import_users(self, rows: list[dict]):
+        report = [None] * len(rows)
+        valid = []
+        seen = set()
+        for i, row in enumerate(rows):
+            try:
+                user = UserCreate.model_validate(row)
+            except ValidationError as e:
+                report[i] = {
+                    "row": i,
+                    "username": row.get("username") if isinstance(row, dict) else None,
+                    "status": "invalid",
+                    "error": "; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                        for err in e.errors()
+                    ),
+                }
+                continue
+
+            if user.username in seen:
+                report[i] = {
+                    "row": i,
+                    "username": user.username,
+                    "status": "duplicate",
+                    "error": "Username repeated in this batch",
+                }
+                continue
+            seen.add(user.username)
+            valid.append((i, user))
+
+        # Existing users are found up front rather than left to the unique index:
+        # it is built in the background and may not exist yet. The index still
+        # catches users created concurrently with the import.
+        existing = set()
+        if valid:
+            cursor = self.collection.find(
+                {"username": {"$in": [user.username for _, user in valid]}},
+                {"username": 1},
+            )
+            existing = {doc["username"] async for doc in cursor}
+        for i, user in valid:
+            if user.username in existing:
+                report[i] = {
+                    "row": i,
+                    "username": user.username,
+                    "status": "duplicate",
+                    "error": "Username already exists",
+                }
+        valid = [(i, user) for i, user in valid if user.username not in existing]
+
+        hashes = await hash_passwords([user.password for _, user in valid])
+        docs = []
+        for (i, user), hashed in zip(valid, hashes):
+            user_dict = user.model_dump()
+            user_dict["password"] = hashed
+            user_dict["role"] = "standard_user"
+            docs.append(user_dict)
+
+        # One unordered insert writes every new user; a username taken since the
+        # check above comes back as E11000.
+        failed = {}
+        if docs:
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                failed = {err["index"]: err for err in e.details["writeErrors"]}
+
+        for n, ((i, user), doc) in enumerate(zip(valid, docs)):
+            err = failed.get(n)
+            if err is None:
+                report[i] = {
+                    "row": i,
+                    "username": user.username,
+                    "status": "created",
+                    "user_id": str(doc["_id"]),
+                }
+            elif err.get("code") == 11000:
+                report[i] = {
+                    "row": i,
+                    "username": user.username,
+                    "status": "duplicate",
+                    "error": "User already exists",
+                }
+            else:
+                report[i] = {
+                    "row": i,
+                    "username": user.username,
+                    "status": "error",
+                    "error": err.get("errmsg"),
+                }
+
+        summary = {}
+        for entry in report:
+            summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+
+        await self._log_collection.log(
+            service="UserService",
+            status="success" if summary.get("created") else "warning",
+            message="Bulk user import completed",
+            metadata=summary,
+        )
+        return {"summary": summary, "results": report}
+
     async def login_user(self, user):
         try:
             authenticated_user = await self.collection.find_one(
@@ -166,16 +285,87 @@ class UserService:
             )
             raise e
 
-    async def get_all_users(self):
+    def _listing_filter(self, search: str = None):
+        query = {"role": {"$ne": "admin"}}
+        if search:
+            # Anchored, case-sensitive prefixes are the only regexes Mongo can answer
+            # from an index range scan.
+            prefix = {"$regex": f"^{re.escape(search)}"}
+            query["$or"] = [
+                {"username": prefix},
+                {"email": prefix},
+                {"full_name": prefix},
+            ]
+        return query
 
-        user_list = []
+    async def get_all_users(
+        self, limit: int = 100, after: str = None, search: str = None
+    ):
+        query = self._listing_filter(search)
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+
+        cursor = (
+            self.collection.find(query, {"password": 0})
+            .sort("_id", 1)
+            .limit(limit + 1)
+        )
 
-        async for user in self.collection.find({"role": {"$ne": "admin"}}):
-            user.pop("password", None)
+        user_list = []
+        async for user in cursor:
             user["_id"] = str(user["_id"])
             user_list.append(user)
 
-        return user_list
+        next_cursor = None
+        if len(user_list) > limit:
+            user_list = user_list[:limit]
+            next_cursor = user_list[-1]["_id"]
+
+        return user_list, next_cursor
+
+    async def count_users(self, search: str = None):
+        if search:
+            return await self.collection.count_documents(self._listing_filter(search))
+        # The collection count comes from metadata; only the admins, an equality
+        # match on the role index, are counted.
+        total = await self.collection.estimated_document_count()
+        admins = await self.collection.count_documents({"role": "admin"})
+        return max(total - admins, 0)
+
+    async def get_watchlist(self, user_id: str):
+        user = await self.collection.find_one(
+            {"_id": ObjectId(user_id)}, {"watchlist": 1}
+        )
+        if user is None:
+            return None
+        return user.get("watchlist", [])
+
+    async def set_watchlist(self, user_id: str, tickers: list[str]):
+        watchlist = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        result = await self.collection.update_one(
+            {"_id": ObjectId(user_id)}, {"$set": {"watchlist": watchlist}}
+        )
+        if result.matched_count == 0:
+            return None
+        return watchlist
+
+    async def add_to_watchlist(self, user_id: str, ticker: str):
+        # The positional $exists guard keeps the list under the cap atomically.
+        await self.collection.update_one(
+            {
+                "_id": ObjectId(user_id),
+                f"watchlist.{env.WATCHLIST_MAX_TICKERS - 1}": {"$exists": False},
+            },
+            {"$addToSet": {"watchlist": ticker.strip().upper()}},
+        )
+        return await self.get_watchlist(user_id)
+
+    async def remove_from_watchlist(self, user_id: str, ticker: str):
+        await self.collection.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$pull": {"watchlist": ticker.strip().upper()}},
+        )
+        return await self.get_watchlist(user_id)
 
     async def update_role(self, user_id: str):
         try:
@@ -2,28 +2,103 @@ from fastapi import FastAPI
 from backend.app.routers.auth import router as auth_router
 from backend.app.routers.etl import router as data_router
 from backend.app.routers.users import router as user_router
+from backend.app.routers.metrics import router as metrics_router
+from backend.app.routers.profiling import router as profiling_router
+from backend.app.routers.health import router as health_router
 from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import certifi
 from fastapi.middleware.cors import CORSMiddleware
+from backend.app.auth.hashing import shutdown_hash_pool
 from backend.app.config.config import settings as env
+from backend.app.dependencies.services import (
+    build_data_service,
+    get_logger,
+    get_retry_queue,
+)
 from backend.app.database.database import *
+from backend.app.database.migrations import start_migrations, stop_migrations
+from backend.app.database.quote_store import quote_store
+from backend.app.monitoring.instrumentation import (
+    MetricsMiddleware,
+    MongoCommandMetrics,
+    MongoPoolMetrics,
+    sample_event_loop,
+)
+from backend.app.monitoring.metrics import MONGO_POOL_MAX_SIZE
+from backend.app.middleware.admission import AdmissionMiddleware
+from backend.app.middleware.rate_limit import RateLimitMiddleware
+from backend.app.monitoring.profiling import ProfilingMiddleware
+from backend.app.services.anomaly_detection import (
+    anomaly_detector,
+    log_checkpoint_error,
+    run_checkpoints,
+)
+from backend.app.services.providers import stockdata_provider
+from backend.app.services.retry_queue import run_retry_worker
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
-    db_manager.client = AsyncIOMotorClient(env.MONGO_URI, tlsCAFile=certifi.where())
+    client = AsyncIOMotorClient(
+        env.MONGO_URI,
+        tlsCAFile=certifi.where(),
+        event_listeners=[MongoCommandMetrics(), MongoPoolMetrics()],
+        **client_options(),
+    )
+    db_manager.connect(client, env.DB_NAME)
+    MONGO_POOL_MAX_SIZE.set(env.MONGO_MAX_POOL_SIZE)
+
+    await start_migrations(db_manager.db, env.INDEX_BUILD_MODE)
+
+    if env.QUOTE_CACHE_ENABLED:
+        quote_store.open(env.QUOTE_CACHE_PATH, env.QUOTE_CACHE_SLOTS)
+
+    loop_sampler = asyncio.create_task(
+        sample_event_loop(env.METRICS_LOOP_SAMPLE_INTERVAL_SECONDS)
+    )
 
-    db_manager.db = db_manager.client[env.DB_NAME]
+    logger = await get_logger(await get_logs_collection())
+    anomaly_state = await get_anomaly_state_collection()
+    anomaly_checkpoints = asyncio.create_task(
+        run_checkpoints(
+            anomaly_detector, anomaly_state, env.ANOMALY_CHECKPOINT_SECONDS, logger
+        )
+    )
 
-    await db_manager.db[env.DB_USER_COLLECTION].create_index("username", unique=True)
-    await db_manager.db[env.DB_STOCKS_COLLECTION].create_index("ticker", unique=True)
-    await db_manager.db[env.DB_LOGS_COLLECTION].create_index("ticker")
-    await db_manager.db[env.DB_HISTORY_COLLECTION].create_index("ticker")
+    retry_worker = None
+    if env.ETL_RETRY_WORKER_ENABLED:
+        retry_queue = await get_retry_queue(
+            await get_etl_retries_collection(), await get_etl_dead_letters_collection()
+        )
+        retry_worker = asyncio.create_task(
+            run_retry_worker(
+                retry_queue,
+                build_data_service,
+                logger,
+                env.ETL_RETRY_POLL_SECONDS,
+            )
+        )
 
     yield
 
+    loop_sampler.cancel()
+    if retry_worker:
+        retry_worker.cancel()
+    anomaly_checkpoints.cancel()
+    if anomaly_detector.restored:
+        try:
+            await anomaly_detector.checkpoint(anomaly_state)
+        except Exception as e:
+            await log_checkpoint_error(
+                logger, "Final anomaly checkpoint failed on shutdown", e
+            )
+    await stop_migrations()
+    quote_store.close()
+    shutdown_hash_pool()
+    await stockdata_provider.aclose()
     db_manager.client.close()
 
 
@@ -32,7 +107,12 @@ app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router)
 app.include_router(data_router)
 app.include_router(user_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
+app.include_router(health_router)
 
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,3 +120,5 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,26 @@
+import os
+
+# Settings() requires these at import time; tests never reach the real services.
+for key, value in {
+    "GOOGLE_API_KEY": "test",
+    "STOCK_DATA": "test",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "DB_NAME": "test",
+    "DB_USER_COLLECTION": "users",
+    "DB_STOCKS_COLLECTION": "stocks",
+    "DB_LOGS_COLLECTION": "logs",
+    "DB_HISTORY_COLLECTION": "history",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+}.items():
+    os.environ.setdefault(key, value)
+
+import pytest  # noqa: E402
+
+from backend.tests.mongo_standin import AsyncMongoStandIn  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoStandIn()["test"]
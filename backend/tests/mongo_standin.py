@@ -0,0 +1,179 @@
+import asyncio
+from types import SimpleNamespace
+
+import mongomock
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Motor-shaped async wrappers over mongomock. Shared by the unit tests and the
+# benchmarks so neither needs a running MongoDB.
+
+BULK_OPERATIONS = {
+    "InsertOne": "insert_one",
+    "UpdateOne": "update_one",
+    "UpdateMany": "update_many",
+    "ReplaceOne": "replace_one",
+    "DeleteOne": "delete_one",
+    "DeleteMany": "delete_many",
+}
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, *args, **kwargs):
+        self._cursor = self._cursor.limit(*args, **kwargs)
+        return self
+
+    def skip(self, *args, **kwargs):
+        self._cursor = self._cursor.skip(*args, **kwargs)
+        return self
+
+    def batch_size(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        docs = []
+        for doc in self._cursor:
+            docs.append(doc)
+            if length is not None and len(docs) >= length:
+                break
+        return docs
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    CURSOR_METHODS = {"find", "aggregate"}
+
+    def __init__(self, collection, index_latency_ms=0.0):
+        self._collection = collection
+        self._index_latency_ms = index_latency_ms
+
+    @property
+    def name(self):
+        return self._collection.name
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def create_index(self, *args, **kwargs):
+        if self._index_latency_ms:
+            await asyncio.sleep(self._index_latency_ms / 1000)
+        return self._collection.create_index(*args, **kwargs)
+
+    async def bulk_write(self, requests, ordered=True, **kwargs):
+        # mongomock's bulk_write doesn't understand current pymongo operation
+        # objects, so apply them one by one with the server's ordered/unordered
+        # error semantics.
+        result = SimpleNamespace(
+            inserted_count=0,
+            matched_count=0,
+            modified_count=0,
+            upserted_count=0,
+            deleted_count=0,
+            upserted_ids={},
+        )
+        errors = []
+        for i, op in enumerate(requests):
+            kind = type(op).__name__
+            if kind not in BULK_OPERATIONS:
+                raise TypeError(
+                    f"bulk_write stand-in does not support {kind}; "
+                    f"supported: {', '.join(BULK_OPERATIONS)}"
+                )
+            try:
+                self._apply(kind, op, i, result)
+            except DuplicateKeyError as e:
+                errors.append({"index": i, "code": 11000, "errmsg": str(e), "op": op})
+                if ordered:
+                    break
+
+        if errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": errors,
+                    "nInserted": result.inserted_count,
+                    "nMatched": result.matched_count,
+                    "nModified": result.modified_count,
+                    "nUpserted": result.upserted_count,
+                    "nRemoved": result.deleted_count,
+                    "upserted": [
+                        {"index": i, "_id": _id}
+                        for i, _id in result.upserted_ids.items()
+                    ],
+                }
+            )
+        return result
+
+    def _apply(self, kind, op, index, result):
+        if kind == "InsertOne":
+            self._collection.insert_one(op._doc)
+            result.inserted_count += 1
+        elif kind in ("DeleteOne", "DeleteMany"):
+            method = getattr(self._collection, BULK_OPERATIONS[kind])
+            result.deleted_count += method(op._filter).deleted_count
+        else:
+            method = getattr(self._collection, BULK_OPERATIONS[kind])
+            res = method(op._filter, op._doc, upsert=op._upsert)
+            result.matched_count += res.matched_count
+            result.modified_count += res.modified_count
+            if res.upserted_id is not None:
+                result.upserted_count += 1
+                result.upserted_ids[index] = res.upserted_id
+
+    def __getattr__(self, attr):
+        method = getattr(self._collection, attr)
+
+        if attr in self.CURSOR_METHODS:
+            return lambda *args, **kwargs: AsyncCursor(method(*args, **kwargs))
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncDatabase:
+    def __init__(self, database, index_latency_ms=0.0):
+        self._database = database
+        self._index_latency_ms = index_latency_ms
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._database[name], self._index_latency_ms)
+
+    def __getattr__(self, name):
+        return self[name]
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    async def command(self, *args, **kwargs):
+        return {"ok": 1.0}
+
+
+class AsyncMongoStandIn:
+
+    def __init__(self, *args, index_latency_ms=0.0, **kwargs):
+        self._client = mongomock.MongoClient()
+        self._index_latency_ms = index_latency_ms
+
+    def __getitem__(self, name):
+        return AsyncDatabase(self._client[name], self._index_latency_ms)
+
+    def get_database(self, name, **kwargs):
+        return self[name]
+
+    def close(self):
+        self._client.close()
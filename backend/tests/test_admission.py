@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from backend.app.middleware.admission import (
+    DEFAULT_CLASSES,
+    AdmissionClass,
+    Shed,
+    admission_classes,
+)
+
+
+def test_overrides_merge_into_defaults():
+    classes = admission_classes({"ai": {"concurrency": 4}, "video": None})
+
+    assert classes["ai"] == {**DEFAULT_CLASSES["ai"], "concurrency": 4}
+    assert classes["etl"] == DEFAULT_CLASSES["etl"]
+    assert "video" not in classes
+
+
+def test_concurrency_is_capped_and_waiters_are_admitted_in_turn():
+    admission = AdmissionClass("test", concurrency=2, queue=10, timeout=1.0)
+    running, peak = 0, 0
+
+    async def request():
+        nonlocal running, peak
+        await admission.acquire()
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        admission.release()
+
+    async def scenario():
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    asyncio.run(scenario())
+
+    assert peak == 2
+    assert admission.waiting == 0
+
+
+def test_requests_beyond_the_queue_are_shed():
+    admission = AdmissionClass("test", concurrency=1, queue=1, timeout=1.0)
+
+    async def scenario():
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as shed:
+            await admission.acquire()
+        admission.release()
+        await waiter
+        return shed.value.reason
+
+    assert asyncio.run(scenario()) == "queue_full"
+
+
+def test_queued_requests_time_out():
+    admission = AdmissionClass("test", concurrency=1, queue=4, timeout=0.01)
+
+    async def scenario():
+        await admission.acquire()
+        with pytest.raises(Shed) as shed:
+            await admission.acquire()
+        return shed.value.reason
+
+    assert asyncio.run(scenario()) == "timeout"
+    assert admission.waiting == 0
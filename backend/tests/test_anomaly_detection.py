@@ -0,0 +1,154 @@
+import asyncio
+import statistics
+
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.anomaly_detection import (
+    AnomalyDetector,
+    TickerStats,
+    run_checkpoints,
+)
+from backend.app.services.data_service import DataService
+from backend.app.services.providers import GuardedProvider, StockDataProvider
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(env, "ANOMALY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(env, "ANOMALY_Z_THRESHOLD", 3.0)
+
+
+def feed(detector, prices, ticker="AAPL"):
+    return [detector.observe({"ticker": ticker, "price": p}) for p in prices]
+
+
+def test_welford_matches_batch_statistics():
+    values = [0.01, -0.02, 0.005, 0.03, -0.01, 0.0, 0.012]
+    stats = TickerStats()
+    for value in values:
+        stats.update(value, 0.1)
+
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.std == pytest.approx(statistics.stdev(values))
+
+
+def test_spike_is_flagged_after_warmup(settings):
+    detector = AnomalyDetector()
+    prices = [100.0, 100.5, 100.1, 100.6, 100.2, 100.7, 100.3, 100.8]
+    results = feed(detector, prices)
+
+    assert results[0] is None
+    assert not any(r["flagged"] for r in results[1:])
+
+    spike = detector.observe({"ticker": "AAPL", "price": 120.0})
+    assert spike["flagged"]
+    assert spike["z_score"] > 3.0
+    assert spike["previous_price"] == 100.8
+
+
+def test_no_flags_before_min_samples(settings):
+    detector = AnomalyDetector()
+    results = feed(detector, [100.0, 100.1, 100.2, 150.0])
+
+    assert not any(r and r["flagged"] for r in results)
+
+
+def test_checkpoint_and_restore_round_trip(settings, db):
+    collection = db.anomaly_state
+    detector = AnomalyDetector()
+    feed(detector, [100.0, 101.0, 100.5, 101.5, 100.8, 101.2, 100.9])
+
+    async def scenario():
+        written = await detector.checkpoint(collection)
+        unchanged = await detector.checkpoint(collection)
+        restored = AnomalyDetector()
+        count = await restored.restore(collection)
+        return written, unchanged, count, restored
+
+    written, unchanged, count, restored = asyncio.run(scenario())
+
+    assert (written, unchanged, count) == (1, 0, 1)
+    assert restored.restored
+    original = feed(detector, [130.0])[0]
+    resumed = feed(restored, [130.0])[0]
+    assert resumed == original
+
+
+def test_scoring_leaves_the_statistics_alone(settings):
+    detector = AnomalyDetector()
+    feed(detector, [100.0, 101.0, 100.5])
+
+    first, _ = detector.score({"ticker": "AAPL", "price": 130.0})
+    second, update = detector.score({"ticker": "AAPL", "price": 130.0})
+    detector.commit(update)
+
+    assert first == second
+    assert detector.observe({"ticker": "AAPL", "price": 130.0})["move"] == 0.0
+
+
+class QuoteProvider(StockDataProvider):
+    def __init__(self):
+        super().__init__(GuardedProvider("fake", 100, 30.0), "http://upstream", "t")
+        self.price = 100.0
+
+    async def _get(self, url, symbols):
+        quote = {"name": "Apple", "currency": "USD", "day_change": 0.0}
+        return {"data": [{**quote, "ticker": s, "price": self.price} for s in symbols]}
+
+
+def test_failed_write_is_not_observed(settings, db):
+    provider = QuoteProvider()
+    detector = AnomalyDetector()
+    service = DataService(
+        db.stocks,
+        MongoLogger(db.logs),
+        db.history,
+        quote_provider=provider,
+        anomaly_detector=detector,
+        anomaly_flags_collection=db.anomaly_flags,
+    )
+    stocks = service._stock_collection
+    upsert = stocks.update_one
+
+    async def failing_upsert(*args, **kwargs):
+        raise ConnectionError("primary stepped down")
+
+    async def scenario():
+        for price in [100.0, 100.5, 100.1, 100.6, 100.2, 100.7, 100.3]:
+            provider.price = price
+            await service.run_etl_ticker("AAPL")
+        provider.price = 150.0
+        stocks.update_one = failing_upsert
+        failed = await service.run_etl_ticker("AAPL")
+        stocks.update_one = upsert
+        flags = await db.anomaly_flags.count_documents({})
+        provider.price = 100.4
+        stored = await service.run_etl_ticker("AAPL")
+        return failed, flags, stored
+
+    failed, flags, stored = asyncio.run(scenario())
+
+    assert failed is None and flags == 0
+    assert stored["anomaly"]["previous_price"] == 100.3
+    assert not stored["anomaly"]["flagged"]
+
+
+def test_checkpoint_failures_are_logged(db):
+    class BrokenState:
+        def find(self, *args):
+            raise ConnectionError("mongo unavailable")
+
+    async def scenario():
+        logger = MongoLogger(db.logs)
+        task = asyncio.create_task(
+            run_checkpoints(AnomalyDetector(), BrokenState(), 0.01, logger)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return [doc async for doc in db.logs.find({"service": "AnomalyDetector"})]
+
+    logs = asyncio.run(scenario())
+
+    assert logs and "mongo unavailable" in logs[0]["metadata"]["exception"]
@@ -0,0 +1,103 @@
+import asyncio
+import io
+
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.database.history_store import HistoryStore
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.backfill_service import BackfillService
+
+
+def csv_file(rows, invalid_at=()):
+    lines = ["ticker,name,currency,price,day_change,timestamp"]
+    for i in range(rows):
+        price = "oops" if i in invalid_at else f"{100 + i}.0"
+        timestamp = f"2024-01-01T00:{i // 60:02}:{i % 60:02}"
+        lines.append(f"AAPL,Apple,USD,{price},0.5,{timestamp}")
+    return "\n".join(lines) + "\n"
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FlakyHistory(HistoryStore):
+    # Fails the n-th chunk write once, like a connection dropped mid-import.
+    def __init__(self, *args, fail_on, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_on = fail_on
+        self.writes = 0
+
+    async def append_many(self, docs):
+        self.writes += 1
+        if self.writes == self.fail_on:
+            raise Interrupted("connection reset")
+        return await super().append_many(docs)
+
+
+@pytest.mark.parametrize("mode", ["documents", "buckets"])
+def test_interrupted_import_resumes_without_duplicates(db, mode, monkeypatch):
+    monkeypatch.setattr(env, "HISTORY_BUCKET_MAX_COUNT", 25)
+    history = FlakyHistory(db.history, db.history_buckets, mode=mode, fail_on=3)
+    service = BackfillService(history, db.backfill_jobs, MongoLogger(db.logs))
+    data = csv_file(100, invalid_at={42})
+
+    async def scenario():
+        with pytest.raises(Interrupted):
+            await service.import_stream(io.StringIO(data), "csv", "job", 20)
+        checkpoint = await db.backfill_jobs.find_one({"_id": "job"})
+        report = await service.import_stream(io.StringIO(data), "csv", "job", 20)
+        stored = await HistoryStore(db.history, db.history_buckets, mode).read("AAPL")
+        return checkpoint, report, stored
+
+    checkpoint, report, stored = asyncio.run(scenario())
+
+    assert checkpoint["status"] == "running" and checkpoint["rows"] == 40
+    assert report["status"] == "completed" and report["rows"] == 100
+    assert (report["inserted"], report["invalid"]) == (99, 1)
+    assert [(e["row"], e["line"]) for e in report["errors"]] == [(43, 44)]
+    assert len(stored) == 99
+    assert len({s["timestamp"] for s in stored}) == 99
+
+
+def test_reimporting_into_buckets_skips_stored_rows(db, monkeypatch):
+    monkeypatch.setattr(env, "HISTORY_BUCKET_MAX_COUNT", 30)
+    history = HistoryStore(db.history, db.history_buckets, "buckets")
+    service = BackfillService(history, db.backfill_jobs, MongoLogger(db.logs))
+    data = csv_file(100)
+
+    async def scenario():
+        first = await service.import_stream(io.StringIO(data), "csv", "one", 40)
+        second = await service.import_stream(io.StringIO(data), "csv", "two", 40)
+        counts = [b["count"] async for b in db.history_buckets.find({})]
+        return first, second, counts
+
+    first, second, counts = asyncio.run(scenario())
+
+    assert (first["inserted"], first["duplicates"]) == (100, 0)
+    assert (second["inserted"], second["duplicates"]) == (0, 100)
+    assert sum(counts) == 100 and max(counts) <= 30
+
+
+def test_malformed_ndjson_lines_are_invalid_rows(db):
+    history = HistoryStore(db.history, db.history_buckets, "documents")
+    service = BackfillService(history, db.backfill_jobs, MongoLogger(db.logs))
+    row = (
+        '{"ticker": "AAPL", "name": "Apple", "currency": "USD", "price": %s, '
+        '"day_change": 0.5, "timestamp": "2024-01-01T00:00:0%s"}'
+    )
+    data = "\n".join(
+        [row % (100, 0), "{not json", "", '["AAPL", 101]', "42", row % (102, 2)]
+    )
+
+    async def scenario():
+        report = await service.import_stream(io.StringIO(data), "ndjson", "job", 2)
+        return report, await db.history.count_documents({})
+
+    report, stored = asyncio.run(scenario())
+
+    assert report["status"] == "completed"
+    assert (report["rows"], report["inserted"], report["invalid"]) == (5, 2, 3)
+    assert [e["line"] for e in report["errors"]] == [2, 4, 5]
+    assert stored == 2
@@ -0,0 +1,103 @@
+import asyncio
+
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.monitoring.metrics import ETL_QUOTE_WRITES
+from backend.app.services.change_detection import QuoteChangeDetector
+from backend.app.services.data_service import DataService
+from backend.app.services.providers import GuardedProvider, StockDataProvider
+
+
+class QuoteProvider(StockDataProvider):
+    def __init__(self):
+        super().__init__(GuardedProvider("fake", 100, 30.0), "http://upstream", "t")
+        self.price = 100.0
+
+    async def _get(self, url, symbols):
+        quote = {"name": "Apple", "currency": "USD", "day_change": 0.5}
+        return {"data": [{**quote, "ticker": s, "price": self.price} for s in symbols]}
+
+
+def quote(ticker, price):
+    return {"ticker": ticker, "price": price, "day_change": 0.5}
+
+
+def make_service(db, provider, detector):
+    return DataService(
+        db.stocks,
+        MongoLogger(db.logs),
+        db.history,
+        change_detector=detector,
+        quote_provider=provider,
+    )
+
+
+def writes():
+    return (
+        ETL_QUOTE_WRITES.value(result="written"),
+        ETL_QUOTE_WRITES.value(result="skipped"),
+    )
+
+
+def test_unchanged_quotes_only_bump_last_checked(db):
+    provider = QuoteProvider()
+    service = make_service(db, provider, QuoteChangeDetector())
+
+    async def scenario():
+        await service.run_etl_ticker("AAPL")
+        before = writes()
+        await service.run_etl_ticker("AAPL")
+        await service.run_etl_tickers(["AAPL"])
+        after = writes()
+        provider.price = 101.0
+        await service.run_etl_ticker("AAPL")
+        return (
+            before,
+            after,
+            await db.history.count_documents({}),
+            await db.stocks.find_one({"ticker": "AAPL"}),
+        )
+
+    before, after, history, stock = asyncio.run(scenario())
+
+    assert after[0] == before[0]
+    assert after[1] == before[1] + 2
+    assert history == 2
+    assert stock["price"] == 101.0 and "last_checked" in stock
+
+
+def test_quote_changed_by_another_worker_is_written_again(db):
+    provider = QuoteProvider()
+    service = make_service(db, provider, QuoteChangeDetector())
+    # A second worker with its own memory of the last quote.
+    other = make_service(db, QuoteProvider(), QuoteChangeDetector())
+
+    async def scenario():
+        await service.run_etl_ticker("AAPL")
+        other._quote_provider.price = 105.0
+        await other.run_etl_ticker("AAPL")
+        # This worker still remembers 100.0, so the comparison alone says
+        # "unchanged"; the guarded last_checked update must notice it isn't.
+        await service.run_etl_ticker("AAPL")
+        return (
+            await db.history.count_documents({}),
+            await db.stocks.find_one({"ticker": "AAPL"}),
+        )
+
+    history, stock = asyncio.run(scenario())
+
+    assert history == 3
+    assert stock["price"] == 100.0
+
+
+def test_detector_is_seeded_from_stored_quotes(db):
+    detector = QuoteChangeDetector()
+
+    async def scenario():
+        await db.stocks.insert_one(quote("AAPL", 100.0))
+        await detector.seed(db.stocks, ["AAPL", "MSFT"])
+
+    asyncio.run(scenario())
+
+    assert not detector.has_changed(quote("AAPL", 100.0))
+    assert detector.has_changed(quote("AAPL", 100.1))
+    assert detector.has_changed(quote("MSFT", 1.0))
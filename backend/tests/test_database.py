@@ -0,0 +1,14 @@
+from backend.app.database.database import Database
+from backend.tests.mongo_standin import AsyncMongoStandIn
+
+
+def test_handles_are_cached_per_instance_and_workload():
+    first, second = Database(), Database()
+    first.connect(AsyncMongoStandIn(), "test")
+    second.connect(AsyncMongoStandIn(), "test")
+
+    users = first.collection("users", "users")
+
+    assert first.collection("users", "users") is users
+    assert second.collection("users", "users") is not users
+    assert first.collection("users") is not users
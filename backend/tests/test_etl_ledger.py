@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services import etl_ledger
+from backend.app.services.data_service import DataService
+from backend.app.services.etl_ledger import EtlLedger, EtlRun
+from backend.app.services.providers import GuardedProvider, StockDataProvider
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(etl_ledger.time, "perf_counter", clock)
+    return clock
+
+
+def test_stage_durations_accumulate(clock):
+    run = EtlRun("bulk", ["AAPL", "MSFT"])
+
+    with run.stage("fetch"):
+        clock.now += 0.25
+    with run.stage("upsert"):
+        clock.now += 0.1
+    with pytest.raises(RuntimeError):
+        with run.stage("fetch"):
+            clock.now += 0.5
+            raise RuntimeError("upstream")
+    clock.now += 0.05
+
+    record = run.record()
+
+    assert record["stages_ms"]["fetch"] == 750.0
+    assert record["stages_ms"]["upsert"] == 100.0
+    assert record["stages_ms"]["history"] == 0.0
+    assert record["duration_ms"] == 900.0
+    assert record["finished_at"] - record["started_at"] == timedelta(seconds=0.9)
+    assert record["ticker_count"] == 2
+
+
+@pytest.mark.parametrize(
+    "succeeded, failed, error, status",
+    [
+        (2, 0, None, "success"),
+        (1, 1, None, "partial"),
+        (0, 2, None, "failed"),
+        (2, 0, "database unavailable", "failed"),
+    ],
+)
+def test_run_status(succeeded, failed, error, status):
+    run = EtlRun("bulk", ["AAPL", "MSFT"])
+    run.succeeded, run.failed, run.error = succeeded, failed, error
+
+    assert run.record()["status"] == status
+
+
+class RejectingProvider(StockDataProvider):
+    def __init__(self):
+        super().__init__(GuardedProvider("fake", 100, 30.0), "http://upstream", "t")
+
+    async def _get(self, url, symbols):
+        request = httpx.Request("GET", url)
+        raise httpx.HTTPStatusError(
+            "error", request=request, response=httpx.Response(404, request=request)
+        )
+
+
+def test_failed_etl_run_is_recorded(db):
+    service = DataService(
+        db.stocks,
+        MongoLogger(db.logs),
+        db.history,
+        etl_runs_collection=db.etl_runs,
+        quote_provider=RejectingProvider(),
+    )
+
+    async def scenario():
+        await service.run_etl_ticker("AAPL")
+        return await EtlLedger(db.etl_runs).list_runs()
+
+    [run] = asyncio.run(scenario())
+
+    assert run["kind"] == "ticker" and run["tickers"] == ["AAPL"]
+    assert run["status"] == "failed"
+    assert run["succeeded"] == 0
+
+
+def test_finish_never_fails_the_run(db):
+    ledger = EtlLedger(db.etl_runs)
+
+    async def insert_one(record):
+        raise RuntimeError("database unavailable")
+
+    ledger.collection.insert_one = insert_one
+
+    assert asyncio.run(ledger.finish(ledger.start("ticker", ["AAPL"]))) is None
+
+
+def test_list_runs_order_filters_and_limit(db):
+    ledger = EtlLedger(db.etl_runs)
+    now = datetime.now(timezone.utc)
+    runs = [
+        ("a", 30.0, "success", now - timedelta(minutes=3)),
+        ("b", 90.0, "failed", now - timedelta(minutes=2)),
+        ("c", 60.0, "success", now - timedelta(minutes=1)),
+        ("d", 10.0, "partial", now),
+    ]
+
+    async def scenario():
+        await db.etl_runs.insert_many(
+            [
+                {"kind": k, "duration_ms": d, "status": s, "started_at": t}
+                for k, d, s, t in runs
+            ]
+        )
+        return (
+            await ledger.list_runs(),
+            await ledger.list_runs(order="recent", limit=2),
+            await ledger.list_runs(status="success"),
+            await ledger.list_runs(
+                since=now - timedelta(minutes=2), until=now, order="recent"
+            ),
+        )
+
+    slowest, recent, succeeded, window = asyncio.run(scenario())
+
+    assert [r["kind"] for r in slowest] == ["b", "c", "a", "d"]
+    assert [r["kind"] for r in recent] == ["d", "c"]
+    assert [r["kind"] for r in succeeded] == ["c", "a"]
+    assert [r["kind"] for r in window] == ["c", "b"]
+    assert all(isinstance(r["_id"], str) for r in slowest)
@@ -0,0 +1,104 @@
+import asyncio
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services import export_service
+from backend.app.services.data_service import DataService
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def history(ticker, count):
+    return [
+        {
+            "ticker": ticker,
+            "price": 100.0 + i,
+            "day_change": 0.5,
+            "timestamp": START + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def service(db, monkeypatch):
+    monkeypatch.setattr(env, "HISTORY_STORAGE_MODE", "buckets")
+    monkeypatch.setattr(env, "HISTORY_BUCKET_MAX_COUNT", 10)
+    return DataService(
+        db.stocks,
+        MongoLogger(db.logs),
+        db.history,
+        history_buckets_collection=db.history_buckets,
+    )
+
+
+async def seed(service):
+    # Loose rows not yet migrated next to bucketed ones.
+    await service._history._rows.insert_many(history("MSFT", 7))
+    for row in history("AAPL", 25):
+        await service._history.append(
+            row["ticker"], row["price"], row["day_change"], row["timestamp"]
+        )
+
+
+def collect(service, tickers, fmt, **kwargs):
+    async def scenario():
+        await seed(service)
+        return [chunk async for chunk in service.export_history(tickers, fmt, **kwargs)]
+
+    return asyncio.run(scenario())
+
+
+def test_history_is_read_in_bounded_batches(service):
+    async def scenario():
+        await seed(service)
+        return [
+            batch
+            async for batch in service._history.iter_batches(
+                ["AAPL", "MSFT"], batch_size=4
+            )
+        ]
+
+    batches = asyncio.run(scenario())
+
+    assert max(len(batch) for batch in batches) == 4
+    assert sum(len(batch) for batch in batches) == 32
+
+
+def test_csv_export_streams_one_chunk_per_batch(service):
+    chunks = collect(
+        service,
+        ["AAPL", "MSFT"],
+        "csv",
+        since=START + timedelta(minutes=5),
+        until=START + timedelta(minutes=20),
+        batch_size=4,
+    )
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+    assert rows[0] == list(export_service.COLUMNS)
+    assert len(rows) - 1 == 15 + 2
+    assert len(chunks) == 1 + 5
+    aapl = [r for r in rows[1:] if r[0] == "AAPL"]
+    assert [float(r[2]) for r in aapl] == [105.0 + i for i in range(15)]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_arrow_formats_round_trip(service, fmt):
+    pa = pytest.importorskip("pyarrow")
+    chunks = collect(service, ["AAPL", "MSFT"], fmt, batch_size=8)
+    data = b"".join(chunks)
+
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(data).read_all()
+    else:
+        table = pa.parquet.read_table(pa.BufferReader(data))
+
+    assert table.column_names == list(export_service.COLUMNS)
+    assert table.num_rows == 32
+    assert len(chunks) > 1
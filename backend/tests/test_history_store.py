@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.database.history_store import HistoryStore, migrate_rows_to_buckets
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def buckets(monkeypatch):
+    monkeypatch.setattr(env, "HISTORY_BUCKET_SECONDS", 3600)
+    monkeypatch.setattr(env, "HISTORY_BUCKET_MAX_COUNT", 10)
+
+
+def rows(ticker, count, start=START, step=timedelta(minutes=1)):
+    return [
+        {
+            "_id": f"{ticker}:{start:%H%M}:{i}",
+            "ticker": ticker,
+            "price": 100.0 + i,
+            "day_change": 0.5,
+            "timestamp": start + i * step,
+        }
+        for i in range(count)
+    ]
+
+
+async def bucket_counts(collection):
+    return sorted(
+        [
+            (b["ticker"], b["bucket_start"].replace(tzinfo=timezone.utc), b["count"])
+            async for b in collection.find({})
+        ]
+    )
+
+
+def test_full_bucket_rolls_over_to_a_sibling(db):
+    store = HistoryStore(db.history, db.history_buckets, "buckets")
+
+    async def scenario():
+        for row in rows("AAPL", 25):
+            await store.append(
+                "AAPL", row["price"], row["day_change"], row["timestamp"]
+            )
+        return await bucket_counts(db.history_buckets), await store.read("AAPL")
+
+    counts, history = asyncio.run(scenario())
+
+    assert counts == [("AAPL", START, 5), ("AAPL", START, 10), ("AAPL", START, 10)]
+    assert [h["price"] for h in history] == [124.0 - i for i in range(25)]
+
+
+def test_migration_packs_whole_windows_and_respects_the_cap(db):
+    data = rows("AAPL", 25) + rows("AAPL", 3, START + timedelta(hours=1))
+    data += rows("MSFT", 4)
+
+    async def scenario():
+        await db.history.insert_many(data)
+        converted = await migrate_rows_to_buckets(
+            db.history, db.history_buckets, batch_size=12
+        )
+        return converted, await bucket_counts(db.history_buckets)
+
+    converted, counts = asyncio.run(scenario())
+
+    hour = START + timedelta(hours=1)
+    assert converted == 32
+    assert counts == [
+        ("AAPL", START, 5),
+        ("AAPL", START, 10),
+        ("AAPL", START, 10),
+        ("AAPL", hour, 3),
+        ("MSFT", START, 4),
+    ]
+
+
+def test_rows_newer_than_the_cutoff_are_left_alone(db):
+    cutoff = START + timedelta(hours=1)
+
+    async def scenario():
+        await db.history.insert_many(rows("AAPL", 4, START, timedelta(minutes=30)))
+        converted = await migrate_rows_to_buckets(
+            db.history, db.history_buckets, until=cutoff
+        )
+        return converted, await db.history.count_documents({})
+
+    assert asyncio.run(scenario()) == (2, 2)
+
+
+def test_rerunning_an_interrupted_migration_converts_each_row_once(db):
+    data = rows("AAPL", 25) + rows("MSFT", 7)
+    store = HistoryStore(db.history, db.history_buckets, "buckets")
+
+    async def scenario():
+        await db.history.insert_many(data)
+        first = await migrate_rows_to_buckets(db.history, db.history_buckets)
+        # As if the first run had crashed after writing its buckets but before
+        # deleting the rows.
+        await db.history.insert_many(data)
+        second = await migrate_rows_to_buckets(db.history, db.history_buckets)
+        third = await migrate_rows_to_buckets(db.history, db.history_buckets)
+        return (
+            first,
+            second,
+            third,
+            await db.history.count_documents({}),
+            await store.read("AAPL"),
+        )
+
+    first, second, third, remaining, history = asyncio.run(scenario())
+
+    assert (first, second, third, remaining) == (32, 32, 0, 0)
+    assert len(history) == 25
+
+
+def test_writes_and_dedupe_use_the_primary_handles(db):
+    # The "secondary" is an empty copy that hasn't caught up yet.
+    store = HistoryStore(
+        db.history,
+        db.history_buckets,
+        "buckets",
+        rows_reads=db.lagging_history,
+        buckets_reads=db.lagging_history_buckets,
+    )
+    data = rows("AAPL", 5)
+
+    async def scenario():
+        first = await store.append_many(data)
+        second = await store.append_many(data)
+        return first, second, await store.read("AAPL")
+
+    first, second, stale = asyncio.run(scenario())
+
+    assert (first, second) == ((5, 0), (0, 5))
+    assert stale == []
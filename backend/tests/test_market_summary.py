@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.data_service import DataService
+
+
+def stock(ticker, currency, price, day_change, age=0, checked_age=None):
+    now = datetime.now(timezone.utc)
+    doc = {
+        "ticker": ticker,
+        "name": ticker.title(),
+        "currency": currency,
+        "price": price,
+        "day_change": day_change,
+        "last_updated": now - timedelta(seconds=age),
+    }
+    if checked_age is not None:
+        doc["last_checked"] = now - timedelta(seconds=checked_age)
+    return doc
+
+
+@pytest.fixture
+def service(db):
+    return DataService(db.stocks, MongoLogger(db.logs), db.history)
+
+
+def summarize(db, service, stocks, **kwargs):
+    async def scenario():
+        if stocks:
+            await db.stocks.insert_many(stocks)
+        return await service.stored_market_summary(**kwargs)
+
+    return asyncio.run(scenario())
+
+
+def test_summary_over_all_stored_quotes(db, service):
+    summary = summarize(
+        db,
+        service,
+        [
+            stock("AAPL", "USD", 150.0, 2.0),
+            stock("MSFT", "USD", 400.0, -1.0),
+            stock("SAP", "EUR", 200.0, 0.5),
+        ],
+    )
+
+    assert summary["count"] == 3
+    assert summary["average_price"] == 250.0
+    assert summary["average_day_change"] == pytest.approx(0.5)
+    assert summary["top_gainer"]["ticker"] == "AAPL"
+    assert summary["top_loser"]["ticker"] == "MSFT"
+    assert summary["tickers"] == []
+
+
+def test_summary_grouped_by_currency(db, service):
+    summary = summarize(
+        db,
+        service,
+        [
+            stock("AAPL", "USD", 150.0, 2.0),
+            stock("MSFT", "USD", 400.0, -1.0),
+            stock("SAP", "EUR", 200.0, 0.5),
+            stock("ASML", "EUR", 600.0, 1.5),
+        ],
+        tickers=["AAPL", "MSFT", "SAP"],
+        by_currency=True,
+    )
+
+    assert summary["tickers"] == ["AAPL", "MSFT", "SAP"]
+    assert [(g["currency"], g["count"]) for g in summary["groups"]] == [
+        ("EUR", 1),
+        ("USD", 2),
+    ]
+    usd = summary["groups"][1]
+    assert usd["average_price"] == 275.0
+    assert (usd["top_gainer"]["ticker"], usd["top_loser"]["ticker"]) == (
+        "AAPL",
+        "MSFT",
+    )
+
+
+def test_stale_quotes_are_left_out(db, service):
+    summary = summarize(
+        db,
+        service,
+        [
+            stock("AAPL", "USD", 150.0, 2.0),
+            stock("MSFT", "USD", 400.0, -1.0, age=3600),
+            stock("NVDA", "USD", 100.0, 3.0, age=3600, checked_age=10),
+        ],
+        max_age_seconds=600,
+    )
+
+    assert summary["count"] == 2
+    assert summary["top_gainer"]["ticker"] == "NVDA"
+    assert summary["top_loser"]["ticker"] == "AAPL"
+
+
+@pytest.mark.parametrize("by_currency", [False, True])
+def test_empty_collection(db, service, by_currency):
+    summary = summarize(db, service, [], by_currency=by_currency)
+
+    if by_currency:
+        assert summary == {"tickers": [], "groups": []}
+    else:
+        assert summary == {
+            "tickers": [],
+            "count": 0,
+            "average_price": 0,
+            "average_day_change": 0,
+            "top_gainer": None,
+            "top_loser": None,
+        }
@@ -0,0 +1,130 @@
+import threading
+from types import SimpleNamespace
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app.monitoring.instrumentation import (
+    MetricsMiddleware,
+    MongoCommandMetrics,
+)
+from backend.app.monitoring.metrics import Registry
+from backend.app.routers.metrics import router as metrics_router
+
+
+def test_render_text_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("path",))
+    depth = registry.gauge("queue_depth", "Queued items.")
+    requests.inc(path='a"b\\c\nd')
+    requests.inc(2.5, path="/")
+    depth.inc(3)
+    depth.dec()
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/"} 2.5\n'
+        'requests_total{path="a\\"b\\\\c\\nd"} 1\n'
+        "# HELP queue_depth Queued items.\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 2\n"
+    )
+
+
+def test_shards_from_every_thread_are_merged():
+    registry = Registry()
+    counter = registry.counter("writes_total", "Writes.", ("kind",))
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(1.0,))
+
+    def write():
+        for _ in range(1000):
+            counter.inc(kind="quote")
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(kind="quote")
+
+    assert len(counter._shards) == 5
+    assert counter.value(kind="quote") == 4001
+    assert histogram.collect()[()][2] == 4000
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.5, 0.1)
+    )
+    for value in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe(value, route="/q")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/q",le="0.1"} 2',
+        'latency_seconds_bucket{route="/q",le="0.5"} 3',
+        'latency_seconds_bucket{route="/q",le="+Inf"} 4',
+        'latency_seconds_sum{route="/q"} 2.45',
+        'latency_seconds_count{route="/q"} 4',
+    ]
+
+
+def command_event(name, collection, request_id, duration_micros=2500):
+    return SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        command_name=name,
+        command={name: collection},
+        duration_micros=duration_micros,
+    )
+
+
+def test_metrics_scrape():
+    app = FastAPI()
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/scrape-test/{ticker}")
+    async def lookup(ticker: str):
+        if ticker == "NOPE":
+            raise HTTPException(status_code=404)
+        return {"ticker": ticker}
+
+    client = TestClient(app)
+    client.get("/scrape-test/AAPL")
+    client.get("/scrape-test/MSFT")
+    client.get("/scrape-test/NOPE")
+
+    listener = MongoCommandMetrics()
+    listener.started(command_event("find", "scrape_test_stocks", 1))
+    listener.succeeded(command_event("find", "scrape_test_stocks", 1))
+    listener.started(command_event("insert", "scrape_test_stocks", 2))
+    listener.failed(command_event("insert", "scrape_test_stocks", 2))
+
+    response = client.get("/metrics")
+    lines = response.text.splitlines()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_requests_total{method="GET",route="/scrape-test/{ticker}",status="200"} 2'
+        in lines
+    )
+    assert (
+        'http_requests_total{method="GET",route="/scrape-test/{ticker}",status="404"} 1'
+        in lines
+    )
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/scrape-test/{ticker}"} 3' in lines
+    )
+    assert (
+        'mongo_command_duration_seconds_bucket{collection="scrape_test_stocks",'
+        'command="find",le="0.0025"} 1' in lines
+    )
+    assert (
+        'mongo_command_failures_total{collection="scrape_test_stocks",'
+        'command="insert"} 1' in lines
+    )
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from backend.app.database import migrations
+from backend.app.database.migrations import migration_state, start_migrations
+
+
+@pytest.fixture(autouse=True)
+def state(monkeypatch):
+    monkeypatch.setattr(migration_state, "ready", False)
+    monkeypatch.setattr(migration_state, "error", None)
+    monkeypatch.setattr(migration_state, "task", None)
+    monkeypatch.setattr(migration_state, "log_task", None)
+
+
+def test_background_failure_is_recorded_and_logged(db, monkeypatch):
+    async def failing(db):
+        raise ConnectionError("no primary available")
+
+    monkeypatch.setattr(migrations, "ensure_indexes", failing)
+
+    async def scenario():
+        await start_migrations(db, "background")
+        await asyncio.gather(migration_state.task, return_exceptions=True)
+        await asyncio.sleep(0)
+        await migration_state.log_task
+        return [doc async for doc in db.logs.find({"service": "Migrations"})]
+
+    logs = asyncio.run(scenario())
+
+    assert not migration_state.ready
+    assert "no primary available" in migration_state.error
+    assert logs and "no primary available" in logs[0]["metadata"]["exception"]
+
+
+def test_background_success_marks_ready(db):
+    async def scenario():
+        await start_migrations(db, "background")
+        await migration_state.task
+
+    asyncio.run(scenario())
+
+    assert migration_state.ready and migration_state.error is None
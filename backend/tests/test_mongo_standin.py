@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+def test_unordered_bulk_write_continues_past_duplicates(db):
+    async def scenario():
+        await db.items.insert_one({"_id": 1})
+        with pytest.raises(BulkWriteError) as error:
+            await db.items.bulk_write(
+                [InsertOne({"_id": 1}), InsertOne({"_id": 2})], ordered=False
+            )
+        return error.value.details, await db.items.count_documents({})
+
+    details, count = asyncio.run(scenario())
+
+    assert [e["code"] for e in details["writeErrors"]] == [11000]
+    assert details["nInserted"] == 1
+    assert count == 2
+
+
+def test_ordered_bulk_write_stops_at_first_error(db):
+    async def scenario():
+        await db.items.insert_one({"_id": 1})
+        with pytest.raises(BulkWriteError):
+            await db.items.bulk_write(
+                [
+                    InsertOne({"_id": 1}),
+                    UpdateOne({"_id": 2}, {"$set": {"a": 1}}, upsert=True),
+                ]
+            )
+        return await db.items.count_documents({})
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_unsupported_operation_is_named(db):
+    with pytest.raises(TypeError, match="object"):
+        asyncio.run(db.items.bulk_write([object()]))
@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.auth.jwt_utils import create_access_token
+from backend.app.config.config import settings as env
+from backend.app.dependencies.services import get_profile_service, get_user_service
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.monitoring import profiling
+from backend.app.monitoring.profiling import ProfilingMiddleware
+from backend.app.routers.profiling import router
+from backend.app.services.profile_service import ProfileService
+from backend.app.services.user_service import UserService
+
+ADMIN_ID = ObjectId()
+USER_ID = ObjectId()
+
+
+def user(_id, role):
+    name = role.replace("_", "")
+    return {
+        "_id": _id,
+        "full_name": name.title(),
+        "username": name,
+        "email": f"{name}@example.com",
+        "role": role,
+    }
+
+
+def token(user_id):
+    access_token = create_access_token({"user_id": str(user_id)})
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+ADMIN = token(ADMIN_ID)
+STANDARD = token(USER_ID)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(env, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(env, "PROFILING_INTERVAL_MS", 1.0)
+    for name, collection in (
+        ("get_profiles_collection", db.profiles),
+        ("get_logs_collection", db.logs),
+        ("get_users_collection", db.users),
+    ):
+
+        async def get_collection(collection=collection):
+            return collection
+
+        monkeypatch.setattr(profiling, name, get_collection)
+
+    asyncio.run(
+        db.users.insert_many([user(ADMIN_ID, "admin"), user(USER_ID, "standard_user")])
+    )
+
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.get("/quotes/{ticker}")
+    async def slow_quote(ticker: str):
+        await asyncio.sleep(0.05)
+        return {"ticker": ticker}
+
+    app.add_middleware(ProfilingMiddleware)
+    app.dependency_overrides[get_user_service] = lambda: UserService(
+        db.users, MongoLogger(db.logs)
+    )
+    app.dependency_overrides[get_profile_service] = lambda: ProfileService(
+        db.profiles, MongoLogger(db.logs)
+    )
+    return TestClient(app)
+
+
+def stored_profiles(db):
+    async def scenario():
+        return await db.profiles.find({}).to_list(None)
+
+    return asyncio.run(scenario())
+
+
+def test_unflagged_requests_are_not_profiled(client, db):
+    response = client.get("/quotes/AAPL", headers=ADMIN)
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert stored_profiles(db) == []
+
+
+def test_admin_flagged_request_is_profiled(client, db):
+    response = client.get("/quotes/AAPL?profile=1", headers=ADMIN)
+
+    [profile] = stored_profiles(db)
+    assert response.headers["x-profile-id"] == str(profile["_id"])
+    assert profile["trigger"] == "admin"
+    assert profile["route"] == "/quotes/{ticker}"
+    assert profile["path"] == "/quotes/AAPL"
+    assert profile["status"] == 200
+    assert profile["duration_ms"] >= 50
+    assert profile["samples"] > 0
+    assert "slow_quote" in profile["folded"]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in profile["folded"].splitlines()]
+    assert sum(counts) == profile["samples"]
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{}, STANDARD, {"Authorization": "Bearer not-a-token"}],
+)
+def test_only_admins_can_request_a_profile(client, db, headers):
+    response = client.get("/quotes/AAPL", headers={**headers, "X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert stored_profiles(db) == []
+
+
+def test_sampled_requests_are_profiled(client, db, monkeypatch):
+    monkeypatch.setattr(env, "PROFILING_SAMPLE_RATE", 1.0)
+
+    client.get("/quotes/AAPL")
+
+    assert [p["trigger"] for p in stored_profiles(db)] == ["sampled"]
+
+
+def test_only_the_newest_profiles_are_kept(db, monkeypatch):
+    monkeypatch.setattr(env, "PROFILING_RETENTION", 2)
+    service = ProfileService(db.profiles, MongoLogger(db.logs))
+
+    async def scenario():
+        for minute in range(3):
+            await service.save_profile(
+                {"path": f"/p{minute}", "created_at": f"2026-01-01T00:0{minute}"}
+            )
+        return [p["path"] for p in await service.list_profiles()]
+
+    assert asyncio.run(scenario()) == ["/p2", "/p1"]
+
+
+def test_failed_save_is_logged(db):
+    service = ProfileService(db.profiles, MongoLogger(db.logs))
+
+    async def insert_one(profile):
+        raise RuntimeError("database unavailable")
+
+    service.collection.insert_one = insert_one
+
+    async def scenario():
+        saved = await service.save_profile({"path": "/quotes/AAPL"})
+        return saved, await db.logs.find_one({"service": "ProfileService"})
+
+    saved, log = asyncio.run(scenario())
+
+    assert saved is None
+    assert log["metadata"] == {"path": "/quotes/AAPL", "error": "database unavailable"}
+
+
+def test_profiles_router_is_admin_only(client):
+    assert client.get("/profiles").status_code == 401
+    assert client.get("/profiles", headers=STANDARD).status_code == 403
+    assert client.get(f"/profiles/{ObjectId()}", headers=STANDARD).status_code == 403
+
+
+def test_admin_lists_and_downloads_profiles(client):
+    profile_id = client.get("/quotes/AAPL?profile", headers=ADMIN).headers[
+        "x-profile-id"
+    ]
+
+    listed = client.get("/profiles", headers=ADMIN).json()
+    download = client.get(f"/profiles/{profile_id}", headers=ADMIN)
+
+    assert [p["_id"] for p in listed] == [profile_id]
+    assert "folded" not in listed[0]
+    assert download.status_code == 200
+    assert "slow_quote" in download.text
+    assert download.headers["content-disposition"] == (
+        f'attachment; filename="profile_{profile_id}.folded"'
+    )
+    assert client.get(f"/profiles/{ObjectId()}", headers=ADMIN).status_code == 404
+    assert client.get("/profiles/not-an-id", headers=ADMIN).status_code == 404
@@ -0,0 +1,258 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.data_service import DataService
+from backend.app.services.providers import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+    GeminiProvider,
+    GuardedProvider,
+    StockDataProvider,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeQuoteProvider(StockDataProvider):
+    # Answers from a dict after `latency` seconds, or raises while `failing`.
+
+    def __init__(self, guard, quotes=None, latency=0.0, failing=False):
+        super().__init__(guard, "http://primary", "token")
+        self.quotes = quotes or {}
+        self.latency = latency
+        self.failing = failing
+        self.calls = 0
+
+    async def _get(self, url, symbols):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.failing:
+            raise ConnectionError("provider down")
+        return {"data": [self.quotes[s] for s in symbols if s in self.quotes]}
+
+
+def make_guard(threshold=3, reset=30.0, hedge=False, clock=None):
+    return GuardedProvider(
+        "fake", threshold, reset, hedge=hedge, window=50, clock=clock or FakeClock()
+    )
+
+
+def quote(ticker, price=100.0):
+    return {
+        "ticker": ticker,
+        "name": f"{ticker} Inc",
+        "currency": "USD",
+        "price": price,
+        "day_change": 1.5,
+    }
+
+
+def test_breaker_opens_after_consecutive_failures():
+    provider = FakeQuoteProvider(make_guard(threshold=3), failing=True)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            asyncio.run(provider.fetch_quotes(["AAPL"]))
+    assert provider.guard.breaker("quote").state == OPEN
+
+    with pytest.raises(CircuitOpen):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+    assert provider.calls == 3
+
+
+def test_success_resets_failure_count():
+    provider = FakeQuoteProvider(
+        make_guard(threshold=2), quotes={"AAPL": quote("AAPL")}, failing=True
+    )
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+    provider.failing = False
+    asyncio.run(provider.fetch_quotes(["AAPL"]))
+    provider.failing = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+
+    assert provider.guard.breaker("quote").state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    provider = FakeQuoteProvider(
+        make_guard(threshold=1, reset=10.0, clock=clock),
+        quotes={"AAPL": quote("AAPL")},
+        failing=True,
+    )
+    breaker = provider.guard.breaker("quote")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+    assert breaker.state == OPEN
+
+    clock.now = 10.0
+    with pytest.raises(ConnectionError):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+    assert breaker.state == OPEN
+
+    clock.now = 15.0
+    with pytest.raises(CircuitOpen):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+
+    clock.now = 20.0
+    provider.failing = False
+    data = asyncio.run(provider.fetch_quotes(["AAPL"]))
+    assert data["data"][0]["ticker"] == "AAPL"
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("fake", 1, 10.0, clock)
+    breaker.record_failure()
+
+    clock.now = 10.0
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    breaker.release()
+    breaker.before_call()
+
+
+def test_hedge_goes_to_secondary_when_primary_is_slow(monkeypatch):
+    monkeypatch.setattr("backend.app.services.providers.env.HEDGE_MIN_SAMPLES", 5)
+    guard = make_guard(hedge=True)
+    for _ in range(10):
+        guard.latencies("quote").observe(0.01)
+
+    async def slow():
+        await asyncio.sleep(1.0)
+        return "primary"
+
+    async def fast():
+        return "secondary"
+
+    started = time.perf_counter()
+    result = asyncio.run(guard.call("quote", slow, fast))
+
+    assert result == "secondary"
+    assert time.perf_counter() - started < 0.5
+    assert guard.breaker("quote").state == CLOSED
+
+
+def test_hedge_is_not_sent_without_enough_samples():
+    guard = make_guard(hedge=True)
+    calls = []
+
+    async def attempt():
+        calls.append("primary")
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    async def secondary():
+        calls.append("secondary")
+        return "secondary"
+
+    assert asyncio.run(guard.call("quote", attempt, secondary)) == "primary"
+    assert calls == ["primary"]
+
+
+def test_hedge_counts_one_failure_when_both_attempts_fail(monkeypatch):
+    monkeypatch.setattr("backend.app.services.providers.env.HEDGE_MIN_SAMPLES", 5)
+    provider = FakeQuoteProvider(make_guard(hedge=True), latency=0.05, failing=True)
+    for _ in range(10):
+        provider.guard.latencies("quote").observe(0.01)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(provider.fetch_quotes(["AAPL"]))
+
+    assert provider.calls == 2
+    assert provider.guard.breaker("quote").failures == 1
+
+
+def test_etl_falls_back_to_stored_quote_when_circuit_is_open(db):
+    provider = FakeQuoteProvider(
+        make_guard(threshold=1), quotes={"AAPL": quote("AAPL", 101.0)}
+    )
+    service = DataService(
+        db.stocks, MongoLogger(db.logs), db.history, quote_provider=provider
+    )
+
+    async def scenario():
+        stored = await service.run_etl_ticker("AAPL")
+        provider.failing = True
+        failed = await service.run_etl_ticker("AAPL")
+        fallback = await service.run_etl_ticker("AAPL")
+        bulk_failed = await service.run_etl_tickers(["AAPL", "MSFT"])
+        bulk = await service.run_etl_tickers(["AAPL", "MSFT"])
+        return stored, failed, fallback, bulk_failed, bulk
+
+    stored, failed, fallback, bulk_failed, bulk = asyncio.run(scenario())
+
+    assert stored["price"] == 101.0
+    assert failed is None
+    assert provider.guard.breaker("quote").state == OPEN
+    assert fallback["price"] == 101.0 and fallback["stale"] is True
+    assert bulk_failed == []
+    assert [s["ticker"] for s in bulk] == ["AAPL"]
+    assert provider.calls == 3
+
+
+def test_operations_have_separate_breakers_and_latency_windows(monkeypatch):
+    monkeypatch.setattr("backend.app.services.providers.env.HEDGE_MIN_SAMPLES", 5)
+    guard = make_guard(threshold=1, hedge=True)
+    for _ in range(10):
+        guard.latencies("generate_videos").observe(120.0)
+
+    async def fail():
+        raise ConnectionError("video backend down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(guard.call("generate_videos", fail))
+
+    assert guard.breaker("generate_videos").state == OPEN
+    assert guard.breaker("generate_content").state == CLOSED
+    assert guard.hedge_delay("generate_content") is None
+
+
+def test_video_calls_use_their_own_guard():
+    content, video = make_guard(threshold=1), make_guard(threshold=1)
+    provider = GeminiProvider(content, "model", video_guard=video)
+
+    def generate_video(prompt):
+        raise TimeoutError("video timed out")
+
+    provider._generate_video = generate_video
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(provider.generate_video("prompt"))
+
+    assert video.breaker("generate_videos").state == OPEN
+    assert content.breaker("generate_videos").state == CLOSED
+
+
+def test_quote_client_is_reused_within_a_loop():
+    provider = StockDataProvider(make_guard(), "http://primary", "token")
+
+    async def scenario():
+        first, second = provider.client(), provider.client()
+        await provider.aclose()
+        return first, second, provider._client
+
+    first, second, closed = asyncio.run(scenario())
+
+    assert first is second
+    assert first.is_closed and closed is None
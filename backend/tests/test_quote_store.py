@@ -0,0 +1,173 @@
+import asyncio
+import multiprocessing
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.database.quote_store import (
+    SEQ,
+    TICKER_SIZE,
+    QuoteStore,
+    fcntl,
+)
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.data_service import DataService
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="needs POSIX file locks")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "quotes.bin")
+
+
+def open_store(path, slots=16):
+    store = QuoteStore()
+    store.open(path, slots)
+    return store
+
+
+def quote(ticker, price):
+    return {
+        "ticker": ticker,
+        "name": f"{ticker} Inc",
+        "currency": "USD",
+        "price": price,
+        "day_change": price,
+        "last_updated": datetime.now(timezone.utc),
+    }
+
+
+def write_prices(path, count):
+    store = open_store(path)
+    for i in range(1, count + 1):
+        store.put(quote("AAPL", float(i)))
+    store.close()
+
+
+def test_reader_never_sees_a_half_written_quote(path):
+    reader = open_store(path)
+    reader.put(quote("AAPL", 0.0))
+    writer = multiprocessing.get_context("forkserver").Process(
+        target=write_prices, args=(path, 20000)
+    )
+    writer.start()
+
+    reads = []
+    while writer.is_alive():
+        stored = reader.read("AAPL")
+        if stored:
+            reads.append((stored["price"], stored["day_change"]))
+    writer.join()
+
+    assert writer.exitcode == 0
+    assert reads
+    assert all(price == day_change for price, day_change in reads)
+    assert reader.read("AAPL")["price"] == 20000.0
+
+
+def test_read_gives_up_on_a_slot_left_mid_write(path):
+    store = open_store(path)
+    store.put(quote("AAPL", 101.0))
+    offset = store._offset(store._slot("AAPL"))
+    (seq,) = SEQ.unpack_from(store._mm, offset)
+
+    SEQ.pack_into(store._mm, offset, seq + 1)
+    torn = store.read("AAPL")
+    SEQ.pack_into(store._mm, offset, seq + 2)
+
+    assert torn is None
+    assert store.read("AAPL")["price"] == 101.0
+
+
+def test_slot_left_odd_by_a_dead_writer_recovers_on_the_next_write(path):
+    store = open_store(path)
+    store.put(quote("AAPL", 101.0))
+    offset = store._offset(store._slot("AAPL"))
+    SEQ.pack_into(store._mm, offset, 5)
+
+    assert store.read("AAPL") is None
+    store.put(quote("AAPL", 102.0))
+
+    assert store.read("AAPL")["price"] == 102.0
+    assert SEQ.unpack_from(store._mm, offset)[0] % 2 == 0
+
+
+def colliding(slots, count):
+    by_slot = {}
+    for n in range(10000):
+        ticker = f"T{n}"
+        key = ticker.encode().ljust(TICKER_SIZE, b"\0")
+        group = by_slot.setdefault(zlib.crc32(key) % slots, [])
+        group.append(ticker)
+        if len(group) == count:
+            return group
+
+
+def test_colliding_tickers_probe_to_separate_slots(path):
+    first, second = colliding(16, 2)
+    writer = open_store(path)
+    writer.put(quote(first, 1.0))
+    writer.put(quote(second, 2.0))
+    reader = open_store(path)
+
+    assert writer._slot(first) != writer._slot(second)
+    assert reader.read(first)["price"] == 1.0
+    assert reader.read(second)["price"] == 2.0
+
+
+def test_full_table_refuses_new_tickers(path):
+    store = open_store(path, slots=2)
+    store.put(quote("AAPL", 1.0))
+    store.put(quote("MSFT", 2.0))
+
+    assert store.put(quote("TSLA", 3.0)) is False
+    assert store.read("TSLA") is None
+    assert store.claim("TSLA") is True
+
+
+def make_service(db, store):
+    return DataService(db.stocks, MongoLogger(db.logs), db.history, quote_store=store)
+
+
+def test_stock_results_are_served_from_the_table(path, db):
+    store = open_store(path)
+    service = make_service(db, store)
+    store.put(quote("AAPL", 150.0))
+
+    async def scenario():
+        await db.stocks.insert_one(quote("AAPL", 100.0))
+        return await service.stock_results("AAPL")
+
+    stock = asyncio.run(scenario())
+
+    assert stock["price"] == 150.0 and "_id" not in stock
+
+
+def test_stock_results_fall_back_to_mongo_on_a_miss(path, db):
+    store = open_store(path)
+    service = make_service(db, store)
+    stale = quote("MSFT", 150.0)
+    stale["last_updated"] -= timedelta(seconds=env.QUOTE_CACHE_TTL_SECONDS + 1)
+    store.put(stale)
+
+    async def scenario():
+        await db.stocks.insert_many(
+            [
+                {**quote("AAPL", 100.0), "anomaly": {"flagged": False}},
+                quote("MSFT", 200.0),
+            ]
+        )
+        return (
+            await service.stock_results("AAPL"),
+            await service.stock_results("MSFT"),
+        )
+
+    missing, expired = asyncio.run(scenario())
+
+    assert missing["price"] == 100.0 and "_id" in missing
+    assert missing["anomaly"] == {"flagged": False}
+    assert expired["price"] == 200.0
+    assert store.read("AAPL")["price"] == 100.0
@@ -0,0 +1,62 @@
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.middleware.rate_limit import (
+    DEFAULT_LIMITS,
+    RateLimitMiddleware,
+    TokenBuckets,
+    parse_limit,
+    rate_limits,
+)
+
+
+def test_overrides_merge_into_defaults():
+    limits = rate_limits({"ai": "40/60", "video": None})
+
+    assert limits["ai"] == (40, 60.0)
+    assert limits["auth"] == parse_limit(DEFAULT_LIMITS["auth"])
+    assert "video" not in limits
+
+
+def test_bucket_allows_a_burst_then_refills():
+    buckets = TokenBuckets(max_keys=10)
+
+    assert [buckets.take("a", 3, 30.0, now=0.0) for _ in range(3)] == [0.0] * 3
+    assert buckets.take("a", 3, 30.0, now=0.0) == pytest.approx(10.0)
+    assert buckets.take("b", 3, 30.0, now=0.0) == 0.0
+    assert buckets.take("a", 3, 30.0, now=10.0) == 0.0
+    assert buckets.take("a", 3, 30.0, now=10.0) > 0
+
+
+def test_least_recently_used_bucket_is_evicted():
+    buckets = TokenBuckets(max_keys=2)
+    buckets.take("a", 1, 60.0, now=0.0)
+    buckets.take("b", 1, 60.0, now=0.0)
+    buckets.take("c", 1, 60.0, now=0.0)
+
+    assert len(buckets) == 2
+    assert buckets.take("a", 1, 60.0, now=0.0) == 0.0
+
+
+def scope(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"type": "http", "client": (peer, 50000), "headers": headers}
+
+
+@pytest.fixture
+def middleware(monkeypatch):
+    monkeypatch.setattr(env, "RATE_LIMIT_TRUSTED_PROXIES", ["10.0.0.0/8"])
+    return RateLimitMiddleware(app=None)
+
+
+def test_forwarded_client_is_used_behind_a_trusted_proxy(middleware):
+    assert middleware._client(scope("10.0.0.5", "203.0.113.7")) == "ip:203.0.113.7"
+    assert (
+        middleware._client(scope("10.0.0.5", "198.51.100.1, 203.0.113.7, 10.0.0.9"))
+        == "ip:203.0.113.7"
+    )
+
+
+def test_forwarded_header_is_ignored_from_untrusted_peers(middleware):
+    assert middleware._client(scope("203.0.113.7", "1.2.3.4")) == "ip:203.0.113.7"
+    assert middleware._client(scope("10.0.0.5")) == "ip:10.0.0.5"
@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from backend.app.config.config import settings as env
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.data_service import DataService
+from backend.app.services.providers import (
+    CircuitOpen,
+    GuardedProvider,
+    StockDataProvider,
+)
+from backend.app.services.retry_queue import (
+    RetryQueue,
+    backoff,
+    is_transient,
+    run_retry_worker,
+)
+
+
+@pytest.fixture
+def queue(db, monkeypatch):
+    monkeypatch.setattr(env, "ETL_RETRY_BASE_DELAY_SECONDS", 10.0)
+    monkeypatch.setattr(env, "ETL_RETRY_MAX_ATTEMPTS", 3)
+    return RetryQueue(db.etl_retries, db.etl_dead_letters)
+
+
+async def make_due(queue):
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await queue.collection.update_many({}, {"$set": {"next_attempt_at": past}})
+
+
+def http_error(status):
+    request = httpx.Request("GET", "http://upstream")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+def test_transient_errors():
+    assert is_transient(http_error(503))
+    assert is_transient(http_error(429))
+    assert is_transient(httpx.ConnectTimeout("timeout"))
+    assert is_transient(CircuitOpen("stockdata", 5))
+    assert not is_transient(http_error(404))
+    assert not is_transient(ValueError("invalid quote"))
+
+
+def test_backoff_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(env, "ETL_RETRY_BASE_DELAY_SECONDS", 10.0)
+    monkeypatch.setattr(env, "ETL_RETRY_MAX_DELAY_SECONDS", 60.0)
+
+    assert 5.0 <= backoff(0) <= 10.0
+    assert 20.0 <= backoff(2) <= 40.0
+    assert 30.0 <= backoff(10) <= 60.0
+
+
+def test_failures_coalesce_and_are_not_due_before_backoff(queue):
+    async def scenario():
+        await queue.enqueue(["aapl", "AAPL", "MSFT"], "boom")
+        await queue.enqueue(["AAPL"], "boom again")
+        pending = await queue.list_pending()
+        claimed = await queue.claim(10)
+        return pending, claimed
+
+    pending, claimed = asyncio.run(scenario())
+
+    assert sorted(d["_id"] for d in pending) == ["AAPL", "MSFT"]
+    assert {d["_id"]: d["last_error"] for d in pending}["AAPL"] == "boom again"
+    assert claimed == []
+
+
+def test_claim_is_exclusive_until_the_lease_expires(queue):
+    async def scenario():
+        await queue.enqueue(["AAPL", "MSFT"], "boom")
+        await make_due(queue)
+        first = await queue.claim(10)
+        second = await queue.claim(10)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert sorted(d["_id"] for d in first) == ["AAPL", "MSFT"]
+    assert len({d["lease"] for d in first}) == 1
+    assert second == []
+
+
+def test_retries_end_in_dead_letters_and_can_be_replayed(queue):
+    async def scenario():
+        await queue.enqueue(["AAPL"], "boom")
+        for _ in range(env.ETL_RETRY_MAX_ATTEMPTS):
+            await make_due(queue)
+            dead = await queue.reschedule(await queue.claim(10))
+        letters = await queue.list_dead_letters()
+        pending = await queue.list_pending()
+        replayed = await queue.replay(["aapl"])
+        claimed = await queue.claim(10)
+        return dead, letters, pending, replayed, claimed
+
+    dead, letters, pending, replayed, claimed = asyncio.run(scenario())
+
+    assert [d["_id"] for d in dead] == ["AAPL"]
+    assert [(d["ticker"], d["attempts"]) for d in letters] == [("AAPL", 3)]
+    assert pending == []
+    assert replayed == ["AAPL"]
+    assert [(d["_id"], d["attempts"]) for d in claimed] == [("AAPL", 0)]
+
+
+def test_expired_lease_cannot_complete_a_reclaimed_entry(queue, monkeypatch):
+    monkeypatch.setattr(env, "ETL_RETRY_LEASE_SECONDS", 0.0)
+
+    async def scenario():
+        await queue.enqueue(["AAPL"], "boom")
+        await make_due(queue)
+        stale = await queue.claim(10)
+        current = await queue.claim(10)
+        stale_completed = await queue.complete(stale)
+        stale_dead = await queue.reschedule(stale)
+        pending = await queue.list_pending()
+        completed = await queue.complete(current)
+        return stale_completed, stale_dead, pending, completed
+
+    stale_completed, stale_dead, pending, completed = asyncio.run(scenario())
+
+    assert stale_completed == 0
+    assert stale_dead == []
+    assert [d["attempts"] for d in pending] == [0]
+    assert completed == 1
+
+
+def test_worker_logs_failures_and_keeps_running(queue, db):
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        await queue.enqueue(["AAPL"], "boom")
+        await make_due(queue)
+        worker = asyncio.create_task(
+            run_retry_worker(queue, factory, MongoLogger(db.logs), 0.01)
+        )
+        await asyncio.sleep(0.1)
+        worker.cancel()
+        return [doc async for doc in db.logs.find({"service": "RetryQueue"})]
+
+    logs = asyncio.run(scenario())
+
+    assert calls
+    assert logs and "database unavailable" in logs[0]["metadata"]["exception"]
+
+
+class FailingProvider(StockDataProvider):
+    def __init__(self, error):
+        guard = GuardedProvider("fake", 100, 30.0)
+        super().__init__(guard, "http://upstream", "t")
+        self.error = error
+
+    async def _get(self, url, symbols):
+        if self.error:
+            raise self.error
+        return {"data": []}
+
+
+@pytest.mark.parametrize(
+    "error, queued",
+    [
+        (http_error(502), ["AAPL"]),
+        (httpx.ReadTimeout("timeout"), ["AAPL"]),
+        (http_error(404), []),
+        (None, []),
+    ],
+)
+def test_only_transient_etl_failures_are_queued(queue, db, error, queued):
+    service = DataService(
+        db.stocks,
+        MongoLogger(db.logs),
+        db.history,
+        retry_queue=queue,
+        quote_provider=FailingProvider(error),
+    )
+
+    async def scenario():
+        await service.run_etl_ticker("AAPL")
+        await service.run_etl_tickers(["AAPL"])
+        return [d["_id"] for d in await queue.list_pending()]
+
+    assert asyncio.run(scenario()) == queued
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from backend.app.auth import hashing
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services import user_service
+from backend.app.services.user_service import UserService
+
+
+def row(username, password="secret"):
+    return {
+        "username": username,
+        "full_name": username.title(),
+        "email": f"{username}@example.com",
+        "password": password,
+    }
+
+
+@pytest.fixture
+def service(db, monkeypatch):
+    async def fake_hash(passwords):
+        return [f"hashed:{p}" for p in passwords]
+
+    monkeypatch.setattr(user_service, "hash_passwords", fake_hash)
+    return UserService(db.users, MongoLogger(db.logs))
+
+
+def test_existing_users_are_reported_without_a_unique_index(service, db):
+    async def scenario():
+        await db.users.insert_one({"username": "alice", "password": "x"})
+        result = await service.import_users([row("alice"), row("bob"), row("bob")])
+        count = await db.users.count_documents({"username": "alice"})
+        return result, count
+
+    result, count = asyncio.run(scenario())
+
+    assert [r["status"] for r in result["results"]] == [
+        "duplicate",
+        "created",
+        "duplicate",
+    ]
+    assert result["summary"] == {"duplicate": 2, "created": 1}
+    assert count == 1
+
+
+def test_users_created_during_the_import_are_duplicates(service):
+    async def scenario():
+        users = service.collection
+        await users.create_index("username", unique=True)
+        original = users.insert_many
+
+        async def racing_insert(docs, **kwargs):
+            await users.insert_one({"username": "carol", "password": "x"})
+            return await original(docs, **kwargs)
+
+        users.insert_many = racing_insert
+        return await service.import_users([row("carol"), row("dave")])
+
+    result = asyncio.run(scenario())
+
+    assert [r["status"] for r in result["results"]] == ["duplicate", "created"]
+
+
+def test_hash_pool_hashes_in_worker_processes():
+    try:
+        hashes = asyncio.run(hashing.hash_passwords(["one", "two"]))
+    finally:
+        hashing.shutdown_hash_pool()
+
+    assert hashing.verify_password("one", hashes[0])
+    assert hashing.verify_password("two", hashes[1])
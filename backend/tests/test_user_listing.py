@@ -0,0 +1,24 @@
+import asyncio
+
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.services.user_service import UserService
+
+
+def test_count_and_pages_exclude_admins(db):
+    service = UserService(db.users, MongoLogger(db.logs))
+
+    async def scenario():
+        await db.users.insert_many(
+            [{"username": f"user{i}", "role": "standard_user"} for i in range(5)]
+            + [{"username": "root", "role": "admin"}]
+        )
+        count = await service.count_users()
+        first, cursor = await service.get_all_users(limit=3)
+        second, end = await service.get_all_users(limit=3, after=cursor)
+        return count, first, second, end
+
+    count, first, second, end = asyncio.run(scenario())
+
+    assert count == 5
+    assert [u["username"] for u in first + second] == [f"user{i}" for i in range(5)]
+    assert end is None
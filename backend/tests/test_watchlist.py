@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.config.config import settings as env
+from backend.app.dependencies.auth import get_current_user
+from backend.app.dependencies.services import get_data_service, get_user_service
+from backend.app.models.models_user import UserResponse
+from backend.app.models.mongo_logger import MongoLogger
+from backend.app.routers.users import router
+from backend.app.services.data_service import DataService
+from backend.app.services.user_service import UserService
+
+USER_ID = ObjectId()
+
+
+def quote(ticker, price, age=0):
+    updated = datetime.now(timezone.utc) - timedelta(seconds=age)
+    return {"ticker": ticker, "price": price, "last_updated": updated}
+
+
+def stub_refresh(service, quotes):
+    requested = []
+
+    async def get_quotes(tickers):
+        requested.append(list(tickers))
+        return [dict(q, _id=ObjectId()) for q in quotes if q["ticker"] in tickers]
+
+    service.get_quotes = get_quotes
+    return requested
+
+
+@pytest.fixture
+def data_service(db):
+    return DataService(db.stocks, MongoLogger(db.logs), db.history)
+
+
+@pytest.fixture
+def client(db, data_service):
+    asyncio.run(
+        db.users.insert_one(
+            {
+                "_id": USER_ID,
+                "full_name": "Jane Doe",
+                "username": "jane",
+                "email": "jane@example.com",
+                "role": "standard_user",
+            }
+        )
+    )
+    app = FastAPI()
+    app.include_router(router)
+    app.state.role = "standard_user"
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(
+        _id=str(USER_ID),
+        full_name="Jane Doe",
+        username="jane",
+        email="jane@example.com",
+        role=app.state.role,
+    )
+    app.dependency_overrides[get_user_service] = lambda: UserService(
+        db.users, MongoLogger(db.logs)
+    )
+    app.dependency_overrides[get_data_service] = lambda: data_service
+    return TestClient(app)
+
+
+def test_watchlist_quotes_refresh_only_stale_tickers(db, data_service):
+    stale_age = env.DASHBOARD_MAX_AGE_SECONDS + 60
+    requested = stub_refresh(data_service, [quote("MSFT", 410.0)])
+
+    async def scenario():
+        await db.stocks.insert_many(
+            [quote("AAPL", 150.0), quote("MSFT", 400.0, age=stale_age)]
+        )
+        return await data_service.watchlist_quotes(["msft", "GOOG", "AAPL"])
+
+    stocks = asyncio.run(scenario())
+
+    assert requested == [["MSFT", "GOOG"]]
+    assert [(s["ticker"], s["price"]) for s in stocks] == [
+        ("MSFT", 410.0),
+        ("AAPL", 150.0),
+    ]
+    assert all("_id" not in s for s in stocks)
+
+
+def test_watchlist_quotes_skip_refresh_when_fresh(db, data_service):
+    requested = stub_refresh(data_service, [])
+
+    async def scenario():
+        await db.stocks.insert_one(quote("AAPL", 150.0))
+        return await data_service.watchlist_quotes(["AAPL"])
+
+    stocks = asyncio.run(scenario())
+
+    assert requested == []
+    assert [s["ticker"] for s in stocks] == ["AAPL"]
+
+
+def test_set_watchlist_dedupes_tickers(client):
+    response = client.put(
+        f"/users/{USER_ID}/watchlist", json={"tickers": ["aapl", " AAPL", "msft"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["watchlist"] == ["AAPL", "MSFT"]
+
+
+def test_watchlist_cap(client, monkeypatch):
+    monkeypatch.setattr(env, "WATCHLIST_MAX_TICKERS", 2)
+
+    too_many = client.put(
+        f"/users/{USER_ID}/watchlist", json={"tickers": ["AAPL", "MSFT", "GOOG"]}
+    )
+    client.put(f"/users/{USER_ID}/watchlist", json={"tickers": ["AAPL", "MSFT"]})
+    again = client.post(f"/users/{USER_ID}/watchlist/aapl")
+    past_cap = client.post(f"/users/{USER_ID}/watchlist/GOOG")
+
+    assert too_many.status_code == 400
+    assert again.status_code == 200
+    assert past_cap.status_code == 400
+    assert client.get(f"/users/{USER_ID}/watchlist").json()["watchlist"] == [
+        "AAPL",
+        "MSFT",
+    ]
+
+
+def test_dashboard_lists_missing_tickers(client, db, data_service):
+    stub_refresh(data_service, [])
+    asyncio.run(db.stocks.insert_one(quote("AAPL", 150.0)))
+    client.put(f"/users/{USER_ID}/watchlist", json={"tickers": ["AAPL", "NOPE"]})
+
+    body = client.get(f"/users/{USER_ID}/dashboard").json()
+
+    assert [s["ticker"] for s in body["stocks"]] == ["AAPL"]
+    assert body["missing"] == ["NOPE"]
+
+
+@pytest.mark.parametrize("role", ["standard_user", "admin"])
+def test_malformed_user_id_is_rejected(client, role):
+    client.app.state.role = role
+
+    responses = [
+        client.get("/users/not-an-id/watchlist"),
+        client.put("/users/not-an-id/watchlist", json={"tickers": ["AAPL"]}),
+        client.post("/users/not-an-id/watchlist/AAPL"),
+        client.delete("/users/not-an-id/watchlist/AAPL"),
+        client.get("/users/not-an-id/dashboard"),
+    ]
+
+    assert [r.status_code for r in responses] == [400] * 5
+
+
+def test_other_users_watchlist_is_forbidden(client):
+    response = client.get(f"/users/{ObjectId()}/watchlist")
+
+    assert response.status_code == 403
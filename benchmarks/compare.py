@@ -0,0 +1,51 @@
+import argparse
+import json
+
+METRICS = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate):
+    routes = {}
+    for route in sorted(set(baseline["routes"]) | set(candidate["routes"])):
+        before = baseline["routes"].get(route)
+        after = candidate["routes"].get(route)
+        if before is None or after is None:
+            routes[route] = {"only_in": "baseline" if after is None else "candidate"}
+            continue
+
+        routes[route] = {
+            metric: {
+                "baseline": before[metric],
+                "candidate": after[metric],
+                "change_pct": (
+                    round((after[metric] - before[metric]) / before[metric] * 100, 1)
+                    if before[metric]
+                    else None
+                ),
+            }
+            for metric in METRICS
+        }
+
+    return {
+        "baseline": baseline.get("meta", {}).get("revision"),
+        "candidate": candidate.get("meta", {}).get("revision"),
+        "routes": routes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(compare(load(args.baseline), load(args.candidate)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.standins import (
+    AsyncMongoStandIn,
+    FakeStockDataServer,
+    install_genai_stub,
+)
+
+BENCH_ENV = {
+    "GOOGLE_API_KEY": "bench",
+    "STOCK_DATA": "bench",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "bench-secret",
+    "JWT_ALGORITHM": "HS256",
+    "DB_NAME": "bench",
+    "DB_USER_COLLECTION": "users",
+    "DB_STOCKS_COLLECTION": "stocks",
+    "DB_LOGS_COLLECTION": "logs",
+    "DB_HISTORY_COLLECTION": "history",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    # The benchmark drives every request from one client; measure capacity,
+    # not the limiter.
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "GOOGL", "META", "NFLX"]
+
+# Relative share of each workload in the generated operation mix.
+WORKLOADS = {
+    "etl_burst": 2,
+    "results_read": 6,
+    "history_read": 6,
+    "login": 1,
+    "analytics": 2,
+}
+
+
+def configure_environment(stock_data_url):
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ["STOCK_DATA_URL"] = stock_data_url
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = round(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, status, elapsed):
+        self.latencies[route].append(elapsed * 1000)
+        self.statuses[route][str(status)] += 1
+
+    def report(self, wall_time):
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            errors = sum(
+                n
+                for s, n in self.statuses[route].items()
+                if s == "exception" or int(s) >= 500
+            )
+            routes[route] = {
+                "count": len(values),
+                "errors": errors,
+                "status": dict(sorted(self.statuses[route].items())),
+                "throughput_rps": round(len(values) / wall_time, 2),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+
+        total = sum(r["count"] for r in routes.values())
+        return {
+            "total": {
+                "requests": total,
+                "errors": sum(r["errors"] for r in routes.values()),
+                "wall_time_s": round(wall_time, 3),
+                "throughput_rps": round(total / wall_time, 2),
+            },
+            "routes": routes,
+        }
+
+
+class Workload:
+    def __init__(self, client, recorder, rng, users, burst_size):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.users = users
+        self.burst_size = burst_size
+
+    async def request(self, route, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception:
+            status = "exception"
+        self.recorder.record(route, status, time.perf_counter() - started)
+
+    def tickers(self, k):
+        return self.rng.sample(TICKERS, k)
+
+    async def etl_burst(self):
+        await asyncio.gather(
+            *(
+                self.request("POST /etl/{ticker}/run", "POST", f"/etl/{t}/run")
+                for t in self.tickers(self.burst_size)
+            )
+        )
+
+    async def results_read(self):
+        ticker = self.tickers(1)[0]
+        await self.request("GET /etl/{ticker}/results", "GET", f"/etl/{ticker}/results")
+
+    async def history_read(self):
+        ticker = self.tickers(1)[0]
+        if self.rng.random() < 0.5:
+            await self.request(
+                "GET /etl/{ticker}/history", "GET", f"/etl/{ticker}/history"
+            )
+        else:
+            await self.request(
+                "GET /etl/analytics/history/{ticker}",
+                "GET",
+                f"/etl/analytics/history/{ticker}",
+            )
+
+    async def login(self):
+        username, password = self.rng.choice(self.users)
+        await self.request(
+            "POST /auth/login",
+            "POST",
+            "/auth/login",
+            data={"username": username, "password": password},
+        )
+
+    async def analytics(self):
+        choice = self.rng.random()
+        if choice < 0.4:
+            tickers = ",".join(self.tickers(3))
+            await self.request(
+                "GET /etl/analytics/summary/",
+                "GET",
+                "/etl/analytics/summary/",
+                params={"tickers": tickers},
+            )
+        elif choice < 0.7:
+            tickers = ",".join(self.tickers(3))
+            await self.request(
+                "GET /etl/analytics/trends",
+                "GET",
+                "/etl/analytics/trends",
+                params={"tickers": tickers},
+            )
+        else:
+            ticker = self.tickers(1)[0]
+            await self.request(
+                "GET /etl/analytics/prediction/{ticker}",
+                "GET",
+                f"/etl/analytics/prediction/{ticker}",
+            )
+
+
+async def prepare_database(env):
+    from backend.app.database.database import db_manager
+    from backend.app.database.migrations import ensure_indexes
+
+    from backend.app.database.quote_store import quote_store
+
+    db_manager.connect(AsyncMongoStandIn(), env.DB_NAME)
+    await ensure_indexes(db_manager.db)
+
+    if env.QUOTE_CACHE_ENABLED:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "quotes.bin")
+        quote_store.open(path, env.QUOTE_CACHE_SLOTS)
+
+
+async def seed(client, users, attempts=5):
+    # Fail loudly: a workload measured against unseeded data (logins answering
+    # 403, reads answering 404) produces meaningless latencies.
+    for username, password in users:
+        response = await client.post(
+            "/auth/register",
+            json={
+                "full_name": username.title(),
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": password,
+            },
+        )
+        if not response.is_success:
+            raise RuntimeError(
+                f"Seeding user {username} failed: "
+                f"{response.status_code} {response.text}"
+            )
+
+    for ticker in TICKERS:
+        # The fake upstream fails a share of requests on purpose.
+        for _ in range(attempts):
+            response = await client.post(f"/etl/{ticker}/run")
+            if response.is_success:
+                break
+        else:
+            raise RuntimeError(
+                f"Seeding {ticker} failed: {response.status_code} {response.text}"
+            )
+
+
+async def run(args):
+    import httpx
+
+    from backend.app.config.config import settings as env
+    from backend.main import app
+
+    install_genai_stub(latency_ms=args.genai_latency_ms)
+    await prepare_database(env)
+
+    rng = random.Random(args.seed)
+    users = [(f"bench_user_{i}", f"bench-password-{i}") for i in range(args.users)]
+    names = list(WORKLOADS)
+    weights = [WORKLOADS[n] for n in names]
+    plan = rng.choices(names, weights=weights, k=args.operations)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await seed(client, users)
+
+        recorder = Recorder()
+        workload = Workload(client, recorder, rng, users, args.burst_size)
+        queue = asyncio.Queue()
+        for name in plan:
+            queue.put_nowait(name)
+
+        async def worker():
+            while not queue.empty():
+                await getattr(workload, queue.get_nowait())()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall_time = time.perf_counter() - started
+
+    return recorder.report(wall_time)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive a mixed workload against the API using local stand-ins."
+    )
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--burst-size", type=int, default=4)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.02)
+    parser.add_argument(
+        "--upstream-change-rate",
+        type=float,
+        default=1.0,
+        help="Probability that a polled quote differs from the previous one",
+    )
+    parser.add_argument("--genai-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    upstream = FakeStockDataServer(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        error_rate=args.upstream_error_rate,
+        change_rate=args.upstream_change_rate,
+        seed=args.seed,
+    ).start()
+    configure_environment(upstream.url)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        upstream.stop()
+
+    report["meta"] = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "upstream": {"requests": upstream.requests, "errors": upstream.errors},
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from backend.tests.mongo_standin import AsyncMongoStandIn  # noqa: F401
+
+
+class FakeStockDataServer:
+
+    def __init__(
+        self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, change_rate=1.0, seed=0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.change_rate = change_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._prices = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/data/quote"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _quote(self, ticker):
+        # change_rate < 1 emulates a quiet or closed market where most polls
+        # return the same quote as last time.
+        if ticker not in self._prices or self._random.random() < self.change_rate:
+            price = self._prices.get(ticker, (100 + self._random.random() * 400, 0))[0]
+            day_change = round(self._random.gauss(0, 1.5), 2)
+            self._prices[ticker] = (round(price * (1 + day_change / 100), 2), day_change)
+
+        price, day_change = self._prices[ticker]
+        return {
+            "ticker": ticker,
+            "name": f"{ticker} Inc.",
+            "currency": "USD",
+            "price": price,
+            "day_change": day_change,
+        }
+
+    def _respond(self, query):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+                return delay, 500, {"error": {"message": "Injected upstream error"}}
+
+            symbols = query.get("symbols", [""])[0]
+            tickers = [t.strip().upper() for t in symbols.split(",") if t.strip()]
+            return delay, 200, {"data": [self._quote(t) for t in tickers]}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, status, payload = server._respond(
+                    parse_qs(urlparse(self.path).query)
+                )
+                if delay:
+                    time.sleep(delay / 1000)
+
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class StubGenaiClient:
+
+    def __init__(self, api_key=None, latency_ms=0.0, **kwargs):
+        self.latency_ms = latency_ms
+        self.models = SimpleNamespace(
+            generate_content=self._generate_content,
+            generate_videos=self._generate_videos,
+        )
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._generate_content_async)
+        )
+        self.operations = SimpleNamespace(get=lambda operation: operation)
+        self.files = SimpleNamespace(download=lambda file: None)
+
+    def _sleep(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _generate_content(self, model, contents, **kwargs):
+        self._sleep()
+        return SimpleNamespace(text=f"[{model}] stubbed analysis")
+
+    async def _generate_content_async(self, model, contents, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(text=f"[{model}] stubbed analysis")
+
+    def _generate_videos(self, model, prompt, **kwargs):
+        self._sleep()
+        video = SimpleNamespace(save=lambda path: None)
+        return SimpleNamespace(
+            done=True,
+            response=SimpleNamespace(
+                generated_videos=[SimpleNamespace(video=video)]
+            ),
+        )
+
+
+def install_genai_stub(latency_ms=0.0):
+    from backend.app.services import providers
+
+    def factory(*args, **kwargs):
+        return StubGenaiClient(*args, latency_ms=latency_ms, **kwargs)
+
+    stub = SimpleNamespace(Client=factory)
+    types = SimpleNamespace(GenerateVideosConfig=lambda **kwargs: kwargs)
+    providers.load_genai = lambda: (stub, types)
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.run import configure_environment, git_revision
+
+MILESTONES = ["imported", "lifespan_started", "first_request", "ready"]
+
+
+async def child_main(index_latency_ms):
+    from functools import partial
+
+    import httpx
+
+    import backend.main
+    from benchmarks.standins import AsyncMongoStandIn
+
+    marks = {"imported": time.time()}
+    genai_loaded = "google.genai" in sys.modules
+
+    backend.main.AsyncIOMotorClient = partial(
+        AsyncMongoStandIn, index_latency_ms=index_latency_ms
+    )
+    app = backend.main.app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        marks["lifespan_started"] = time.time()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            await c.get("/health/live")
+            marks["first_request"] = time.time()
+
+            while (await c.get("/health/ready")).status_code != 200:
+                await asyncio.sleep(0.001)
+            marks["ready"] = time.time()
+
+    print(json.dumps({"marks": marks, "genai_loaded_at_startup": genai_loaded}))
+
+
+def run_once(mode, index_latency_ms):
+    env = dict(os.environ, INDEX_BUILD_MODE=mode)
+    spawned = time.time()
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.startup",
+            "--child",
+            "--index-latency-ms",
+            str(index_latency_ms),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["seconds"] = {
+        name: report["marks"][name] - spawned for name in MILESTONES
+    }
+    return report
+
+
+def summarize(runs):
+    summary = {}
+    for name in MILESTONES:
+        values = [r["seconds"][name] for r in runs]
+        summary[f"{name}_s"] = {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4),
+        }
+    summary["genai_loaded_at_startup"] = any(r["genai_loaded_at_startup"] for r in runs)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure import time, time-to-first-request and time-to-ready."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--modes", default="blocking,background", help="INDEX_BUILD_MODE values"
+    )
+    parser.add_argument(
+        "--index-latency-ms",
+        type=float,
+        default=250.0,
+        help="Simulated duration of each create_index call",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    configure_environment(os.environ.get("STOCK_DATA_URL", "http://127.0.0.1:9/quote"))
+
+    if args.child:
+        asyncio.run(child_main(args.index_latency_ms))
+        return
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "config": {k: v for k, v in vars(args).items() if k != "child"},
+        },
+        "modes": {},
+    }
+    for mode in args.modes.split(","):
+        runs = [run_once(mode, args.index_latency_ms) for _ in range(args.runs)]
+        report["modes"][mode] = summarize(runs)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,11 @@ export class DashboardAdminComponent implements OnInit {
   currentAdmin: UserResponse | null = null;
   allUsers: UserResponse[] = [];
   isLoading = false;
+  isLoadingMore = false;
+
+  // Paginación: cursor de la siguiente página (null cuando no hay más)
+  nextCursor: string | null = null;
+  userCount: number | null = null;
   errorMessage = '';
   successMessage = '';
 
@@ -75,45 +80,25 @@ export class DashboardAdminComponent implements OnInit {
   }
 
   /**
-   * Carga todos los usuarios desde el backend
+   * Carga la primera página de usuarios desde el backend
    */
   loadAllUsers(): void {
     this.isLoading = true;
     this.errorMessage = '';
+    this.nextCursor = null;
 
     console.log('🔵 Loading all users...');
 
-    this.http.get<any>(`${this.apiUrl}/users`).subscribe({
+    this.fetchUsers().subscribe({
       next: (response) => {
         console.log('✅ Raw response from backend:', response);
 
-        let users: any[] = [];
-
-        // Verificar diferentes formatos de respuesta
-        if (Array.isArray(response)) {
-          users = response;
-        } else if (response && Array.isArray(response.list_of_users)) {
-          users = response.list_of_users;
-        } else if (response && Array.isArray(response.users)) {
-          users = response.users;
-        } else if (response && typeof response === 'object') {
-          users = Object.values(response);
-        }
-
-        // Filtrar usuarios válidos y agregar valores por defecto
-        this.allUsers = users
-          .filter(u => u && (u.username || u.email))
-          .map(u => ({
-            ...u,
-            username: u.username || 'unknown',
-            email: u.email || 'no-email',
-            full_name: u.full_name || u.fullname || '',
-            role: u.role || 'standard_user',
-            id: u.id || u._id
-          }));
+        this.allUsers = this.parseUsers(response);
+        this.nextCursor = response?.next_cursor ?? null;
 
         console.log('✅ Users loaded:', this.allUsers);
         this.calculateStats();
+        this.loadUserCount();
         this.isLoading = false;
       },
       error: (error) => {
@@ -125,11 +110,82 @@ export class DashboardAdminComponent implements OnInit {
     });
   }
 
+  /**
+   * Carga la siguiente página de usuarios y la añade a la lista
+   */
+  loadMoreUsers(): void {
+    if (!this.nextCursor || this.isLoadingMore) {
+      return;
+    }
+    this.isLoadingMore = true;
+
+    this.fetchUsers(this.nextCursor).subscribe({
+      next: (response) => {
+        this.allUsers = [...this.allUsers, ...this.parseUsers(response)];
+        this.nextCursor = response?.next_cursor ?? null;
+        this.calculateStats();
+        this.isLoadingMore = false;
+      },
+      error: (error) => {
+        console.error('❌ Failed to load more users:', error);
+        this.errorMessage = 'Failed to load more users. Please try again.';
+        this.isLoadingMore = false;
+      }
+    });
+  }
+
+  private fetchUsers(after?: string) {
+    const params: Record<string, string> = after ? { after } : {};
+    return this.http.get<any>(`${this.apiUrl}/users`, { params });
+  }
+
+  /**
+   * Total de usuarios según el backend (la lista solo tiene las páginas cargadas)
+   */
+  private loadUserCount(): void {
+    this.http.get<{ count: number }>(`${this.apiUrl}/users/count`).subscribe({
+      next: (response) => {
+        this.userCount = response.count;
+        this.calculateStats();
+      },
+      error: (error) => {
+        console.error('❌ Failed to load user count:', error);
+      }
+    });
+  }
+
+  private parseUsers(response: any): UserResponse[] {
+    let users: any[] = [];
+
+    // Verificar diferentes formatos de respuesta
+    if (Array.isArray(response)) {
+      users = response;
+    } else if (response && Array.isArray(response.list_of_users)) {
+      users = response.list_of_users;
+    } else if (response && Array.isArray(response.users)) {
+      users = response.users;
+    } else if (response && typeof response === 'object') {
+      users = Object.values(response);
+    }
+
+    // Filtrar usuarios válidos y agregar valores por defecto
+    return users
+      .filter(u => u && (u.username || u.email))
+      .map(u => ({
+        ...u,
+        username: u.username || 'unknown',
+        email: u.email || 'no-email',
+        full_name: u.full_name || u.fullname || '',
+        role: u.role || 'standard_user',
+        id: u.id || u._id
+      }));
+  }
+
   /**
    * Calcula estadísticas de usuarios
    */
   calculateStats(): void {
-    this.stats.totalUsers = this.allUsers.length;
+    this.stats.totalUsers = this.userCount ?? this.allUsers.length;
     this.stats.adminUsers = this.allUsers.filter(u => u.role === 'admin').length;
     this.stats.standardUsers = this.allUsers.filter(u => u.role === 'standard_user').length;
   }